@@ -0,0 +1,196 @@
+"""
+Benchmark des réglages d'encodage : preset × CRF × threads.
+
+Sur un jeu de référence (nos dernières vidéos produites, sinon une mire
+synthétique), chaque combinaison est encodée à partir d'une référence sans
+perte des `seconds` premières secondes. On mesure le temps d'encodage, la
+taille, la SSIM et le PSNR face à la référence, et le temps d'envoi simulé
+au débit montant configuré (UPLOAD_BANDWIDTH_MBPS).
+
+Gagnant : la combinaison la plus rapide de bout en bout (encodage + envoi)
+parmi celles qui atteignent la SSIM minimale. `--apply` l'écrit dans .env
+(ENCODE_PRESET, ENCODE_CRF, ENCODE_THREADS), repris par compose.
+"""
+
+import re
+from itertools import product
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+from rich.table import Table
+
+from src.config import settings
+from src.models import OUTPUT_PROFILES
+from src.utils.workspace import job_workspace
+from src.video.ffmpeg_runner import run_ffmpeg
+
+console = Console()
+
+ENV_PATH = Path(".env")
+
+
+def reference_videos(count: int) -> list[Path]:
+    """Dernières vidéos principales produites (sans leurs variantes)."""
+    variant_suffixes = tuple(f"_{name}" for name in OUTPUT_PROFILES)
+    videos = [
+        p for p in (settings.output_dir / "videos").glob("noradar_*.mp4")
+        if not p.stem.endswith(variant_suffixes)
+    ]
+    return sorted(videos, key=lambda p: p.stat().st_mtime, reverse=True)[:count]
+
+
+def _synthetic_source(work: Path, seconds: float) -> Path:
+    """Mire animée bruitée au format vertical, faute de vidéo produite."""
+    source = work / "synthetic.mp4"
+    run_ffmpeg([
+        "-y", "-f", "lavfi",
+        "-i", f"testsrc2=s={settings.video_width}x{settings.video_height}:r={settings.video_fps}:d={seconds}",
+        "-vf", "noise=alls=12:allf=t", "-c:v", "libx264", "-preset", "veryfast", "-crf", "16",
+        "-pix_fmt", "yuv420p", str(source),
+    ], "bench.source", timeout=600, duration=seconds)
+    return source
+
+
+def _lossless_reference(source: Path, dest: Path, seconds: float) -> Optional[Path]:
+    result = run_ffmpeg([
+        "-y", "-i", str(source), "-t", str(seconds), "-an",
+        "-c:v", "libx264", "-preset", "ultrafast", "-qp", "0", "-pix_fmt", "yuv420p", str(dest),
+    ], "bench.reference", timeout=600, duration=seconds)
+    return dest if result.returncode == 0 else None
+
+
+def measure_quality(candidate: Path, reference: Path) -> tuple[float, float]:
+    """SSIM (All) et PSNR moyen d'un encodage face à la référence."""
+    result = run_ffmpeg([
+        "-i", str(candidate), "-i", str(reference),
+        "-lavfi", "[0:v]split[a][b];[1:v]split[c][d];[a][c]ssim;[b][d]psnr",
+        "-f", "null", "-",
+    ], "bench.quality", timeout=600)
+    ssim = re.search(r"SSIM .*All:([\d.]+)", result.stderr)
+    psnr = re.search(r"PSNR .*average:([\d.]+|inf)", result.stderr)
+    return (
+        float(ssim.group(1)) if ssim else 0.0,
+        float(psnr.group(1)) if psnr else 0.0,
+    )
+
+
+def upload_seconds(size_bytes: int, bandwidth_mbps: float) -> float:
+    return size_bytes * 8 / (bandwidth_mbps * 1_000_000)
+
+
+def _measure_combo(
+    references: list[Path], work: Path, preset: str, crf: int, threads: int, seconds: float,
+) -> Optional[tuple[float, int, float, float]]:
+    """Temps d'encodage et taille cumulés, SSIM et PSNR moyens d'une combinaison (None si échec)."""
+    encode_time, size, ssims, psnrs = 0.0, 0, [], []
+    for i, reference in enumerate(references):
+        out = work / f"candidate_{i}.mp4"
+        result = run_ffmpeg([
+            "-y", "-i", str(reference), "-an",
+            "-c:v", "libx264", "-preset", preset, "-crf", str(crf),
+            *(["-threads", str(threads)] if threads else []),
+            "-pix_fmt", "yuv420p", "-movflags", "+faststart", str(out),
+        ], "bench.encode", timeout=600, duration=seconds)
+        if result.returncode != 0:
+            return None
+        encode_time += result.summary.wall_time
+        size += out.stat().st_size
+        ssim, psnr = measure_quality(out, reference)
+        ssims.append(ssim)
+        psnrs.append(psnr)
+    return encode_time, size, sum(ssims) / len(ssims), sum(psnrs) / len(psnrs)
+
+
+def benchmark_encodes(
+    presets: list[str],
+    crfs: list[int],
+    threads: list[int],
+    videos: int = 3,
+    seconds: float = 15.0,
+    bandwidth_mbps: Optional[float] = None,
+) -> list[dict]:
+    """Mesures agrégées (sur le jeu de référence) de chaque combinaison."""
+    bandwidth = bandwidth_mbps or settings.upload_bandwidth_mbps
+    results = []
+    with job_workspace("bench_encode") as work:
+        sources = reference_videos(videos) or [_synthetic_source(work, seconds)]
+        console.print(f"[dim]Référence : {', '.join(s.name for s in sources)} ({seconds:.0f}s chacune)[/dim]")
+        references = [
+            ref for i, source in enumerate(sources)
+            if (ref := _lossless_reference(source, work / f"reference_{i}.mkv", seconds))
+        ]
+        if not references:
+            console.print("[red]✗ Impossible de préparer la référence[/red]")
+            return results
+
+        for preset, crf, thread_count in product(presets, crfs, threads):
+            measured = _measure_combo(references, work, preset, crf, thread_count, seconds)
+            if measured is None:
+                console.print(f"[yellow]⚠ Échec {preset}/crf {crf}/{thread_count} threads, ignoré[/yellow]")
+                continue
+            encode_time, size, ssim, psnr = measured
+            upload = upload_seconds(size, bandwidth)
+            results.append({
+                "preset": preset, "crf": crf, "threads": thread_count,
+                "encode": encode_time, "size_mb": size / (1024 * 1024), "ssim": ssim, "psnr": psnr,
+                "upload": upload, "total": encode_time + upload,
+            })
+    return results
+
+
+def pick_winner(results: list[dict], min_ssim: float) -> Optional[dict]:
+    """Plus rapide (encodage + envoi) au-dessus de la SSIM minimale, sinon la meilleure SSIM."""
+    eligible = [r for r in results if r["ssim"] >= min_ssim]
+    if eligible:
+        return min(eligible, key=lambda r: r["total"])
+    return max(results, key=lambda r: r["ssim"], default=None)
+
+
+def print_results(results: list[dict], winner: Optional[dict], bandwidth_mbps: float) -> None:
+    table = Table(title=f"Encodage — envoi simulé à {bandwidth_mbps:g} Mbit/s")
+    table.add_column("Preset", style="cyan")
+    table.add_column("CRF", justify="right")
+    table.add_column("Threads", justify="right")
+    table.add_column("Encodage (s)", justify="right")
+    table.add_column("Taille (Mo)", justify="right")
+    table.add_column("SSIM", justify="right")
+    table.add_column("PSNR (dB)", justify="right")
+    table.add_column("Envoi (s)", justify="right")
+    table.add_column("Total (s)", justify="right", style="green")
+
+    for r in sorted(results, key=lambda r: r["total"]):
+        mark = " ★" if r is winner else ""
+        table.add_row(
+            f"{r['preset']}{mark}", str(r["crf"]), str(r["threads"] or "auto"),
+            f"{r['encode']:.2f}", f"{r['size_mb']:.1f}", f"{r['ssim']:.4f}", f"{r['psnr']:.2f}",
+            f"{r['upload']:.2f}", f"{r['total']:.2f}",
+        )
+    console.print(table)
+
+
+def save_to_env(values: dict[str, str], path: Path = ENV_PATH) -> None:
+    """Remplace (ou ajoute) des variables dans le fichier .env."""
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    pending = dict(values)
+    for i, line in enumerate(lines):
+        name = line.split("=", 1)[0].strip().upper()
+        if name in pending:
+            lines[i] = f"{name}={pending.pop(name)}"
+    lines += [f"{name}={value}" for name, value in pending.items()]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def apply_winner(winner: dict) -> None:
+    """Écrit le profil gagnant dans .env et l'applique au process courant."""
+    save_to_env({
+        "ENCODE_PRESET": winner["preset"],
+        "ENCODE_CRF": str(winner["crf"]),
+        "ENCODE_THREADS": str(winner["threads"]),
+    })
+    settings.encode_preset = winner["preset"]
+    settings.encode_crf = winner["crf"]
+    settings.encode_threads = winner["threads"]
+    console.print(
+        f"[green]✓ Profil d'encodage enregistré : preset {winner['preset']}, "
+        f"CRF {winner['crf']}, threads {winner['threads'] or 'auto'}[/green]"
+    )
@@ -0,0 +1,122 @@
+"""
+Benchmark du rendu : un passage vs rendu par tranches.
+
+Pour chaque nombre de cœurs, le process est restreint à ces cœurs
+(sched_setaffinity, hérité par ffmpeg) et les deux chemins de rendu
+encodent la même vidéo synthétique (fond testsrc2, audio sinus, sous-titres
+factices). Le temps retenu est le meilleur de `runs` essais.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+from rich.console import Console
+from rich.table import Table
+
+from src.models import AudioFile, SubtitleSegment, Subtitles
+from src.utils.workspace import job_workspace
+from src.video.ffmpeg_runner import run_ffmpeg
+
+console = Console()
+
+
+@contextmanager
+def pinned_cores(cores: int) -> Iterator[int]:
+    """Restreint le process (et ses enfants) à `cores` cœurs le temps du bloc."""
+    if not hasattr(os, "sched_setaffinity"):
+        yield cores
+        return
+    original = os.sched_getaffinity(0)
+    allowed = sorted(original)[:cores]
+    os.sched_setaffinity(0, allowed)
+    try:
+        yield len(allowed)
+    finally:
+        os.sched_setaffinity(0, original)
+
+
+def make_fixture(work: Path, duration: float) -> tuple[Path, AudioFile, Subtitles]:
+    """Fond 720p (mise au format à chaque rendu), audio et sous-titres synthétiques."""
+    bg = work / "bench_bg.mp4"
+    audio_path = work / "bench_audio.m4a"
+    for args, media_duration in (
+        ([
+            "-y", "-f", "lavfi", "-i", "testsrc2=s=1280x720:r=30:d=10",
+            "-c:v", "libx264", "-preset", "ultrafast", "-g", "30", "-pix_fmt", "yuv420p", str(bg)
+        ], 10.0),
+        ([
+            "-y", "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+            "-c:a", "aac", "-b:a", "128k", str(audio_path)
+        ], duration),
+    ):
+        result = run_ffmpeg(args, "bench.fixture", timeout=120, duration=media_duration)
+        if result.returncode != 0:
+            raise RuntimeError(f"Préparation du benchmark impossible : {result.stderr[-300:]}")
+
+    audio = AudioFile(id="bench", script_id="bench", path=audio_path, duration=duration, voice_name="bench")
+    step = 2.5
+    segments = [
+        SubtitleSegment(index=i, start_time=i * step, end_time=min((i + 1) * step, duration),
+                        text=f"Phrase de test numéro {i + 1}")
+        for i in range(int(duration // step))
+    ]
+    return bg, audio, Subtitles(id="bench", audio_id="bench", segments=segments)
+
+
+def _best_time(render: Callable[[], bool], runs: int) -> Optional[float]:
+    best = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        if not render():
+            return None
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def benchmark_chunked(core_counts: list[int], duration: float = 28.0, runs: int = 2) -> list[dict]:
+    """Temps de rendu un passage / par tranches pour chaque nombre de cœurs."""
+    from src.video.composer import SubtitleStyler, VideoComposerPro
+
+    composer = VideoComposerPro()
+    results = []
+    with job_workspace("bench_render") as work:
+        bg, audio, subtitles = make_fixture(work, duration)
+        ass = SubtitleStyler.generate_ass(subtitles.segments, work / "bench.ass")
+        out = work / "bench_out.mp4"
+        video_duration = duration + 0.5
+
+        for cores in core_counts:
+            with pinned_cores(cores) as effective:
+                single = _best_time(
+                    lambda: composer._render_single_pass(bg, False, audio, ass, out, video_duration, threads=effective),
+                    runs,
+                )
+                # Un seul cœur : pas de tranches possibles
+                chunked = _best_time(
+                    lambda: composer._render_chunked(
+                        bg, False, audio, subtitles, work, out, video_duration, workers=effective, threads=effective
+                    ),
+                    runs,
+                ) if effective > 1 else None
+            results.append({"cores": effective, "single": single, "chunked": chunked})
+            console.print(f"[dim]{effective} cœur(s) : un passage {single}, tranches {chunked}[/dim]")
+    return results
+
+
+def print_results(results: list[dict], duration: float) -> None:
+    table = Table(title=f"Rendu {duration:.0f}s — un passage vs tranches")
+    table.add_column("Cœurs", justify="right", style="cyan")
+    table.add_column("Un passage (s)", justify="right")
+    table.add_column("Tranches (s)", justify="right")
+    table.add_column("Gain", justify="right", style="green")
+
+    def fmt(value: Optional[float]) -> str:
+        return f"{value:.2f}" if value is not None else "—"
+
+    for r in results:
+        speedup = f"×{r['single'] / r['chunked']:.2f}" if r["single"] and r["chunked"] else "—"
+        table.add_row(str(r["cores"]), fmt(r["single"]), fmt(r["chunked"]), speedup)
+    console.print(table)
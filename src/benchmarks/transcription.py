@@ -0,0 +1,191 @@
+"""
+Benchmarks de la transcription.
+
+- benchmark_batched : sur les derniers fichiers voix produits, le même
+  modèle Whisper (chargé une fois) transcrit les clips un par un
+  (model.transcribe) puis en lot (transcribe_batch_with). On compare le
+  débit (clips par minute) et le temps CPU du process.
+- benchmark_engines : chaque moteur (openai-whisper, faster-whisper…)
+  transcrit les pistes dont le script est encore dans outputs/scripts/,
+  dans un process dédié pour isoler son pic de mémoire (RSS). On compare
+  chargement, latence par clip, mémoire et qualité de l'alignement forcé
+  sur le script (mots retrouvés, confiance, écart des débuts de phrase
+  avec le premier moteur, pris comme référence).
+"""
+
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from src.config import settings
+from src.models import Script
+from src.utils.text import split_sentences
+from src.video.alignment import align_sentences, alignment_confidence
+from src.video.mediainfo import media_info
+from src.video.transcription_backends import create_backend, transcribe_batch_with
+
+console = Console()
+
+
+def reference_audio(count: int) -> list[Path]:
+    """Dernières pistes voix produites."""
+    audio_dir = settings.output_dir / "audio"
+    files = [*audio_dir.glob("*.m4a"), *audio_dir.glob("*.mp3")]
+    return sorted(files, key=lambda p: p.stat().st_mtime, reverse=True)[:count]
+
+
+def _measure(run: Callable[[], None]) -> tuple[float, float]:
+    """Temps mur et temps CPU (process courant) d'un appel."""
+    before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    run()
+    wall = time.perf_counter() - start
+    after = resource.getrusage(resource.RUSAGE_SELF)
+    return wall, (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+
+
+def benchmark_batched(clips: list[Path], model_size: str, batch_sizes: list[int]) -> list[dict]:
+    """Débit clip par clip puis pour chaque taille de lot."""
+    import whisper
+
+    console.print(f"[blue]Chargement Whisper ({model_size})...[/blue]")
+    model = whisper.load_model(model_size)
+    results = []
+
+    def loop():
+        for clip in clips:
+            model.transcribe(str(clip), language="fr", word_timestamps=True)
+
+    wall, cpu = _measure(loop)
+    results.append({"mode": "clip par clip", "wall": wall, "cpu": cpu, "clips": len(clips)})
+    console.print(f"[dim]Clip par clip : {wall:.1f}s[/dim]")
+
+    for size in batch_sizes:
+        wall, cpu = _measure(lambda: transcribe_batch_with(model, clips, batch_size=size))
+        results.append({"mode": f"lot de {size}", "wall": wall, "cpu": cpu, "clips": len(clips)})
+        console.print(f"[dim]Lot de {size} : {wall:.1f}s[/dim]")
+    return results
+
+
+def print_results(results: list[dict], model_size: str) -> None:
+    table = Table(title=f"Transcription Whisper {model_size} — {results[0]['clips']} clips")
+    table.add_column("Mode", style="cyan")
+    table.add_column("Temps (s)", justify="right")
+    table.add_column("CPU (s)", justify="right")
+    table.add_column("Clips/min", justify="right", style="green")
+    table.add_column("Gain", justify="right")
+
+    baseline = results[0]["wall"]
+    for r in results:
+        table.add_row(
+            r["mode"], f"{r['wall']:.1f}", f"{r['cpu']:.1f}",
+            f"{r['clips'] / r['wall'] * 60:.1f}", f"×{baseline / r['wall']:.2f}",
+        )
+    console.print(table)
+
+
+def scripted_audio(count: int) -> list[tuple[Path, Script]]:
+    """Dernières pistes voix dont le script (même nom, .json) est encore présent."""
+    pairs = []
+    for audio in reference_audio(10**6):
+        script_path = settings.output_dir / "scripts" / f"{audio.stem}.json"
+        if script_path.exists():
+            pairs.append((audio, Script.model_validate_json(script_path.read_text(encoding="utf-8"))))
+        if len(pairs) == count:
+            break
+    return pairs
+
+
+def _run_engine(engine: str, model_size: str, clips: list[str]) -> dict:
+    """Dans le process dédié : chargement, transcription de chaque clip, pic de RSS."""
+    start = time.perf_counter()
+    backend = create_backend(model_size, engine)
+    load = time.perf_counter() - start
+
+    latencies, segments = [], []
+    for clip in clips:
+        start = time.perf_counter()
+        result = backend.transcribe(Path(clip), language="fr", word_timestamps=True)
+        latencies.append(time.perf_counter() - start)
+        segments.append(result.get("segments", []))
+
+    # ru_maxrss est en kilo-octets sous Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return {"load": load, "latencies": latencies, "segments": segments, "peak_rss": peak}
+
+
+def _sentence_starts(alignment) -> Optional[np.ndarray]:
+    return np.array([s.start_time for s in alignment.segments]) if alignment else None
+
+
+def benchmark_engines(pairs: list[tuple[Path, Script]], engines: list[str], model_size: str) -> list[dict]:
+    """Mesures de chaque moteur sur les mêmes pistes (le premier moteur sert de référence)."""
+    clips = [str(audio) for audio, _ in pairs]
+    sentences = [split_sentences(script.full_text) for _, script in pairs]
+    audio_seconds = sum(media_info.duration(audio) for audio, _ in pairs)
+    spawn = multiprocessing.get_context("spawn")
+
+    results = []
+    reference: list[Optional[np.ndarray]] = []
+    for engine in engines:
+        console.print(f"[blue]{engine} ({model_size}) sur {len(clips)} pistes...[/blue]")
+        try:
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                run = pool.submit(_run_engine, engine, model_size, clips).result()
+        except Exception as e:
+            console.print(f"[yellow]⚠ {engine} indisponible ({type(e).__name__}: {e}), ignoré[/yellow]")
+            continue
+
+        alignments = [align_sentences(s, segs) for s, segs in zip(sentences, run["segments"])]
+        match_rates = [a.match_rate for a in alignments if a]
+        confidences = [
+            alignment_confidence(a, segs, len(s))
+            for a, segs, s in zip(alignments, run["segments"], sentences) if a
+        ]
+        starts = [_sentence_starts(a) for a in alignments]
+        if not reference:
+            reference = starts
+        drifts = [
+            float(np.mean(np.abs(ours - ref)))
+            for ours, ref in zip(starts, reference)
+            if ours is not None and ref is not None and len(ours) == len(ref) and len(ours)
+        ]
+
+        latency = sum(run["latencies"])
+        results.append({
+            "engine": engine,
+            "load": run["load"],
+            "latency": latency / len(clips),
+            "realtime": audio_seconds / latency if latency else 0.0,
+            "rss_mb": run["peak_rss"] / (1024 * 1024),
+            "match_rate": float(np.mean(match_rates)) if match_rates else 0.0,
+            "confidence": float(np.mean(confidences)) if confidences else 0.0,
+            "drift": float(np.mean(drifts)) if drifts else None,
+        })
+    return results
+
+
+def print_engine_results(results: list[dict], model_size: str, clips: int) -> None:
+    table = Table(title=f"Moteurs de transcription — Whisper {model_size}, {clips} pistes")
+    table.add_column("Moteur", style="cyan")
+    table.add_column("Chargement (s)", justify="right")
+    table.add_column("Latence/clip (s)", justify="right")
+    table.add_column("× temps réel", justify="right", style="green")
+    table.add_column("Pic RSS (Mo)", justify="right")
+    table.add_column("Mots retrouvés", justify="right")
+    table.add_column("Confiance", justify="right")
+    table.add_column("Écart débuts (s)", justify="right")
+
+    for r in results:
+        table.add_row(
+            r["engine"], f"{r['load']:.1f}", f"{r['latency']:.2f}", f"{r['realtime']:.1f}",
+            f"{r['rss_mb']:.0f}", f"{r['match_rate']:.0%}", f"{r['confidence']:.2f}",
+            "réf." if r is results[0] else (f"{r['drift']:.3f}" if r["drift"] is not None else "—"),
+        )
+    console.print(table)
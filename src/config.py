@@ -32,6 +32,11 @@ class Settings(BaseSettings):
     tts_voice_name: str = Field(default="fr-FR-Neural2-D", description="Voix TTS à utiliser")
     tts_speaking_rate: float = Field(default=1.15, description="Vitesse de parole (0.25-4.0)")
     tts_pitch: float = Field(default=0.0, description="Pitch de la voix (-20.0 à 20.0)")
+    voice_track_aac: bool = Field(default=True, description="Piste voix normalisée et encodée en AAC une fois (copiée telle quelle au montage)")
+    voice_loudness_lufs: float = Field(default=-14.0, description="Volume cible de la voix (LUFS intégrés)")
+    voice_true_peak: float = Field(default=-1.5, description="Crête maximale de la voix (dBTP)")
+    voice_audio_bitrate: str = Field(default="192k", description="Débit AAC de la piste voix")
+    voice_sample_rate: int = Field(default=48000, description="Fréquence d'échantillonnage de la piste voix")
 
     # === ElevenLabs (Voix alternative) ===
     elevenlabs_api_key: str = Field(default="", description="Clé API ElevenLabs")
@@ -57,6 +62,24 @@ class Settings(BaseSettings):
     video_height: int = Field(default=1920, description="Hauteur vidéo (format vertical)")
     video_fps: int = Field(default=30, description="FPS de la vidéo")
     video_format: str = Field(default="mp4", description="Format de sortie vidéo")
+    compose_single_pass: bool = Field(default=True, description="Rendu en un seul passage ffmpeg (sinon fond préparé puis incrustation)")
+    output_profiles: str = Field(default="master", description="Variantes produites en un passage : master, tiktok, reels, shorts, proxy (le premier = sortie principale)")
+    encode_preset: str = Field(default="ultrafast", description="Preset x264 des rendus (choisi par `bench encode --apply`)")
+    encode_crf: int = Field(default=20, description="CRF x264 des rendus à qualité constante")
+    encode_threads: int = Field(default=0, description="Threads x264 par encodage (0 = automatique)")
+    upload_bandwidth_mbps: float = Field(default=20.0, description="Débit montant supposé vers Drive (Mbit/s), pour le benchmark d'encodage")
+    compose_chunked: bool = Field(default=False, description="Rendu par tranches alignées sur le GOP, encodées en parallèle")
+    compose_chunk_workers: int = Field(default=0, description="Encodages ffmpeg simultanés en mode tranches (0 = moitié des cœurs)")
+    compose_chunk_min_seconds: float = Field(default=4.0, description="Durée minimale d'une tranche (secondes)")
+    workspace_dir: Path = Field(default=Path("temp/jobs"), description="Espaces de travail isolés des rendus")
+    workspace_retention: str = Field(default="never", description="Conservation des espaces de travail : never, on_failure, always")
+    workspace_keep_hours: float = Field(default=24.0, description="Durée de conservation des espaces gardés (heures)")
+    scratch_enabled: bool = Field(default=True, description="Placer les intermédiaires sur tmpfs (RAM) quand le budget le permet")
+    scratch_dir: Path = Field(default=Path("/dev/shm/content-engine"), description="Racine scratch en RAM (tmpfs)")
+    scratch_budget_mb: int = Field(default=1024, description="Budget RAM des intermédiaires (Mo), au-delà : disque")
+    scratch_safety_margin: float = Field(default=1.5, description="Marge appliquée à l'estimation d'un job avant de le placer en RAM")
+    ffmpeg_progress: bool = Field(default=True, description="Afficher l'avancement des encodages ffmpeg et leur bilan")
+    ffmpeg_progress_interval: float = Field(default=5.0, description="Intervalle entre deux lignes d'avancement ffmpeg (secondes)")
 
     # === Watermark Settings ===
     watermark_enabled: bool = Field(default=True, description="Activer le watermark")
@@ -68,6 +91,21 @@ class Settings(BaseSettings):
     pexels_cache_enabled: bool = Field(default=True, description="Activer le cache local Pexels")
     pexels_cache_dir: Path = Field(default=Path("cache/pexels"), description="Dossier du cache Pexels")
     pexels_cache_max_videos: int = Field(default=50, description="Nombre max de vidéos en cache")
+    pexels_search_cache_dir: Path = Field(default=Path("cache/pexels_search"), description="Réponses de recherche Pexels mises en cache")
+    pexels_search_ttl_hours: float = Field(default=72.0, description="Durée de validité d'une recherche Pexels en cache (heures)")
+    pexels_prefetch_enabled: bool = Field(default=True, description="Précharger les fonds Pexels avant un batch")
+    pexels_prefetch_per_format: int = Field(default=6, description="Nombre de fonds Pexels à garder en cache par format")
+    mediainfo_cache_path: Path = Field(default=Path("cache/mediainfo.json"), description="Cache persistant des ffprobe (par chemin, taille, mtime)")
+    background_index_path: Path = Field(default=Path("cache/backgrounds_index.json"), description="Index persistant des fonds vidéo")
+
+    # === Cache d'artefacts (audio, sous-titres, vidéos) ===
+    artifact_cache_enabled: bool = Field(default=True, description="Réutiliser les artefacts dont les entrées n'ont pas changé")
+    artifact_cache_dir: Path = Field(default=Path("outputs/cache"), description="Dossier du cache d'artefacts")
+
+    # === Fonds mezzanine (content-engine backgrounds normalize) ===
+    mezzanine_enabled: bool = Field(default=True, description="Préférer les fonds normalisés s'ils existent")
+    mezzanine_dir: Path = Field(default=Path("assets/mezzanine"), description="Dossier des fonds normalisés")
+    mezzanine_gop_seconds: float = Field(default=1.0, description="Intervalle entre images clés des mezzanines")
 
     # === Retry Settings ===
     retry_enabled: bool = Field(default=True, description="Activer le retry automatique")
@@ -85,6 +123,17 @@ class Settings(BaseSettings):
     subtitle_outline_color: str = Field(default="black", description="Couleur du contour")
     subtitle_outline_width: int = Field(default=5, description="Épaisseur du contour")
     subtitle_position: str = Field(default="center", description="Position (top/center/bottom)")
+    subtitle_timing: str = Field(default="tts", description="Source des timings : tts (marks SSML), whisper ou vad (pauses de la piste, sans modèle)")
+
+    # === Service de transcription (whisper-server) ===
+    whisper_server_enabled: bool = Field(default=True, description="Utiliser le service Whisper résident s'il tourne")
+    whisper_server_socket: Path = Field(default=Path("temp/whisper.sock"), description="Socket Unix du service Whisper")
+    whisper_models: str = Field(default="tiny,base,small", description="Cascade de modèles Whisper, du plus léger au plus précis")
+    whisper_confidence_threshold: float = Field(default=0.8, description="Score d'alignement en dessous duquel on passe au modèle suivant (0-1)")
+    whisper_batch_size: int = Field(default=8, description="Clips transcrits ensemble (fenêtres de 30 s par passe d'encodeur), 1 = clip par clip")
+    whisper_engine: str = Field(default="openai-whisper", description="Moteur de transcription : openai-whisper ou faster-whisper (CTranslate2)")
+    whisper_compute_type: str = Field(default="int8", description="Quantification faster-whisper (int8, int8_float32, float32)")
+    whisper_cpu_threads: int = Field(default=0, description="Threads CPU faster-whisper, 0 = défaut CTranslate2")
 
     # === Redis (deduplication) ===
     redis_url: str = Field(default="redis://localhost:6379", description="URL de connexion Redis")
@@ -93,6 +142,11 @@ class Settings(BaseSettings):
     batch_size: int = Field(default=5, description="Nombre de vidéos par batch")
     weekly_target: int = Field(default=30, description="Objectif de vidéos par semaine")
 
+    # === Pipeline concurrent (batch --workers) ===
+    pipeline_io_workers: int = Field(default=4, description="Workers par étape réseau (LLM, TTS, upload)")
+    pipeline_cpu_workers: int = Field(default=2, description="Workers par étape CPU (Whisper, ffmpeg)")
+    pipeline_queue_size: int = Field(default=4, description="Taille des files entre étapes")
+
     def ensure_directories(self) -> None:
         """Crée les dossiers nécessaires s'ils n'existent pas."""
         for directory in [self.output_dir, self.assets_dir, self.temp_dir]:
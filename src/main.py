@@ -4,7 +4,10 @@ CLI du Content Engine NoRadar.
 Usage:
     content-engine produce --format scandale
     content-engine batch --count 10
+    content-engine batch --count 30 --workers 4
+    content-engine batch --count 10 --timing vad
     content-engine weekly
+    content-engine resume <batch_id>
     content-engine sync
 """
 
@@ -24,6 +27,25 @@ app = typer.Typer(
 )
 console = Console()
 
+backgrounds_app = typer.Typer(help="Gestion de la bibliothèque de fonds vidéo")
+app.add_typer(backgrounds_app, name="backgrounds")
+bench_app = typer.Typer(help="Benchmarks de performance")
+app.add_typer(bench_app, name="bench")
+
+SUBTITLE_TIMINGS = ("tts", "whisper", "vad")
+TIMING_HELP = "Timings des sous-titres : tts, whisper ou vad (défaut : SUBTITLE_TIMING)"
+
+
+def _set_subtitle_timing(timing: Optional[str]) -> None:
+    """Source des timings pour ce lancement (remplace SUBTITLE_TIMING)."""
+    if timing is None:
+        return
+    if timing not in SUBTITLE_TIMINGS:
+        console.print(f"[red]Timings invalides : {timing}[/red]")
+        console.print(f"Valeurs possibles : {', '.join(SUBTITLE_TIMINGS)}")
+        raise typer.Exit(1)
+    settings.subtitle_timing = timing
+
 
 @app.command()
 def init():
@@ -64,6 +86,7 @@ def produce(
     no_upload: bool = typer.Option(False, "--no-upload", help="Ne pas uploader sur Google Drive"),
     background: Optional[Path] = typer.Option(None, "--background", "-b", help="Image de fond"),
     voice: str = typer.Option("google", "--voice", "-v", help="Moteur vocal: google ou elevenlabs"),
+    timing: Optional[str] = typer.Option(None, "--timing", help=TIMING_HELP),
 ):
     """Produit une vidéo complète."""
     from src.pipeline.orchestrator import ContentOrchestrator
@@ -79,6 +102,7 @@ def produce(
         console.print(f"[red]Moteur vocal invalide : {voice}[/red]")
         console.print("Valeurs possibles : google, elevenlabs")
         raise typer.Exit(1)
+    _set_subtitle_timing(timing)
 
     orchestrator = ContentOrchestrator()
 
@@ -97,10 +121,15 @@ def batch(
     count: int = typer.Option(10, "--count", "-c", help="Nombre total de vidéos"),
     theme: Optional[str] = typer.Option(None, "--theme", "-t", help="Thème spécifique"),
     no_upload: bool = typer.Option(False, "--no-upload", help="Ne pas uploader"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Pipeline concurrent : workers par étape réseau (0 = séquentiel)"),
+    cpu_workers: Optional[int] = typer.Option(None, "--cpu-workers", help="Workers par étape CPU (défaut : config)"),
+    timing: Optional[str] = typer.Option(None, "--timing", help=TIMING_HELP),
 ):
     """Produit un batch de vidéos avec distribution automatique."""
     from src.pipeline.orchestrator import ContentOrchestrator
 
+    _set_subtitle_timing(timing)
+
     # Distribution proportionnelle
     distribution = {
         VideoFormat.SCANDALE: max(1, int(count * 0.22)),
@@ -121,29 +150,61 @@ def batch(
         console.print(f"  {fmt.value}: {n}")
 
     orchestrator = ContentOrchestrator()
-    orchestrator.produce_batch(distribution, theme=theme, upload=not no_upload)
+    orchestrator.produce_batch(
+        distribution, theme=theme, upload=not no_upload, workers=workers, cpu_workers=cpu_workers
+    )
 
 
 @app.command()
 def weekly(
     no_upload: bool = typer.Option(False, "--no-upload", help="Ne pas uploader"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Pipeline concurrent : workers par étape réseau (0 = séquentiel)"),
+    cpu_workers: Optional[int] = typer.Option(None, "--cpu-workers", help="Workers par étape CPU (défaut : config)"),
+    timing: Optional[str] = typer.Option(None, "--timing", help=TIMING_HELP),
 ):
     """Produit le contenu d'une semaine (30 vidéos)."""
     from src.pipeline.orchestrator import ContentOrchestrator
 
+    _set_subtitle_timing(timing)
+
     orchestrator = ContentOrchestrator()
-    orchestrator.produce_weekly(upload=not no_upload)
+    orchestrator.produce_weekly(upload=not no_upload, workers=workers, cpu_workers=cpu_workers)
 
 
 @app.command()
 def weekly_v2(
     no_upload: bool = typer.Option(False, "--no-upload", help="Ne pas uploader sur Drive"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Pipeline concurrent : workers par étape réseau (0 = séquentiel)"),
+    cpu_workers: Optional[int] = typer.Option(None, "--cpu-workers", help="Workers par étape CPU (défaut : config)"),
+    timing: Optional[str] = typer.Option(None, "--timing", help=TIMING_HELP),
 ):
     """Produit une semaine : 7 blocs de 4 vidéos + 1 carrousel (35 pièces)."""
     from src.pipeline.orchestrator import ContentOrchestrator
 
+    _set_subtitle_timing(timing)
+
+    orchestrator = ContentOrchestrator()
+    orchestrator.produce_weekly_v2(upload=not no_upload, workers=workers, cpu_workers=cpu_workers)
+
+
+@app.command()
+def resume(
+    batch_id: str = typer.Argument(..., help="ID du batch (voir outputs/batches/)"),
+    no_upload: bool = typer.Option(False, "--no-upload", help="Ne pas uploader, même si le batch initial le faisait"),
+    workers: int = typer.Option(0, "--workers", "-w", help="Pipeline concurrent : workers par étape réseau (0 = séquentiel)"),
+    cpu_workers: Optional[int] = typer.Option(None, "--cpu-workers", help="Workers par étape CPU (défaut : config)"),
+):
+    """Reprend un batch interrompu : seules les étapes non terminées sont relancées."""
+    from src.pipeline.orchestrator import ContentOrchestrator
+
     orchestrator = ContentOrchestrator()
-    orchestrator.produce_weekly_v2(upload=not no_upload)
+    try:
+        orchestrator.resume_batch(
+            batch_id, upload=False if no_upload else None, workers=workers, cpu_workers=cpu_workers
+        )
+    except (FileNotFoundError, ValueError) as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
 
 
 @app.command()
@@ -244,6 +305,152 @@ def clean(
         console.print("\n[bold green]Nettoyage terminé[/bold green]")
 
 
+@app.command()
+def whisper_server(
+    models: Optional[list[str]] = typer.Option(None, "--model", "-m", help="Modèle(s) Whisper à précharger (défaut : premier de la cascade)"),
+    socket_path: Optional[Path] = typer.Option(None, "--socket", help="Socket Unix (défaut : config)"),
+    engine: Optional[str] = typer.Option(None, "--engine", "-e", help="Moteur : openai-whisper ou faster-whisper (défaut : WHISPER_ENGINE)"),
+):
+    """Lance le service de transcription Whisper résident (modèle chargé une fois)."""
+    from src.video.composer import whisper_tiers
+    from src.video.transcription import serve
+
+    models = models or whisper_tiers()[:1]
+
+    try:
+        serve(models, socket_path, engine or "")
+    except (RuntimeError, ValueError) as e:
+        console.print(f"[red]{e}[/red]")
+        raise typer.Exit(1)
+
+
+@backgrounds_app.command("normalize")
+def backgrounds_normalize(
+    force: bool = typer.Option(False, "--force", help="Retranscoder même les fonds déjà normalisés"),
+):
+    """Transcode chaque fond une fois en mezzanine 1080x1920, fps fixe, GOP court."""
+    from src.video.backgrounds import mezzanine_library
+
+    stats = mezzanine_library.normalize(force=force)
+
+    table = Table(title="Fonds mezzanine")
+    table.add_column("Résultat", style="cyan")
+    table.add_column("Fonds", justify="right")
+    table.add_row("Normalisés", str(stats["normalized"]))
+    table.add_row("Déjà à jour", str(stats["skipped"]))
+    table.add_row("Échecs", f"[red]{stats['failed']}[/red]" if stats["failed"] else "0")
+    console.print(table)
+    console.print(f"[dim]Manifeste : {mezzanine_library.manifest_path}[/dim]")
+
+
+@backgrounds_app.command("prefetch")
+def backgrounds_prefetch(
+    format: Optional[list[str]] = typer.Option(None, "--format", "-f", help="Format(s) à précharger (tous par défaut)"),
+    quota: Optional[int] = typer.Option(None, "--quota", "-q", help="Fonds par format (défaut : PEXELS_PREFETCH_PER_FORMAT)"),
+):
+    """Remplit le cache Pexels de chaque format jusqu'au quota."""
+    from src.video.prefetch import prefetch_backgrounds
+
+    if not settings.pexels_api_key:
+        console.print("[red]PEXELS_API_KEY manquante dans .env[/red]")
+        raise typer.Exit(1)
+
+    counts = prefetch_backgrounds(format, quota)
+
+    table = Table(title="Préchargement Pexels")
+    table.add_column("Format", style="cyan")
+    table.add_column("Ajoutés", justify="right")
+    table.add_column("En cache", justify="right")
+    for fmt, added in counts.items():
+        cached = len(list((settings.pexels_cache_dir / fmt).glob("*.mp4")))
+        table.add_row(fmt, str(added), str(cached))
+    console.print(table)
+
+
+@bench_app.command("render")
+def bench_render(
+    cores: str = typer.Option("1,2,4,8", "--cores", "-c", help="Nombres de cœurs à tester (séparés par des virgules)"),
+    duration: float = typer.Option(28.0, "--duration", "-d", help="Durée de la vidéo de test (secondes)"),
+    runs: int = typer.Option(2, "--runs", "-r", help="Essais par mesure (meilleur temps retenu)"),
+):
+    """Compare le rendu en un passage et le rendu par tranches selon le nombre de cœurs."""
+    import os
+    from src.benchmarks.render import benchmark_chunked, print_results
+
+    available = os.cpu_count() or 1
+    core_counts = sorted({min(int(c), available) for c in cores.split(",") if c.strip()})
+    results = benchmark_chunked(core_counts, duration=duration, runs=runs)
+    print_results(results, duration)
+
+
+@bench_app.command("encode")
+def bench_encode(
+    presets: str = typer.Option("ultrafast,veryfast,faster,medium", "--presets", "-p", help="Presets x264 (séparés par des virgules)"),
+    crfs: str = typer.Option("20,23,26", "--crf", help="Valeurs de CRF"),
+    threads: str = typer.Option("0", "--threads", "-t", help="Threads par encodage (0 = automatique)"),
+    videos: int = typer.Option(3, "--videos", "-n", help="Vidéos de référence (les plus récentes)"),
+    seconds: float = typer.Option(15.0, "--seconds", "-s", help="Durée encodée par vidéo"),
+    bandwidth: Optional[float] = typer.Option(None, "--bandwidth", "-b", help="Débit montant simulé (Mbit/s)"),
+    min_ssim: float = typer.Option(0.97, "--min-ssim", help="SSIM minimale du profil retenu"),
+    apply: bool = typer.Option(False, "--apply", help="Écrire le profil gagnant dans .env"),
+):
+    """Compare preset × CRF × threads (temps, taille, SSIM/PSNR, envoi) et retient le meilleur."""
+    from src.benchmarks.encode import apply_winner, benchmark_encodes, pick_winner, print_results
+
+    bandwidth = bandwidth or settings.upload_bandwidth_mbps
+    results = benchmark_encodes(
+        [p.strip() for p in presets.split(",") if p.strip()],
+        [int(c) for c in crfs.split(",") if c.strip()],
+        [int(t) for t in threads.split(",") if t.strip()],
+        videos=videos, seconds=seconds, bandwidth_mbps=bandwidth,
+    )
+    winner = pick_winner(results, min_ssim)
+    print_results(results, winner, bandwidth)
+    if winner is None:
+        console.print("[red]Aucune mesure exploitable[/red]")
+        raise typer.Exit(1)
+    if apply:
+        apply_winner(winner)
+
+
+@bench_app.command("transcribe")
+def bench_transcribe(
+    clips: int = typer.Option(8, "--clips", "-n", help="Pistes voix à transcrire (les plus récentes)"),
+    model: str = typer.Option("tiny", "--model", "-m", help="Modèle Whisper"),
+    batch_sizes: str = typer.Option("4,8", "--batch", "-b", help="Tailles de lot à tester"),
+):
+    """Compare la transcription clip par clip et en lot (clips par minute)."""
+    from src.benchmarks.transcription import benchmark_batched, print_results, reference_audio
+
+    audio = reference_audio(clips)
+    if len(audio) < 2:
+        console.print("[red]Il faut au moins 2 pistes dans outputs/audio/[/red]")
+        raise typer.Exit(1)
+    sizes = [int(b) for b in batch_sizes.split(",") if b.strip()]
+    print_results(benchmark_batched(audio, model, sizes), model)
+
+
+@bench_app.command("engines")
+def bench_engines(
+    clips: int = typer.Option(8, "--clips", "-n", help="Pistes voix avec leur script (les plus récentes)"),
+    model: str = typer.Option("base", "--model", "-m", help="Modèle Whisper"),
+    engines: str = typer.Option("openai-whisper,faster-whisper", "--engines", "-e", help="Moteurs à comparer (le premier sert de référence)"),
+):
+    """Compare les moteurs de transcription : latence, mémoire, qualité de l'alignement."""
+    from src.benchmarks.transcription import benchmark_engines, print_engine_results, scripted_audio
+
+    pairs = scripted_audio(clips)
+    if not pairs:
+        console.print("[red]Aucune piste de outputs/audio/ n'a son script dans outputs/scripts/[/red]")
+        raise typer.Exit(1)
+    names = [e.strip() for e in engines.split(",") if e.strip()]
+    results = benchmark_engines(pairs, names, model)
+    if not results:
+        console.print("[red]Aucun moteur n'a pu tourner[/red]")
+        raise typer.Exit(1)
+    print_engine_results(results, model, len(pairs))
+
+
 @app.command()
 def hybrid_test():
     """POC: Test rendu hybride avatar + B-roll"""
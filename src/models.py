@@ -83,6 +83,15 @@ class Script(BaseModel):
         return f"https://t.me/{settings.telegram_bot_username}"
 
 
+class SubtitleSegment(BaseModel):
+    """Segment de sous-titre avec timing."""
+
+    index: int
+    start_time: float  # en secondes
+    end_time: float
+    text: str
+
+
 class AudioFile(BaseModel):
     """Fichier audio généré."""
 
@@ -91,18 +100,13 @@ class AudioFile(BaseModel):
     path: Path
     duration: float = Field(description="Durée en secondes")
     voice_name: str
+    timed_segments: list[SubtitleSegment] = Field(
+        default_factory=list,
+        description="Phrases horodatées par le TTS (marks SSML), vide si non disponible",
+    )
     created_at: datetime = Field(default_factory=datetime.now)
 
 
-class SubtitleSegment(BaseModel):
-    """Segment de sous-titre avec timing."""
-
-    index: int
-    start_time: float  # en secondes
-    end_time: float
-    text: str
-
-
 class Subtitles(BaseModel):
     """Sous-titres complets."""
 
@@ -110,6 +114,33 @@ class Subtitles(BaseModel):
     audio_id: str
     segments: list[SubtitleSegment]
     srt_path: Optional[Path] = None
+    whisper_model: Optional[str] = Field(default=None, description="Modèle Whisper retenu dans la cascade (None : timings TTS)")
+    whisper_attempts: int = Field(default=0, description="Modèles essayés avant d'atteindre le seuil de confiance")
+    alignment_confidence: Optional[float] = Field(default=None, description="Score d'alignement du texte sur l'audio (0-1)")
+
+
+class OutputProfile(BaseModel):
+    """Profil d'encodage d'une variante de sortie."""
+
+    name: str
+    width: int = 1080
+    height: int = 1920
+    crf: Optional[int] = Field(default=None, description="Qualité constante (ignorée si video_bitrate est fixé, ENCODE_CRF si absente)")
+    video_bitrate: Optional[str] = Field(default=None, description="Débit vidéo cible, ex. '6M'")
+    max_bitrate: Optional[str] = Field(default=None, description="Plafond de débit (VBV), ex. '8M'")
+    audio_bitrate: Optional[str] = Field(default=None, description="Débit AAC (VOICE_AUDIO_BITRATE si absent : piste voix copiée)")
+    preset: Optional[str] = Field(default=None, description="Preset x264 (ENCODE_PRESET si absent)")
+    faststart: bool = True
+
+
+# Profils disponibles (OUTPUT_PROFILES=master,tiktok,...), le premier est la sortie principale
+OUTPUT_PROFILES = {
+    "master": OutputProfile(name="master"),
+    "tiktok": OutputProfile(name="tiktok", crf=21, max_bitrate="10M"),
+    "reels": OutputProfile(name="reels", crf=None, video_bitrate="5M", max_bitrate="6M", audio_bitrate="128k"),
+    "shorts": OutputProfile(name="shorts", crf=19, max_bitrate="12M"),
+    "proxy": OutputProfile(name="proxy", width=540, height=960, crf=30, audio_bitrate="96k"),
+}
 
 
 class Video(BaseModel):
@@ -120,6 +151,7 @@ class Video(BaseModel):
     audio: Optional[AudioFile] = None
     subtitles: Optional[Subtitles] = None
     video_path: Optional[Path] = None
+    variants: dict[str, Path] = Field(default_factory=dict, description="Chemin de chaque variante, par profil")
     background_path: Optional[Path] = None
     thumbnail_path: Optional[Path] = None
     status: VideoStatus = VideoStatus.DRAFT
@@ -0,0 +1,170 @@
+"""
+Journal de batch sur disque, pour reprendre un batch interrompu.
+
+Un fichier JSONL par batch (outputs/batches/<batch_id>.jsonl) :
+- une ligne "plan" avec la liste des vidéos à produire
+- une ligne par vidéo et par étape (started / done / failed), avec les
+  chemins des artefacts et le modèle produit (Script, AudioFile, ...)
+
+Chaque ligne est écrite puis fsync : un crash (OOM Whisper, timeout ffmpeg,
+mise en veille) ne perd au pire que l'étape en cours.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from rich.console import Console
+
+from src.config import settings
+from src.models import AudioFile, Script, Subtitles, Video
+from src.pipeline.staged import PieceJob
+
+console = Console()
+
+# Ordre des étapes et attribut du job produit par chacune
+STAGE_FIELDS = {
+    "script": "script",
+    "voice": "audio",
+    "subtitles": "subtitles",
+    "compose": "video",
+    "upload": "video",
+}
+
+STAGE_MODELS = {
+    "script": Script,
+    "voice": AudioFile,
+    "subtitles": Subtitles,
+    "compose": Video,
+    "upload": Video,
+}
+
+
+def journal_dir() -> Path:
+    return settings.output_dir / "batches"
+
+
+def _artifacts(job: PieceJob, stage: str) -> dict[str, str]:
+    """Chemins des fichiers produits par une étape."""
+    if stage == "script" and job.script:
+        return {"script": str(settings.output_dir / "scripts" / job.script.filename)}
+    if stage == "voice" and job.audio:
+        return {"audio": str(job.audio.path)}
+    if stage == "subtitles" and job.subtitles and job.subtitles.srt_path:
+        return {"srt": str(job.subtitles.srt_path)}
+    if stage in ("compose", "upload") and job.video and job.video.video_path:
+        return {"video": str(job.video.video_path)}
+    return {}
+
+
+class BatchJournal:
+    """Journal append-only d'un batch."""
+
+    def __init__(self, batch_id: str):
+        self.batch_id = batch_id
+        self.path = journal_dir() / f"{batch_id}.jsonl"
+        self._lock = threading.Lock()
+
+    def _append(self, record: dict) -> None:
+        record["ts"] = datetime.now().isoformat()
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    @classmethod
+    def create(cls, batch_id: str, kind: str, jobs: list[PieceJob], upload: bool) -> "BatchJournal":
+        """Ouvre un nouveau journal et y écrit le plan du batch."""
+        journal = cls(batch_id)
+        journal._append({
+            "type": "plan",
+            "batch_id": batch_id,
+            "kind": kind,
+            "upload": upload,
+            "pieces": [
+                job.model_dump(mode="json", include={"index", "format", "theme", "voice_name", "prefix"})
+                for job in jobs
+            ],
+        })
+        console.print(f"[dim]Journal : {journal.path} (reprise : content-engine resume {batch_id})[/dim]")
+        return journal
+
+    def record(self, job: PieceJob, stage: str, status: str) -> None:
+        """Consigne le passage d'une vidéo dans une étape."""
+        record = {"type": "stage", "piece": job.index, "stage": stage, "status": status}
+        if status == "done":
+            record["artifacts"] = _artifacts(job, stage)
+            produced = getattr(job, STAGE_FIELDS[stage], None)
+            if produced is not None:
+                record["data"] = produced.model_dump(mode="json")
+        elif status == "failed":
+            record["error"] = job.error
+        self._append(record)
+
+    def load(self) -> tuple[dict, list[PieceJob]]:
+        """
+        Relit le journal et reconstruit les jobs.
+
+        Une étape n'est considérée faite que si ses artefacts existent encore
+        et que toutes les étapes précédentes le sont aussi.
+
+        Returns:
+            Tuple (plan, jobs)
+        """
+        if not self.path.exists():
+            raise FileNotFoundError(f"Journal introuvable : {self.path}")
+
+        plan = None
+        done: dict[int, dict[str, dict]] = {}
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Dernière ligne tronquée par un crash
+                    continue
+                if record.get("type") == "plan":
+                    plan = record
+                elif record.get("status") == "done":
+                    done.setdefault(record["piece"], {})[record["stage"]] = record
+                elif record.get("status") in ("started", "failed"):
+                    # Une étape refaite invalide le résultat précédent
+                    done.get(record["piece"], {}).pop(record["stage"], None)
+
+        if plan is None:
+            raise ValueError(f"Journal sans plan : {self.path}")
+
+        jobs = []
+        for piece in plan["pieces"]:
+            job = PieceJob(**piece)
+            for stage, field in STAGE_FIELDS.items():
+                record = done.get(job.index, {}).get(stage)
+                if record is None or not self._artifacts_exist(job, record):
+                    break
+                setattr(job, field, STAGE_MODELS[stage].model_validate(record["data"]))
+                job.completed_stages.append(stage)
+            jobs.append(job)
+        return plan, jobs
+
+    @staticmethod
+    def _artifacts_exist(job: PieceJob, record: dict) -> bool:
+        if "data" not in record:
+            return False
+        for path in record.get("artifacts", {}).values():
+            path = Path(path)
+            if path.exists():
+                continue
+            # Vidéo renommée avec son préfixe avant un upload interrompu
+            prefixed = path.parent / f"{job.prefix}_{path.name}"
+            if job.prefix and record["stage"] == "compose" and prefixed.exists():
+                record["data"]["video_path"] = str(prefixed)
+                continue
+            return False
+        return True
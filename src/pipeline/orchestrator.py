@@ -3,6 +3,7 @@ Orchestrateur du pipeline de production video.
 """
 
 import random
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
@@ -11,8 +12,13 @@ from rich.console import Console
 from src.config import settings
 from src.models import BatchJob, Script, Video, VideoFormat, VideoStatus, WeeklyPlan
 from src.scripts.generator import ScriptGenerator
+from src.pipeline.journal import BatchJournal
+from src.pipeline.staged import PieceJob, Stage, StagedBatchRunner
 from src.pipeline.validator import ScriptValidator
 from src.storage.content_store import is_duplicate_script
+from src.utils.scratch import scratch
+from src.video.catalogue import background_catalogue
+from src.video.ffmpeg_runner import encode_stats
 
 console = Console()
 
@@ -76,6 +82,16 @@ class ContentOrchestrator:
         return script
 
     def produce_video(self, format, theme=None, background_image=None, upload=False, voice_engine="google", voice_name=None):
+        script = self._generate_validated_script(format, theme)
+        audio = self.voice_generator.generate_from_script(script, engine=voice_engine, voice_name=voice_name)
+        # Le fond retenu est inscrit dans _used_backgrounds par le composer, dès sa sélection
+        video = self.video_pipeline.process(script, audio, background_image, used_backgrounds=self._used_backgrounds)
+        if upload:
+            self.gdrive.upload_video(video)
+        return video
+
+    def _generate_validated_script(self, format, theme=None) -> Script:
+        """Génère un script validé (qualité + anti-doublon), avec une seconde chance."""
         script = self.script_generator.generate(format, theme)
         self.script_generator.save_script(script)
         if settings.tracking_enabled:
@@ -98,18 +114,168 @@ class ContentOrchestrator:
                     f"Script rejeté 2 fois ({reason}). "
                     f"Derniers problèmes : {validation.issues}. Publication annulée."
                 )
+        return script
 
-        audio = self.voice_generator.generate_from_script(script, engine=voice_engine, voice_name=voice_name)
-        video = self.video_pipeline.process(script, audio, background_image, used_backgrounds=self._used_backgrounds)
-        if video.video_path:
-            self._used_backgrounds.append(str(video.video_path))
+    # ══════════════════════════════════════════════════════
+    # ÉTAPES DU BATCH
+    # ══════════════════════════════════════════════════════
+
+    def _stage_script(self, job: PieceJob, context=None):
+        job.script = self._generate_validated_script(job.format, job.theme)
+
+    def _stage_voice(self, job: PieceJob, context=None):
+        job.audio = self.voice_generator.generate_from_script(job.script, voice_name=job.voice_name)
+
+    def _stage_subtitles(self, job: PieceJob, subtitle_generator=None):
+        job.subtitles = self.video_pipeline.generate_subtitles(job.script, job.audio, subtitle_generator)
+
+    def _stage_subtitles_batch(self, jobs: list[PieceJob], subtitle_generator=None) -> dict[int, Exception]:
+        """Sous-titres de tous les jobs en attente, transcrits en lot ; erreurs par job."""
+        subtitles, failures = self.video_pipeline.generate_subtitles_batch(
+            [(job.script, job.audio) for job in jobs], subtitle_generator
+        )
+        for i, subs in subtitles.items():
+            jobs[i].subtitles = subs
+        return {jobs[i].index: error for i, error in failures.items()}
+
+    def _stage_compose(self, job: PieceJob, context=None):
+        # Montages parallèles : le composer choisit et réserve le fond sous verrou
+        job.video = self.video_pipeline.render(
+            job.script, job.audio, job.subtitles, used_backgrounds=self._used_backgrounds
+        )
+
+    def _stage_upload(self, job: PieceJob, context=None):
+        video = job.video
+        if job.prefix:
+            # Renommer avec préfixe séquentiel pour Drive : sortie principale et chaque variante
+            def prefixed(path: Path) -> Path:
+                if path.name.startswith(f"{job.prefix}_"):
+                    return path
+                new_path = path.with_name(f"{job.prefix}_{path.name}")
+                if path.exists():
+                    path.rename(new_path)
+                return new_path
+
+            renamed = {path: prefixed(path) for path in {*video.variants.values(), video.video_path} if path}
+            video.variants = {name: renamed[path] for name, path in video.variants.items()}
+            if video.video_path:
+                video.video_path = renamed[video.video_path]
+        self.gdrive.upload_video(video)
+
+    def _batch_stages(self, upload: bool, workers: int = 0, cpu_workers: Optional[int] = None) -> list[Stage]:
+        """Construit les étapes du batch. workers = taille des pools I/O (0 = séquentiel)."""
+        io_workers = workers or 1
+        cpu_workers = (cpu_workers or settings.pipeline_cpu_workers) if workers else 1
+
+        def _subtitle_worker():
+            # Un modèle Whisper par worker : l'inférence n'est pas partageable entre threads
+            if cpu_workers == 1:
+                return self.video_pipeline.subtitle_generator
+            from src.video.composer import SimpleSubtitleGenerator
+            return SimpleSubtitleGenerator(tiers=self.video_pipeline.subtitle_generator.tiers)
+
+        stages = [
+            Stage("script", self._stage_script, io_workers),
+            Stage("voice", self._stage_voice, io_workers),
+            Stage(
+                "subtitles", self._stage_subtitles, cpu_workers, init_worker=_subtitle_worker,
+                batch_handler=self._stage_subtitles_batch, batch_size=settings.whisper_batch_size,
+            ),
+            # Chaque montage a son espace de travail : les rendus peuvent tourner en parallèle
+            Stage("compose", self._stage_compose, cpu_workers),
+        ]
         if upload:
-            self.gdrive.upload_video(video)
-        return video
+            stages.append(Stage("upload", self._stage_upload, io_workers))
+        return stages
+
+    def _run_pieces(
+        self, jobs: list[PieceJob], upload=False, workers=0, cpu_workers=None,
+        kind="batch", batch: Optional[BatchJob] = None,
+    ) -> BatchJob:
+        """
+        Fait passer les jobs par toutes les étapes et agrège le résultat dans un BatchJob.
+        Un batch neuf ouvre son journal ; un batch repris complète le sien.
+        """
+        if batch is None:
+            batch = BatchJob(total_count=len(jobs))
+            journal = BatchJournal.create(batch.id, kind, jobs, upload)
+        else:
+            journal = BatchJournal(batch.id)
+
+        if settings.pexels_prefetch_enabled:
+            self._prefetch_backgrounds(jobs)
+
+        scratch.reset_stats()
+        encode_stats.reset_stats()
+
+        runner = StagedBatchRunner(
+            self._batch_stages(upload, workers, cpu_workers),
+            queue_size=settings.pipeline_queue_size,
+            journal=journal,
+        )
+        done = runner.run(jobs) if workers else runner.run_sequential(jobs)
+        # Utilisations des fonds du batch : une seule écriture de l'index
+        background_catalogue.flush()
+
+        for job in done:
+            if job.error is None and job.video is not None:
+                batch.videos.append(job.video)
+                batch.completed_count += 1
+            else:
+                batch.failed_count += 1
+        batch.completed_at = datetime.now()
+        self._report_whisper_tiers(done)
+        scratch.report()
+        encode_stats.report()
+        return batch
 
-    def produce_batch(self, distribution, theme=None, upload=False):
+    def _report_whisper_tiers(self, jobs: list[PieceJob]) -> None:
+        """Modèles Whisper retenus par la cascade sur le batch."""
+        tiers = Counter(job.subtitles.whisper_model for job in jobs if job.subtitles and job.subtitles.whisper_model)
+        if tiers:
+            console.print(f"[dim]Whisper : {', '.join(f'{size} ×{n}' for size, n in tiers.most_common())}[/dim]")
+
+    def _prefetch_backgrounds(self, jobs: list[PieceJob]) -> None:
+        """Pré-phase : remplit le cache Pexels des formats du batch avant le premier montage."""
+        from src.video.prefetch import prefetch_backgrounds
+
+        formats = [job.format.value for job in jobs if "compose" not in job.completed_stages]
+        if formats:
+            prefetch_backgrounds(formats)
+
+    def resume_batch(self, batch_id: str, upload: Optional[bool] = None, workers=0, cpu_workers=None) -> BatchJob:
+        """
+        Reprend un batch interrompu depuis son journal.
+        Les étapes terminées (artefacts présents) sont sautées, seules les autres sont relancées.
+        """
+        plan, jobs = BatchJournal(batch_id).load()
+        if upload is None:
+            upload = plan.get("upload", False)
+
+        stages = [s.name for s in self._batch_stages(upload)]
+        remaining = [j for j in jobs if not all(name in j.completed_stages for name in stages)]
+        console.print(
+            f"[bold cyan]Reprise du batch {batch_id} ({plan.get('kind')}) : "
+            f"{len(jobs) - len(remaining)}/{len(jobs)} vidéos déjà terminées[/bold cyan]"
+        )
+        for job in remaining:
+            done = ", ".join(job.completed_stages) or "aucune étape"
+            console.print(f"  [dim]{job.label} [{job.format.value}] : {done}[/dim]")
+
+        # Fonds des montages déjà faits : les vidéos restantes ne doivent pas les reprendre
+        self._used_backgrounds.extend(
+            str(job.video.background_path) for job in jobs if job.video and job.video.background_path
+        )
+
+        batch = BatchJob(id=batch_id, total_count=len(jobs))
+        batch = self._run_pieces(jobs, upload=upload, workers=workers, cpu_workers=cpu_workers, batch=batch)
+
+        console.print(f"\n[bold green]{'═' * 50}[/bold green]")
+        console.print(f"[bold green]Reprise terminée : {batch.completed_count}/{len(jobs)} réussies, {batch.failed_count} échecs[/bold green]")
+        return batch
+
+    def produce_batch(self, distribution, theme=None, upload=False, workers=0, cpu_workers=None):
         total = sum(distribution.values())
-        batch = BatchJob(total_count=total)
 
         # Construire une liste plate de formats puis mélanger l'ordre
         format_list = []
@@ -144,18 +310,11 @@ class ContentOrchestrator:
                 voices_for_batch.append(voice)
                 used_in_batch.add(voice)
 
-        for video_number, fmt in enumerate(format_list, 1):
-            voice = voices_for_batch[video_number - 1]
-
-            console.print(f"\n[bold]═══ Vidéo {video_number}/{total} [{fmt.value}] voix={voice.split('-')[-1]} ═══[/bold]")
-
-            try:
-                video = self.produce_video(format=fmt, theme=theme, upload=upload, voice_name=voice)
-                batch.videos.append(video)
-                batch.completed_count += 1
-            except Exception as e:
-                batch.failed_count += 1
-                console.print(f"[red]✗ Échec vidéo {video_number}: {e}[/red]")
+        jobs = [
+            PieceJob(index=video_number, format=fmt, theme=theme, voice_name=voices_for_batch[video_number - 1])
+            for video_number, fmt in enumerate(format_list, 1)
+        ]
+        batch = self._run_pieces(jobs, upload=upload, workers=workers, cpu_workers=cpu_workers)
 
         # Résumé diversité
         console.print(f"\n[bold green]{'═' * 50}[/bold green]")
@@ -169,7 +328,7 @@ class ContentOrchestrator:
 
         return batch
 
-    def produce_weekly(self, upload=False):
+    def produce_weekly(self, upload=False, workers=0, cpu_workers=None):
         """
         Produit une semaine complète de contenu (30 vidéos).
         Distribution optimale des formats, ajustée par analytics si disponible.
@@ -196,7 +355,7 @@ class ContentOrchestrator:
             console.print(f"  {fmt.value}: {count}")
         console.print(f"\n[bold]Total : {sum(distribution.values())} vidéos[/bold]\n")
 
-        return self.produce_batch(distribution, upload=upload)
+        return self.produce_batch(distribution, upload=upload, workers=workers, cpu_workers=cpu_workers)
 
     # ══════════════════════════════════════════════════════
     # CARROUSELS
@@ -265,7 +424,7 @@ class ContentOrchestrator:
         console.print(f"[bold green]Batch terminé : {completed}/{total} réussis, {failed} échecs[/bold green]")
         return carousels
 
-    def produce_weekly_v2(self, upload=True):
+    def produce_weekly_v2(self, upload=True, workers=0, cpu_workers=None):
         """
         Produit une semaine : 7 blocs de 4 vidéos + 1 carrousel.
         Total : 28 vidéos + 7 carrousels = 35 pièces.
@@ -348,32 +507,19 @@ class ContentOrchestrator:
             console.print(f"  {idx:02d}. {icon} {fmt.value}")
         console.print()
 
-        completed = 0
-        failed = 0
-
+        jobs = []
         for idx, (kind, fmt) in enumerate(sequence, 1):
             prefix = f"{idx:02d}"
             if kind == "video":
-                console.print(f"\n[bold]═══ {prefix} — Vidéo [{fmt.value}] ═══[/bold]")
-                try:
-                    video = self.produce_video(fmt, upload=False)
-                    if video.video_path and upload:
-                        # Renommer avec préfixe séquentiel pour Drive
-                        new_name = f"{prefix}_{video.video_path.name}"
-                        new_path = video.video_path.parent / new_name
-                        video.video_path.rename(new_path)
-                        video.video_path = new_path
-                        self.gdrive.upload_video(video)
-                    completed += 1
-                except Exception as e:
-                    failed += 1
-                    console.print(f"[red]✗ Échec vidéo {prefix} : {e}[/red]")
+                jobs.append(PieceJob(index=idx, format=fmt, prefix=prefix))
             else:
-                console.print(f"\n[bold]═══ {prefix} — Carrousel [{fmt.value}] ignoré ═══[/bold]")
-                continue
+                console.print(f"[dim]{prefix} — Carrousel [{fmt.value}] ignoré[/dim]")
+
+        batch = self._run_pieces(jobs, upload=upload, workers=workers, cpu_workers=cpu_workers, kind="weekly_v2")
 
         console.print(f"\n[bold green]{'═' * 50}[/bold green]")
-        console.print(f"[bold green]Weekly V2 terminé : {completed}/{len(sequence)} réussis, {failed} échecs[/bold green]")
+        console.print(f"[bold green]Weekly V2 terminé : {batch.completed_count}/{len(sequence)} réussis, {batch.failed_count} échecs[/bold green]")
+        return batch
 
     def _upload_carousel_prefixed(self, carousel, prefix: str):
         """Upload les PNG d'un carrousel avec préfixe séquentiel."""
@@ -0,0 +1,232 @@
+"""
+Pipeline batch par étapes, avec un pool de workers par étape.
+
+Chaque vidéo passe par : script (LLM + validation) → voix (TTS) →
+sous-titres (Whisper) → montage (ffmpeg) → upload (Drive).
+Les vidéos circulent entre les étapes via des files bornées : pendant
+qu'une vidéo est encodée, la suivante est déjà en synthèse vocale.
+"""
+
+import queue
+import threading
+from typing import Any, Callable, Optional
+from pydantic import BaseModel, Field
+from rich.console import Console
+
+from src.models import AudioFile, Script, Subtitles, Video, VideoFormat
+
+console = Console()
+
+# Marqueur de fin de flux entre deux étapes
+_DONE = object()
+
+
+class PieceJob(BaseModel):
+    """Une vidéo du batch et l'avancement de ses étapes."""
+
+    index: int
+    format: VideoFormat
+    theme: Optional[str] = None
+    voice_name: Optional[str] = None
+    prefix: Optional[str] = Field(default=None, description="Préfixe séquentiel pour Drive")
+    script: Optional[Script] = None
+    audio: Optional[AudioFile] = None
+    subtitles: Optional[Subtitles] = None
+    video: Optional[Video] = None
+    completed_stages: list[str] = Field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def label(self) -> str:
+        return self.prefix or f"{self.index:02d}"
+
+
+class Stage:
+    """
+    Une étape du pipeline.
+
+    Args:
+        name: Nom de l'étape (script, voice, subtitles, compose, upload)
+        handler: Fonction (job, context) qui complète le job en place
+        workers: Taille du pool de l'étape
+        init_worker: Fabrique optionnelle d'un contexte propre à chaque worker
+            (ex : un modèle Whisper par thread)
+        batch_handler: Variante optionnelle (jobs, context) traitant plusieurs
+            jobs d'un coup ; en mode pipeliné, un worker vide alors sa file
+            (jusqu'à batch_size jobs) au lieu de prendre les jobs un par un.
+            Retourne les erreurs par job ({index: exception}).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[PieceJob, Any], None],
+        workers: int = 1,
+        init_worker: Optional[Callable[[], Any]] = None,
+        batch_handler: Optional[Callable[[list[PieceJob], Any], dict[int, Exception]]] = None,
+        batch_size: int = 1,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.init_worker = init_worker
+        self.batch_handler = batch_handler
+        self.batch_size = max(1, batch_size) if batch_handler else 1
+
+    def open_context(self) -> tuple[Any, Optional[Exception]]:
+        """Crée le contexte d'un worker ; une erreur fera échouer les jobs de ce worker."""
+        if not self.init_worker:
+            return None, None
+        try:
+            return self.init_worker(), None
+        except Exception as e:
+            return None, e
+
+    def execute(self, job: PieceJob, context: Any = None, journal=None) -> None:
+        """Exécute l'étape si elle n'est pas déjà faite. Les erreurs sont consignées dans le job."""
+        if job.error is not None or self.name in job.completed_stages:
+            return
+        if journal:
+            journal.record(job, self.name, "started")
+        try:
+            self.handler(job, context)
+            job.completed_stages.append(self.name)
+        except Exception as e:
+            job.error = f"{self.name}: {e}"
+            console.print(f"[red]✗ Échec vidéo {job.label} ({self.name}) : {e}[/red]")
+            if journal:
+                journal.record(job, self.name, "failed")
+            return
+        if journal:
+            journal.record(job, self.name, "done")
+
+    def execute_batch(self, jobs: list[PieceJob], context: Any = None, journal=None) -> None:
+        """Exécute l'étape sur plusieurs jobs d'un coup ; en cas d'échec global, job par job."""
+        pending = [j for j in jobs if j.error is None and self.name not in j.completed_stages]
+        if len(pending) < 2 or not self.batch_handler:
+            for job in pending:
+                self.execute(job, context, journal)
+            return
+
+        if journal:
+            for job in pending:
+                journal.record(job, self.name, "started")
+        try:
+            failures = self.batch_handler(pending, context) or {}
+        except Exception as e:
+            console.print(f"[yellow]⚠ Lot {self.name} échoué ({e}), reprise vidéo par vidéo[/yellow]")
+            for job in pending:
+                self.execute(job, context, journal)
+            return
+
+        for job in pending:
+            error = failures.get(job.index)
+            if error is None:
+                job.completed_stages.append(self.name)
+            else:
+                job.error = f"{self.name}: {error}"
+                console.print(f"[red]✗ Échec vidéo {job.label} ({self.name}) : {error}[/red]")
+            if journal:
+                journal.record(job, self.name, "done" if error is None else "failed")
+
+
+class StagedBatchRunner:
+    """Exécute une liste de jobs à travers une suite d'étapes."""
+
+    def __init__(self, stages: list[Stage], queue_size: int = 4, journal=None):
+        self.stages = stages
+        self.queue_size = max(1, queue_size)
+        self.journal = journal
+
+    def run_sequential(self, jobs: list[PieceJob]) -> list[PieceJob]:
+        """Une vidéo après l'autre, toutes étapes confondues (comportement historique)."""
+        contexts = [s.open_context() for s in self.stages]
+        for job in jobs:
+            console.print(f"\n[bold]═══ Vidéo {job.label}/{len(jobs):02d} [{job.format.value}] ═══[/bold]")
+            for stage, (context, init_error) in zip(self.stages, contexts):
+                if init_error is not None and job.error is None:
+                    job.error = f"{stage.name}: {init_error}"
+                stage.execute(job, context, self.journal)
+        return jobs
+
+    def run(self, jobs: list[PieceJob]) -> list[PieceJob]:
+        """Exécution pipelinée : chaque étape consomme la file de la précédente."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        finished: list[PieceJob] = []
+        lock = threading.Lock()
+        alive = [s.workers for s in self.stages]
+
+        def worker(i: int):
+            stage = self.stages[i]
+            try:
+                context, init_error = stage.open_context()
+                closed = False
+                while not closed:
+                    job = queues[i].get()
+                    if job is _DONE:
+                        break
+                    # Étape groupée : on prend aussi les jobs déjà en attente
+                    batch = [job]
+                    while len(batch) < stage.batch_size:
+                        try:
+                            job = queues[i].get_nowait()
+                        except queue.Empty:
+                            break
+                        if job is _DONE:
+                            closed = True
+                            break
+                        batch.append(job)
+
+                    handed: list[PieceJob] = []
+                    try:
+                        for job in batch:
+                            if init_error is not None and job.error is None:
+                                job.error = f"{stage.name}: {init_error}"
+                        if len(batch) == 1:
+                            stage.execute(batch[0], context, self.journal)
+                        else:
+                            stage.execute_batch(batch, context, self.journal)
+
+                        for job in batch:
+                            if job.error is None and i + 1 < len(self.stages):
+                                queues[i + 1].put(job)
+                            else:
+                                with lock:
+                                    finished.append(job)
+                            handed.append(job)
+                    except Exception as e:
+                        # Hors de l'étape elle-même (journal, passage de relais) : le lot échoue, le worker continue
+                        console.print(f"[red]✗ Worker {stage.name} : {e}[/red]")
+                        for job in batch:
+                            if job not in handed:
+                                job.error = job.error or f"{stage.name}: {e}"
+                                with lock:
+                                    finished.append(job)
+            finally:
+                # Le dernier worker d'une étape ferme la file suivante, quoi qu'il arrive
+                with lock:
+                    alive[i] -= 1
+                    last = alive[i] == 0
+                if last and i + 1 < len(self.stages):
+                    for _ in range(self.stages[i + 1].workers):
+                        queues[i + 1].put(_DONE)
+
+        threads = []
+        for i, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                t = threading.Thread(target=worker, args=(i,), name=f"{stage.name}-{n}", daemon=True)
+                t.start()
+                threads.append(t)
+
+        pools = ", ".join(f"{s.name}×{s.workers}" for s in self.stages)
+        console.print(f"[blue]Pipeline concurrent : {pools}[/blue]")
+
+        for job in jobs:
+            queues[0].put(job)
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_DONE)
+
+        for t in threads:
+            t.join()
+
+        return sorted(finished, key=lambda j: j.index)
@@ -0,0 +1,132 @@
+"""
+Cache d'artefacts adressé par contenu.
+
+Chaque étape du pipeline est déterministe : même entrées → même fichier.
+La clé est un SHA-256 des entrées (texte, voix, hash de l'audio, style ASS...),
+l'artefact est rangé dans outputs/cache/<type>/<clé><suffixe>.
+Une étape dont les entrées n'ont pas changé devient une simple copie.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Optional
+from rich.console import Console
+
+from src.config import settings
+
+console = Console()
+
+_file_hashes: dict[tuple, str] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def hash_file(path: Path) -> str:
+    """SHA-256 d'un fichier, mémorisé par (chemin, taille, mtime)."""
+    stat = path.stat()
+    memo_key = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _file_hashes_lock:
+        if memo_key in _file_hashes:
+            return _file_hashes[memo_key]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+
+    with _file_hashes_lock:
+        _file_hashes[memo_key] = value
+    return value
+
+
+def cache_key(*parts: Any) -> str:
+    """Clé de cache à partir d'entrées sérialisables en JSON."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _place(source: Path, dest: Path) -> None:
+    """
+    Copie source vers dest, de façon atomique.
+
+    Jamais de lien dur : les étapes réécrivent leurs sorties en place
+    (ffmpeg -y, open("wb")), ce qui modifierait l'entrée du cache partagée.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        shutil.copy2(source, tmp)
+        os.replace(tmp, dest)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class ArtifactCache:
+    """Magasin d'artefacts : outputs/cache/<kind>/<key><suffix> + métadonnées JSON."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = root
+
+    @property
+    def root(self) -> Path:
+        return self._root or settings.artifact_cache_dir
+
+    @property
+    def enabled(self) -> bool:
+        return settings.artifact_cache_enabled
+
+    def _path(self, kind: str, key: str, suffix: str) -> Path:
+        return self.root / kind / f"{key}{suffix}"
+
+    def fetch(self, kind: str, key: str, suffix: str, dest: Path) -> Optional[dict]:
+        """
+        Restaure un artefact vers dest.
+
+        Returns:
+            Les métadonnées associées (dict, éventuellement vide) si trouvé, None sinon
+        """
+        if not self.enabled:
+            return None
+        cached = self._path(kind, key, suffix)
+        if not cached.exists():
+            return None
+        _place(cached, dest)
+        return self.get_json(kind, key) or {}
+
+    def store(self, kind: str, key: str, source: Path, meta: Optional[dict] = None) -> None:
+        """Range un artefact (et ses métadonnées) dans le cache."""
+        if not self.enabled or not source.exists():
+            return
+        try:
+            _place(source, self._path(kind, key, source.suffix))
+            if meta is not None:
+                self.put_json(kind, key, meta)
+        except OSError as e:
+            console.print(f"[yellow]⚠ Cache artefacts ({kind}) : {e}[/yellow]")
+
+    def get_json(self, kind: str, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        path = self._path(kind, key, ".json")
+        if not path.exists():
+            return None
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+
+    def put_json(self, kind: str, key: str, data: Any) -> None:
+        if not self.enabled:
+            return
+        path = self._path(kind, key, ".json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False, default=str), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+artifact_cache = ArtifactCache()
@@ -0,0 +1,134 @@
+"""
+Espace scratch en RAM pour les intermédiaires de rendu.
+
+Les espaces de travail des jobs (fond préparé, ASS, segments hybrides...)
+sont créés de préférence sur un tmpfs (/dev/shm par défaut), dans la limite
+d'un budget RAM (SCRATCH_BUDGET_MB). Un job dont l'estimation dépasserait
+le budget, ou l'espace libre du tmpfs, est placé sur disque (temp/jobs).
+
+Le choix est fait une fois, à la création de l'espace : un job ne migre
+pas vers le disque en cours de route. L'estimation est donc majorée
+(SCRATCH_SAFETY_MARGIN), et les espaces déjà en RAM comptent pour leur
+taille réelle si elle dépasse leur estimation.
+
+Le pic d'occupation (somme des espaces actifs) est suivi pour être reporté
+en fin de batch.
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+
+from src.config import settings
+
+console = Console()
+
+MB = 1024 * 1024
+
+
+def directory_size(path: Path) -> int:
+    """Taille cumulée des fichiers d'un dossier."""
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(root, name)).st_size
+            except FileNotFoundError:
+                continue
+    return total
+
+
+class ScratchManager:
+    """Répartit les espaces de travail entre tmpfs (sous budget) et disque."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._active: dict[Path, int] = {}
+        self._in_ram: set[Path] = set()
+        self.reset_stats()
+
+    @property
+    def ram_root(self) -> Optional[Path]:
+        """Racine tmpfs utilisable, ou None (désactivé, absent, non inscriptible)."""
+        if not settings.scratch_enabled:
+            return None
+        root = settings.scratch_dir
+        if not root.parent.exists():
+            return None
+        try:
+            root.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return None
+        return root if os.access(root, os.W_OK) else None
+
+    @property
+    def disk_root(self) -> Path:
+        return settings.workspace_dir
+
+    @property
+    def budget(self) -> int:
+        return settings.scratch_budget_mb * MB
+
+    def reset_stats(self) -> None:
+        """Remet à zéro les compteurs (début de batch)."""
+        with self._lock:
+            self.peak_bytes = 0
+            self.peak_ram_bytes = 0
+            self.ram_jobs = 0
+            self.spilled_jobs = 0
+
+    def acquire(self, prefix: str, estimate: int = 0) -> Path:
+        """
+        Crée un espace de travail d'environ `estimate` octets : sur tmpfs si
+        l'estimation majorée tient dans le budget restant et l'espace libre, sinon sur disque.
+        """
+        ram_root = self.ram_root
+        needed = int(estimate * settings.scratch_safety_margin)
+        with self._lock:
+            root = self.disk_root
+            if ram_root is not None:
+                # Occupation réelle des espaces en RAM, si elle dépasse déjà leur estimation
+                reserved = sum(max(self._active[p], directory_size(p)) for p in self._in_ram)
+                if reserved + needed <= self.budget and needed < shutil.disk_usage(ram_root).free:
+                    root = ram_root
+            root.mkdir(parents=True, exist_ok=True)
+            path = Path(tempfile.mkdtemp(prefix=prefix, dir=root))
+
+            self._active[path] = estimate
+            if root == ram_root:
+                self._in_ram.add(path)
+                self.ram_jobs += 1
+            else:
+                self.spilled_jobs += 1
+            self._update_peak()
+            return path
+
+    def release(self, path: Path) -> None:
+        """Mesure l'espace (taille réelle, avant suppression) puis le retire des actifs."""
+        size = directory_size(path) if path.exists() else 0
+        with self._lock:
+            self._active[path] = max(self._active.get(path, 0), size)
+            self._update_peak()
+            self._active.pop(path, None)
+            self._in_ram.discard(path)
+
+    def _update_peak(self) -> None:
+        self.peak_bytes = max(self.peak_bytes, sum(self._active.values()))
+        self.peak_ram_bytes = max(self.peak_ram_bytes, sum(self._active[p] for p in self._in_ram))
+
+    def report(self) -> None:
+        """Affiche le pic d'occupation depuis le dernier reset."""
+        if not (self.ram_jobs or self.spilled_jobs):
+            return
+        console.print(
+            f"[dim]Scratch : pic {self.peak_bytes / MB:.0f} Mo "
+            f"(RAM {self.peak_ram_bytes / MB:.0f}/{settings.scratch_budget_mb} Mo), "
+            f"{self.ram_jobs} job(s) en RAM, {self.spilled_jobs} sur disque[/dim]"
+        )
+
+
+scratch = ScratchManager()
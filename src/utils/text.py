@@ -0,0 +1,11 @@
+"""
+Découpage de texte partagé entre la voix et les sous-titres.
+"""
+
+import re
+
+
+def split_sentences(text: str) -> list[str]:
+    """Découpe le texte en phrases aux ponctuations (. ! ?)."""
+    sentences = re.split(r'(?<=[.!?])\s+', text.strip())
+    return [s.strip() for s in sentences if s.strip()]
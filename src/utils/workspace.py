@@ -0,0 +1,78 @@
+"""
+Espaces de travail isolés par job.
+
+Chaque rendu écrit ses intermédiaires (fond préparé, image animée, dégradé,
+sous-titres ASS...) dans son propre dossier <racine>/<job_id>_<suffixe>,
+sur tmpfs si le budget scratch le permet, sinon dans temp/jobs. Il est
+supprimé en sortie du bloc, que le rendu réussisse ou échoue. Plusieurs
+montages (threads ou process) peuvent ainsi tourner sur la même machine.
+
+Rétention (WORKSPACE_RETENTION) :
+    never       suppression systématique (défaut)
+    on_failure  conserve l'espace d'un rendu en erreur, pour le débogage
+    always      conserve tout
+Les espaces conservés sont purgés après WORKSPACE_KEEP_HOURS.
+"""
+
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+from rich.console import Console
+
+from src.config import settings
+from src.utils.scratch import scratch
+
+console = Console()
+
+RETENTION_POLICIES = ("never", "on_failure", "always")
+
+
+def prune_workspaces(max_age_hours: Optional[float] = None) -> int:
+    """Supprime les espaces conservés plus vieux que max_age_hours. Retourne leur nombre."""
+    max_age = (settings.workspace_keep_hours if max_age_hours is None else max_age_hours) * 3600
+    now = time.time()
+    removed = 0
+    for root in (settings.workspace_dir, settings.scratch_dir):
+        if not root.exists():
+            continue
+        for path in root.iterdir():
+            try:
+                if path.is_dir() and now - path.stat().st_mtime > max_age:
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except FileNotFoundError:
+                continue
+    return removed
+
+
+@contextmanager
+def job_workspace(job_id: str, retention: Optional[str] = None, estimate: int = 0) -> Iterator[Path]:
+    """
+    Dossier de travail propre à un job, nettoyé selon la politique de rétention.
+    `estimate` (octets) sert à choisir entre tmpfs et disque.
+
+    Usage:
+        with job_workspace(script.id) as work:
+            ass = work / "subs.ass"
+    """
+    policy = retention or settings.workspace_retention
+    if policy not in RETENTION_POLICIES:
+        raise ValueError(f"Politique de rétention inconnue : {policy} ({', '.join(RETENTION_POLICIES)})")
+
+    path = scratch.acquire(f"{job_id}_", estimate)
+
+    failed = False
+    try:
+        yield path
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        scratch.release(path)
+        keep = policy == "always" or (policy == "on_failure" and failed)
+        if keep:
+            console.print(f"[dim]Espace de travail conservé : {path}[/dim]")
+        else:
+            shutil.rmtree(path, ignore_errors=True)
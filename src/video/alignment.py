@@ -0,0 +1,206 @@
+"""
+Alignement forcé du texte du script sur les mots reconnus par Whisper.
+
+Whisper (word_timestamps=True) donne l'horodatage de chaque mot entendu,
+mais son orthographe n'est pas fiable. On aligne donc les mots normalisés
+du script sur les mots reconnus (distance d'édition, programmation
+dynamique vectorisée avec NumPy), puis chaque phrase du script prend le
+début de son premier mot et la fin de son dernier. Les mots du script non
+reconnus sont interpolés entre leurs voisins alignés.
+
+Le texte affiché reste celui du script ; seuls les timings viennent de
+Whisper. Un petit modèle (tiny/base) suffit : une erreur de reconnaissance
+isolée ne décale plus les phrases suivantes.
+"""
+
+import re
+import unicodedata
+from typing import Optional
+import numpy as np
+from pydantic import BaseModel
+
+from src.models import SubtitleSegment
+
+# Débit plausible d'une phrase lue (caractères par seconde) et pause maximale entre phrases
+MIN_CHARS_PER_SECOND = 5.0
+MAX_CHARS_PER_SECOND = 40.0
+MAX_PAUSE = 2.0
+
+# Coûts de la distance d'édition
+SUBSTITUTION = 1.0
+PARTIAL = 0.4       # mots différents mais de même racine (4 premières lettres)
+GAP = 0.7           # mot du script absent de l'audio reconnu, ou mot reconnu en trop
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class ForcedAlignment(BaseModel):
+    """Phrases horodatées et proportion de mots du script retrouvés dans l'audio."""
+
+    segments: list[SubtitleSegment]
+    words_total: int
+    words_matched: int
+
+    @property
+    def match_rate(self) -> float:
+        return self.words_matched / self.words_total if self.words_total else 0.0
+
+
+def normalize_words(text: str) -> list[str]:
+    """Mots en minuscules, sans accents ni ponctuation ("L'été !" → ["l", "ete"])."""
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return _WORD.findall(text)
+
+
+def recognized_words(segments: list[dict]) -> list[dict]:
+    """
+    Mots reconnus {"word", "start", "end"} (normalisés) des segments Whisper.
+    Sans horodatage par mot, la durée du segment est répartie au prorata des lettres.
+    """
+    words = []
+    for seg in segments:
+        if seg.get("words"):
+            for w in seg["words"]:
+                tokens = normalize_words(w.get("word", ""))
+                if not tokens:
+                    continue
+                # "l'été" reconnu comme un mot → plusieurs jetons, même intervalle
+                step = (w["end"] - w["start"]) / len(tokens)
+                words += [
+                    {"word": t, "start": w["start"] + k * step, "end": w["start"] + (k + 1) * step}
+                    for k, t in enumerate(tokens)
+                ]
+            continue
+        tokens = normalize_words(seg.get("text", ""))
+        if not tokens:
+            continue
+        bounds = np.cumsum([0] + [len(t) for t in tokens]) / sum(len(t) for t in tokens)
+        span = seg["end"] - seg["start"]
+        words += [
+            {"word": t, "start": seg["start"] + bounds[k] * span, "end": seg["start"] + bounds[k + 1] * span}
+            for k, t in enumerate(tokens)
+        ]
+    return words
+
+
+def _substitution_costs(script: list[str], heard: list[str]) -> np.ndarray:
+    """Matrice des coûts de substitution (mots identiques, même racine, différents)."""
+    vocab = {w: i for i, w in enumerate(dict.fromkeys(script + heard))}
+    stems = {s: i for i, s in enumerate(dict.fromkeys(w[:4] for w in vocab))}
+    a = np.array([vocab[w] for w in script])
+    b = np.array([vocab[w] for w in heard])
+    a_stem = np.array([stems[w[:4]] for w in script])
+    b_stem = np.array([stems[w[:4]] for w in heard])
+
+    costs = np.full((len(script), len(heard)), SUBSTITUTION)
+    costs[a_stem[:, None] == b_stem[None, :]] = PARTIAL
+    costs[a[:, None] == b[None, :]] = 0.0
+    return costs
+
+
+def align_words(script: list[str], heard: list[str]) -> np.ndarray:
+    """
+    Distance d'édition entre mots du script et mots reconnus.
+
+    Chaque ligne de la matrice est calculée d'un bloc : les termes diagonal
+    et vertical sont vectorisés, et la récurrence horizontale (insertions à
+    coût constant) se ramène à un minimum cumulé.
+
+    Returns:
+        Pour chaque mot du script, l'indice du mot reconnu apparié (-1 sinon)
+    """
+    n, m = len(script), len(heard)
+    matches = np.full(n, -1)
+    if not n or not m:
+        return matches
+
+    sub = _substitution_costs(script, heard)
+    offsets = GAP * np.arange(m + 1)
+    dist = np.empty((n + 1, m + 1))
+    dist[0] = offsets
+    for i in range(1, n + 1):
+        best = np.empty(m + 1)
+        best[0] = dist[i - 1, 0] + GAP
+        best[1:] = np.minimum(dist[i - 1, 1:] + GAP, dist[i - 1, :-1] + sub[i - 1])
+        # dist[i, j] = min_k (best[k] + GAP * (j - k))
+        dist[i] = np.minimum.accumulate(best - offsets) + offsets
+
+    # Remontée : on ne garde que les appariements de coût inférieur à une substitution franche
+    i, j = n, m
+    while i > 0 and j > 0:
+        cost = sub[i - 1, j - 1]
+        if abs(dist[i, j] - (dist[i - 1, j - 1] + cost)) < 1e-9:
+            if cost < SUBSTITUTION:
+                matches[i - 1] = j - 1
+            i, j = i - 1, j - 1
+        elif abs(dist[i, j] - (dist[i - 1, j] + GAP)) < 1e-9:
+            i -= 1
+        else:
+            j -= 1
+    return matches
+
+
+def align_sentences(sentences: list[str], segments: list[dict]) -> Optional[ForcedAlignment]:
+    """
+    Horodate les phrases du script d'après les mots reconnus.
+
+    Returns:
+        None si rien n'est exploitable (aucun mot reconnu ou aucun mot apparié)
+    """
+    per_sentence = [normalize_words(s) for s in sentences]
+    script = [w for words in per_sentence for w in words]
+    heard = recognized_words(segments)
+    if not script or not heard:
+        return None
+
+    matches = align_words(script, [w["word"] for w in heard])
+    matched = np.flatnonzero(matches >= 0)
+    if not len(matched):
+        return None
+
+    # Mots non appariés : interpolés entre les mots alignés voisins (bornés au premier/dernier)
+    starts = np.array([w["start"] for w in heard])[matches[matched]]
+    ends = np.array([w["end"] for w in heard])[matches[matched]]
+    positions = np.arange(len(script))
+    word_start = np.interp(positions, matched, starts)
+    word_end = np.interp(positions, matched, ends)
+
+    aligned = []
+    first = 0
+    previous_end = 0.0
+    for sentence, words in zip(sentences, per_sentence):
+        if not words:
+            continue
+        last = first + len(words) - 1
+        start = max(float(word_start[first]), previous_end)
+        end = max(float(word_end[last]), start + 0.1)
+        aligned.append(SubtitleSegment(
+            index=len(aligned) + 1,
+            start_time=round(start, 3),
+            end_time=round(end, 3),
+            text=sentence,
+        ))
+        previous_end = end
+        first = last + 1
+
+    return ForcedAlignment(segments=aligned, words_total=len(script), words_matched=len(matched))
+
+
+def alignment_confidence(alignment: ForcedAlignment, segments: list[dict], sentence_count: int) -> float:
+    """
+    Confiance (0-1) dans un alignement :
+    - 60 % : proportion des mots du script retrouvés dans l'audio
+    - 25 % : timings plausibles (débit de lecture, pas de longue pause entre phrases)
+    - 15 % : accord entre nombre de segments Whisper et nombre de phrases
+    """
+    aligned = alignment.segments
+    if not aligned:
+        return 0.0
+    rates = np.array([len(s.text) / max(s.end_time - s.start_time, 1e-3) for s in aligned])
+    plausible = np.mean((rates >= MIN_CHARS_PER_SECOND) & (rates <= MAX_CHARS_PER_SECOND))
+    pauses = np.array([b.start_time - a.end_time for a, b in zip(aligned, aligned[1:])])
+    paced = np.mean(pauses <= MAX_PAUSE) if len(pauses) else 1.0
+    counts = sorted((len(segments), sentence_count))
+    agreement = counts[0] / counts[1] if counts[1] else 0.0
+    return float(0.6 * alignment.match_rate + 0.25 * (plausible + paced) / 2 + 0.15 * agreement)
@@ -0,0 +1,197 @@
+"""
+Bibliothèque de fonds "mezzanine".
+
+Chaque fond (assets/backgrounds, cache Pexels) est transcodé une seule fois
+en 1080x1920, fps fixe, GOP court (une image clé par seconde). Le montage
+d'une vidéo se réduit alors à un découpage bon marché + l'incrustation des
+sous-titres, sans redimensionner la source à chaque encodage.
+
+Le manifeste (assets/mezzanine/manifest.json) garde pour chaque fond :
+source, durée, catégories et positions des images clés.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+
+from src.config import settings
+from src.video.ffmpeg_runner import run_ffmpeg
+from src.video.mediainfo import media_info
+
+console = Console()
+
+LOCAL_VIDEO_CATEGORIES = {
+    "scandale": ["road", "highway", "traffic", "radar"],
+    "tuto": ["document", "paper", "phone", "desk"],
+    "temoignage": ["happy", "relief", "car", "driver"],
+    "mythe": ["thinking", "question", "idea"],
+    "chiffre_choc": ["money", "euro", "wallet", "cash"],
+    "story_pov": ["road", "highway", "car", "driver", "traffic"],
+    "debunk": ["thinking", "question", "idea", "road"],
+    "cas_reel": ["road", "highway", "traffic", "radar", "car"],
+}
+
+MANIFEST_NAME = "manifest.json"
+
+
+def background_categories(path: Path, format_dir: Optional[str] = None) -> list[str]:
+    """Formats auxquels un fond convient (dossier de cache Pexels ou mots-clés du nom)."""
+    if format_dir:
+        return [format_dir]
+    stem = path.stem.lower()
+    return [fmt for fmt, words in LOCAL_VIDEO_CATEGORIES.items() if any(w in stem for w in words)]
+
+
+def background_sources() -> list[tuple[Path, Optional[str]]]:
+    """Fonds bruts disponibles : (chemin, format du dossier de cache Pexels ou None)."""
+    sources: list[tuple[Path, Optional[str]]] = []
+    local_dir = settings.assets_dir / "backgrounds"
+    if local_dir.exists():
+        sources.extend((p, None) for p in sorted(local_dir.glob("*.mp4")))
+    if settings.pexels_cache_dir.exists():
+        for format_dir in sorted(d for d in settings.pexels_cache_dir.iterdir() if d.is_dir()):
+            sources.extend((p, format_dir.name) for p in sorted(format_dir.glob("*.mp4")))
+    return sources
+
+
+class MezzanineLibrary:
+    """Fonds normalisés et leur manifeste."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self._root = root
+        self._manifest: Optional[dict] = None
+        self._manifest_mtime: Optional[float] = None
+
+    @property
+    def root(self) -> Path:
+        return self._root or settings.mezzanine_dir
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    @property
+    def manifest(self) -> dict:
+        """Entrées du manifeste, indexées par chemin source (rechargé si modifié sur disque)."""
+        mtime = self.manifest_path.stat().st_mtime if self.manifest_path.exists() else None
+        if self._manifest is None or mtime != self._manifest_mtime:
+            self._manifest = {}
+            if mtime is not None:
+                try:
+                    self._manifest = json.loads(self.manifest_path.read_text(encoding="utf-8"))
+                except json.JSONDecodeError:
+                    console.print(f"[yellow]⚠ Manifeste mezzanine illisible : {self.manifest_path}[/yellow]")
+            self._manifest_mtime = mtime
+        return self._manifest
+
+    def save(self) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.manifest, indent=2, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.manifest_path)
+        self._manifest_mtime = self.manifest_path.stat().st_mtime
+
+    def is_mezzanine(self, path: Path) -> bool:
+        return path.parent.resolve() == self.root.resolve()
+
+    def entry_for(self, source: Path) -> Optional[dict]:
+        """Entrée à jour (source inchangée, mezzanine présente) pour un fond brut."""
+        entry = self.manifest.get(str(source))
+        if not entry or not source.exists():
+            return None
+        stat = source.stat()
+        if entry.get("source_size") != stat.st_size or entry.get("source_mtime") != stat.st_mtime:
+            return None
+        if not Path(entry["path"]).exists():
+            return None
+        return entry
+
+    def keyframes_of(self, path: Path) -> Optional[list[float]]:
+        """Images clés d'une mezzanine d'après le manifeste (None si ce n'en est pas une)."""
+        if not self.is_mezzanine(path):
+            return None
+        for entry in self.manifest.values():
+            if Path(entry["path"]).name == path.name:
+                return entry.get("keyframes")
+        return None
+
+    def source_of(self, path: Path) -> Path:
+        """Fond brut d'où vient une mezzanine (le chemin lui-même sinon)."""
+        if not self.is_mezzanine(path):
+            return path
+        for entry in self.manifest.values():
+            if Path(entry["path"]).name == path.name:
+                return Path(entry["source"])
+        return path
+
+    def lookup(self, source: Path) -> Optional[Path]:
+        """Mezzanine d'un fond brut, si elle existe et est à jour."""
+        if not settings.mezzanine_enabled:
+            return None
+        entry = self.entry_for(source)
+        return Path(entry["path"]) if entry else None
+
+    def normalize(self, force: bool = False) -> dict[str, int]:
+        """Transcode chaque fond brut absent ou modifié depuis le dernier passage."""
+        stats = {"normalized": 0, "skipped": 0, "failed": 0}
+        sources = background_sources()
+        console.print(f"[bold blue]Normalisation de {len(sources)} fonds → {self.root}[/bold blue]")
+
+        for source, format_dir in sources:
+            if not force and self.entry_for(source):
+                stats["skipped"] += 1
+                continue
+
+            digest = hashlib.sha256(str(source).encode()).hexdigest()[:8]
+            dest = self.root / f"{source.stem}_{digest}.mp4"
+            if not self._transcode(source, dest):
+                stats["failed"] += 1
+                continue
+
+            stat = source.stat()
+            self.manifest[str(source)] = {
+                "source": str(source),
+                "source_size": stat.st_size,
+                "source_mtime": stat.st_mtime,
+                "path": str(dest),
+                "duration": media_info.duration(dest),
+                "categories": background_categories(source, format_dir),
+                "width": settings.video_width,
+                "height": settings.video_height,
+                "fps": settings.video_fps,
+                "keyframes": media_info.keyframes(dest),
+            }
+            self.save()
+            stats["normalized"] += 1
+            console.print(f"  [green]✓[/green] {source.name} → {dest.name}")
+
+        # Entrées dont la source a disparu
+        for key in [k for k in self.manifest if not Path(k).exists()]:
+            Path(self.manifest.pop(key)["path"]).unlink(missing_ok=True)
+        self.save()
+        return stats
+
+    def _transcode(self, source: Path, dest: Path) -> bool:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        w, h, fps = settings.video_width, settings.video_height, settings.video_fps
+        gop = max(1, round(fps * settings.mezzanine_gop_seconds))
+        tmp = dest.with_name(f".{dest.name}")
+        result = run_ffmpeg([
+            "-y", "-i", str(source),
+            "-vf", f"scale={w}:{h}:force_original_aspect_ratio=increase,crop={w}:{h},setsar=1,fps={fps},format=yuv420p",
+            "-c:v", "libx264", "-preset", "medium", "-crf", "18",
+            "-g", str(gop), "-keyint_min", str(gop), "-sc_threshold", "0",
+            "-an", "-movflags", "+faststart", "-f", "mp4", str(tmp),
+        ], "backgrounds.normalize", timeout=600)
+        if result.returncode != 0:
+            console.print(f"  [red]✗ {source.name} : {result.stderr[-200:]}[/red]")
+            tmp.unlink(missing_ok=True)
+            return False
+        os.replace(tmp, dest)
+        return True
+
+
+mezzanine_library = MezzanineLibrary()
@@ -0,0 +1,232 @@
+"""
+Catalogue persistant des fonds vidéo.
+
+Un index JSON (cache/backgrounds_index.json) garde pour chaque clip :
+chemin, source (local / pexels), tags de format, durée, résolution,
+dernière utilisation et nombre d'utilisations.
+
+- Rafraîchissement incrémental : un dossier n'est relu que si son mtime a
+  changé, un fichier n'est sondé (media_info) que s'il est nouveau ou modifié.
+- Sélection : files LRU par (source, tag), exclusion par ensemble de noms,
+  le fond le moins récemment utilisé passe en premier.
+- Utilisations : mises à jour en mémoire (sous verrou) à chaque choix,
+  écrites sur disque une fois par batch (flush), et à la sortie du process.
+"""
+
+import atexit
+import json
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Optional
+from rich.console import Console
+
+from src.config import settings
+from src.video.backgrounds import background_categories
+from src.video.mediainfo import media_info
+
+console = Console()
+
+LOCAL = "local"
+PEXELS = "pexels"
+ALL_TAGS = "*"
+
+
+class BackgroundCatalogue:
+    """Index des fonds disponibles, persistant entre les exécutions."""
+
+    def __init__(self, index_path: Optional[Path] = None):
+        self._index_path = index_path
+        self._lock = threading.RLock()
+        self._loaded = False
+        self.entries: dict[str, dict] = {}
+        self.dirs: dict[str, float] = {}
+        self._buckets: dict[tuple[str, str], OrderedDict] = {}
+        self._dirty = False
+
+    @property
+    def index_path(self) -> Path:
+        return self._index_path or settings.background_index_path
+
+    # ── Persistance ────────────────────────────────────────────────
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        if self.index_path.exists():
+            try:
+                data = json.loads(self.index_path.read_text(encoding="utf-8"))
+                self.entries = data.get("entries", {})
+                self.dirs = data.get("dirs", {})
+            except json.JSONDecodeError:
+                console.print(f"[yellow]⚠ Index des fonds illisible, reconstruction : {self.index_path}[/yellow]")
+        self._rebuild_buckets()
+
+    def save(self) -> None:
+        with self._lock:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_suffix(".json.tmp")
+            tmp.write_text(json.dumps({"entries": self.entries, "dirs": self.dirs}), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+            self._dirty = False
+
+    def flush(self) -> None:
+        """Écrit l'index si des utilisations ont été enregistrées depuis la dernière sauvegarde."""
+        with self._lock:
+            if self._dirty:
+                self.save()
+
+    # ── Rafraîchissement ───────────────────────────────────────────
+
+    def _watched_dirs(self) -> list[tuple[Path, str, Optional[str]]]:
+        """Dossiers indexés : (dossier, source, format imposé par le dossier)."""
+        watched = []
+        seen = set()
+        for local_dir in (Path("assets/backgrounds"), settings.assets_dir / "backgrounds"):
+            key = str(local_dir.resolve())
+            if key not in seen:
+                seen.add(key)
+                watched.append((local_dir, LOCAL, None))
+        if settings.pexels_cache_enabled and settings.pexels_cache_dir.exists():
+            for format_dir in settings.pexels_cache_dir.iterdir():
+                if format_dir.is_dir():
+                    watched.append((format_dir, PEXELS, format_dir.name))
+        return watched
+
+    def refresh(self) -> None:
+        """Met l'index à jour pour les seuls dossiers modifiés depuis le dernier passage."""
+        with self._lock:
+            self._load()
+            changed = False
+            watched = self._watched_dirs()
+            watched_keys = {str(d) for d, _, _ in watched}
+
+            for directory, source, format_dir in watched:
+                key = str(directory)
+                if not directory.exists():
+                    if key in self.dirs:
+                        del self.dirs[key]
+                        changed |= self._drop(lambda e: e["dir"] == key)
+                    continue
+                mtime = directory.stat().st_mtime
+                if self.dirs.get(key) == mtime:
+                    continue
+                changed |= self._scan(directory, source, format_dir)
+                self.dirs[key] = mtime
+                changed = True
+
+            # Dossiers qui ne sont plus surveillés
+            for key in [k for k in self.dirs if k not in watched_keys]:
+                del self.dirs[key]
+                changed |= self._drop(lambda e, k=key: e["dir"] == k)
+
+            if changed:
+                self._rebuild_buckets()
+                self.save()
+
+    def _scan(self, directory: Path, source: str, format_dir: Optional[str]) -> bool:
+        changed = False
+        present = set()
+        for path in directory.glob("*.mp4"):
+            key = str(path)
+            present.add(key)
+            stat = path.stat()
+            entry = self.entries.get(key)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                continue
+            info = media_info.video_info(path)
+            self.entries[key] = {
+                "path": key,
+                "dir": str(directory),
+                "source": source,
+                "tags": background_categories(path, format_dir),
+                "size": stat.st_size,
+                "mtime": stat.st_mtime,
+                "last_used": (entry or {}).get("last_used", 0.0),
+                "use_count": (entry or {}).get("use_count", 0),
+                **info,
+            }
+            changed = True
+        changed |= self._drop(lambda e: e["dir"] == str(directory) and e["path"] not in present)
+        return changed
+
+    def _drop(self, predicate) -> bool:
+        gone = [k for k, e in self.entries.items() if predicate(e)]
+        for k in gone:
+            del self.entries[k]
+        return bool(gone)
+
+    def _rebuild_buckets(self) -> None:
+        self._buckets = {}
+        for entry in sorted(self.entries.values(), key=lambda e: (e["last_used"], random.random())):
+            for tag in [ALL_TAGS, *entry["tags"]]:
+                self._buckets.setdefault((entry["source"], tag), OrderedDict())[entry["path"]] = None
+
+    # ── Sélection ──────────────────────────────────────────────────
+
+    def count(self, source: str, tag: str = ALL_TAGS) -> int:
+        with self._lock:
+            self._load()
+            return len(self._buckets.get((source, tag), ()))
+
+    def pick(self, source: str, tag: Optional[str] = None, exclude: Iterable[str] = ()) -> Optional[Path]:
+        """
+        Fond le moins récemment utilisé d'une source (et d'un tag si précisé),
+        hors des noms exclus. Si tout est exclu, le moins récemment utilisé quand même.
+        """
+        with self._lock:
+            self._load()
+            bucket = self._buckets.get((source, tag or ALL_TAGS))
+            if not bucket:
+                return None
+            excluded = exclude if isinstance(exclude, (set, frozenset)) else set(exclude)
+            chosen = next((p for p in bucket if Path(p).name not in excluded), None)
+            if chosen is None:
+                chosen = next(iter(bucket))
+            self.mark_used(Path(chosen))
+            return Path(chosen)
+
+    def sample(self, source: str, count: int) -> list[Path]:
+        """Plusieurs fonds distincts, les moins récemment utilisés d'abord."""
+        picked: list[Path] = []
+        for _ in range(min(count, self.count(source))):
+            path = self.pick(source, exclude={p.name for p in picked})
+            if path is None:
+                break
+            picked.append(path)
+        return picked
+
+    def mark_used(self, path: Path) -> None:
+        """Enregistre une utilisation : le fond passe en fin de file LRU (écrit au prochain flush)."""
+        with self._lock:
+            self._load()
+            entry = self.entries.get(str(path))
+            if entry is None:
+                return
+            entry["last_used"] = time.time()
+            entry["use_count"] += 1
+            for tag in [ALL_TAGS, *entry["tags"]]:
+                bucket = self._buckets.get((entry["source"], tag))
+                if bucket is not None and entry["path"] in bucket:
+                    bucket.move_to_end(entry["path"])
+            self._dirty = True
+
+    # ── Métadonnées ────────────────────────────────────────────────
+
+    def duration(self, path: Path) -> float:
+        """Durée d'un clip : depuis l'index, sinon via le cache media_info."""
+        with self._lock:
+            self._load()
+            entry = self.entries.get(str(path))
+            stat = path.stat()
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                return entry["duration"]
+        return media_info.duration(path)
+
+
+background_catalogue = BackgroundCatalogue()
+atexit.register(background_catalogue.flush)
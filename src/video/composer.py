@@ -5,17 +5,34 @@ Compositeur vidéo PRO avec :
 - Style TikTok
 """
 
+import json
+import math
 import os
 import random
-import subprocess
 import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional
 import httpx
 from rich.console import Console
 
 from src.config import settings
-from src.models import AudioFile, Script, SubtitleSegment, Subtitles, Video, VideoStatus
+from src.models import OUTPUT_PROFILES, AudioFile, OutputProfile, Script, SubtitleSegment, Subtitles, Video, VideoStatus
+from src.storage.artifact_cache import artifact_cache, cache_key, hash_file
+from src.utils.text import split_sentences
+from src.utils.workspace import job_workspace, prune_workspaces
+from src.video.alignment import align_sentences, alignment_confidence
+from src.video.backgrounds import mezzanine_library
+from src.video.catalogue import LOCAL, PEXELS, background_catalogue
+from src.video.ffmpeg_runner import run_ffmpeg
+from src.video.mediainfo import ffmpeg_capabilities, media_info
+from src.video.thumbnails import extract_frame, render_thumbnail
+from src.video.transcription import TranscriptionClient
+from src.video.transcription_backends import TranscriptionBackend, create_backend
+from src.video.vad import vad_timings
+from src.voice.mastering import AAC_SUFFIXES
 
 console = Console()
 
@@ -30,17 +47,9 @@ THUMBNAIL_DURATION = 1.5            # Durée vignette en secondes
 # Couleur FFmpeg (format 0xRRGGBB)
 NORADAR_GREEN_FFmpeg = "0x10B981"
 
+# Police utilisée quand ffmpeg n'a pas fontconfig
+FALLBACK_FONT_FILE = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
 
-LOCAL_VIDEO_CATEGORIES = {
-    "scandale": ["road", "highway", "traffic", "radar"],
-    "tuto": ["document", "paper", "phone", "desk"],
-    "temoignage": ["happy", "relief", "car", "driver"],
-    "mythe": ["thinking", "question", "idea"],
-    "chiffre_choc": ["money", "euro", "wallet", "cash"],
-    "story_pov": ["road", "highway", "car", "driver", "traffic"],
-    "debunk": ["thinking", "question", "idea", "road"],
-    "cas_reel": ["road", "highway", "traffic", "radar", "car"],
-}
 
 # Mots-clés Pexels par format - fonds variés selon le type de contenu
 PEXELS_KEYWORDS = {
@@ -54,6 +63,39 @@ PEXELS_KEYWORDS = {
     "cas_reel": ["speed camera", "traffic radar", "highway road", "police car", "car driving"],
 }
 
+# Extensions traitées comme vidéo de fond (le reste est une image fixe)
+VIDEO_EXTENSIONS = {".mp4", ".mov", ".m4v", ".webm", ".mkv"}
+
+def output_profiles(names: Optional[str] = None) -> list[OutputProfile]:
+    """Profils de sortie configurés (OUTPUT_PROFILES), le premier étant la sortie principale."""
+    profiles = []
+    for name in (names or settings.output_profiles).split(","):
+        name = name.strip()
+        if not name:
+            continue
+        if name not in OUTPUT_PROFILES:
+            console.print(f"[yellow]⚠ Profil de sortie inconnu ignoré : {name}[/yellow]")
+            continue
+        profiles.append(OUTPUT_PROFILES[name])
+    return profiles or [OUTPUT_PROFILES["master"]]
+
+
+def variant_paths(output_path: Path, profiles: list[OutputProfile]) -> dict[str, Path]:
+    """Fichier de chaque variante : la sortie principale, puis <nom>_<profil>.mp4."""
+    paths = {}
+    for i, profile in enumerate(profiles):
+        paths[profile.name] = output_path if i == 0 else output_path.with_name(
+            f"{output_path.stem}_{profile.name}{output_path.suffix}"
+        )
+    return paths
+
+
+def whisper_tiers() -> list[str]:
+    """Cascade de modèles Whisper configurée (WHISPER_MODELS), du plus léger au plus précis."""
+    tiers = [size.strip() for size in settings.whisper_models.split(",") if size.strip()]
+    return tiers or ["base"]
+
+
 GRADIENT_COLORS = {
     "scandale": ("#FF4B4B", "#8B0000"),
     "tuto": ("#4ECDC4", "#1A535C"),
@@ -69,50 +111,148 @@ GRADIENT_COLORS = {
 class PexelsClient:
     BASE_URL = "https://api.pexels.com/videos/search"
 
+    # Client HTTP keep-alive partagé (recherches + téléchargements)
+    _http: Optional[httpx.Client] = None
+    _http_lock = threading.Lock()
+
     def __init__(self):
         self.api_key = settings.pexels_api_key
         if not self.api_key:
             console.print("[yellow]⚠ PEXELS_API_KEY manquante dans .env - vidéos de fond désactivées[/yellow]")
+
+    @classmethod
+    def http(cls) -> httpx.Client:
+        with cls._http_lock:
+            if cls._http is None:
+                cls._http = httpx.Client(
+                    timeout=httpx.Timeout(15, read=120),
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_keepalive_connections=8),
+                )
+            return cls._http
     
     def search_videos(self, query: str, orientation: str = "portrait", per_page: int = 5) -> list[dict]:
+        """Recherche Pexels, servie depuis le cache disque tant qu'elle n'a pas expiré."""
         if not self.api_key:
             return []
+        cached = self._cached_search(query, orientation, per_page)
+        if cached is not None:
+            return cached
         try:
-            response = httpx.get(
+            response = self.http().get(
                 self.BASE_URL,
                 params={"query": query, "orientation": orientation, "per_page": per_page},
                 headers={"Authorization": self.api_key},
                 timeout=15,
             )
             response.raise_for_status()
-            return response.json().get("videos", [])
+            videos = response.json().get("videos", [])
         except Exception as e:
             console.print(f"[yellow]Pexels error: {e}[/yellow]")
             return []
+        self._store_search(query, orientation, per_page, videos)
+        return videos
+
+    @staticmethod
+    def _search_cache_path(query: str, orientation: str) -> Path:
+        slug = re.sub(r"[^a-z0-9]+", "_", query.lower()).strip("_")
+        return settings.pexels_search_cache_dir / f"{slug}_{orientation}.json"
+
+    def _cached_search(self, query: str, orientation: str, per_page: int) -> Optional[list[dict]]:
+        path = self._search_cache_path(query, orientation)
+        if not path.exists():
+            return None
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return None
+        if time.time() - data.get("fetched_at", 0) > settings.pexels_search_ttl_hours * 3600:
+            return None
+        # Une réponse plus courte que demandé ne suffit pas
+        if data.get("per_page", 0) < per_page:
+            return None
+        return data.get("videos", [])[:per_page]
+
+    def _store_search(self, query: str, orientation: str, per_page: int, videos: list[dict]) -> None:
+        path = self._search_cache_path(query, orientation)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps({
+            "query": query,
+            "orientation": orientation,
+            "per_page": per_page,
+            "fetched_at": time.time(),
+            "videos": videos,
+        }), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _pick_rendition(video_files: list[dict]) -> Optional[dict]:
+        """Rendu MP4 le plus proche du format de sortie (1080x1920)."""
+        candidates = [
+            vf for vf in video_files
+            if vf.get("link") and vf.get("width") and vf.get("height")
+            and vf.get("file_type", "video/mp4") == "video/mp4"
+        ]
+        if not candidates:
+            return None
+        return min(
+            candidates,
+            key=lambda vf: abs(vf["width"] - settings.video_width) + abs(vf["height"] - settings.video_height),
+        )
     
     def download_video(self, video_data: dict, output_path: Path) -> Optional[Path]:
-        try:
-            video_files = video_data.get("video_files", [])
-            best_file = None
-            for vf in video_files:
-                height = vf.get("height", 0)
-                if 600 <= height <= 800:
-                    best_file = vf
-                    break
-            if not best_file and video_files:
-                best_file = min(video_files, key=lambda x: x.get("height", 9999))
-            if not best_file:
+        """
+        Téléchargement en streaming vers un fichier .part, renommé à la fin.
+        Un transfert interrompu reprend là où il s'était arrêté (HTTP Range).
+        """
+        best_file = self._pick_rendition(video_data.get("video_files", []))
+        if not best_file:
+            return None
+        url = best_file["link"]
+        console.print(f"[blue]Téléchargement Pexels ({best_file.get('width')}x{best_file.get('height')})...[/blue]")
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        part = output_path.with_name(output_path.name + ".part")
+
+        for attempt in range(1, settings.retry_max_attempts + 1):
+            try:
+                if self._stream_to(url, part):
+                    os.replace(part, output_path)
+                    return output_path
+            except (httpx.TransportError, httpx.HTTPStatusError) as e:
+                console.print(f"[yellow]Pexels : transfert interrompu ({type(e).__name__}), reprise {attempt}/{settings.retry_max_attempts}[/yellow]")
+            except OSError as e:
+                console.print(f"[yellow]Erreur Pexels: {e}[/yellow]")
                 return None
-            url = best_file.get("link")
-            console.print(f"[blue]Téléchargement Pexels ({best_file.get('width')}x{best_file.get('height')})...[/blue]")
-            response = httpx.get(url, timeout=120, follow_redirects=True)
+        console.print("[yellow]Erreur Pexels: téléchargement incomplet[/yellow]")
+        return None
+
+    def _stream_to(self, url: str, part: Path) -> bool:
+        """Écrit (ou complète) part par blocs. True si le fichier est complet."""
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        with self.http().stream("GET", url, headers=headers) as response:
+            if response.status_code == 416:
+                # Plage hors limites : le .part contient déjà tout
+                return offset > 0
             response.raise_for_status()
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            output_path.write_bytes(response.content)
-            return output_path
-        except Exception as e:
-            console.print(f"[yellow]Erreur Pexels: {e}[/yellow]")
-            return None
+
+            if response.status_code == 206:
+                total = int(response.headers.get("content-range", "*/0").rsplit("/", 1)[-1] or 0)
+                mode = "ab"
+            else:
+                # Le serveur ignore Range : on repart de zéro
+                total = int(response.headers.get("content-length", 0))
+                mode, offset = "wb", 0
+
+            with open(part, mode) as f:
+                for chunk in response.iter_bytes(chunk_size=1024 * 1024):
+                    f.write(chunk)
+
+        size = part.stat().st_size
+        return size > 0 and (not total or size >= total)
 
 
 class SimpleSubtitleGenerator:
@@ -125,37 +265,119 @@ class SimpleSubtitleGenerator:
     3. On utilise les timings Whisper avec le texte du script
     
     Résultat : Synchro parfaite + texte sans faute
+
+    Cascade (WHISPER_MODELS) : le plus petit modèle d'abord ; on ne passe
+    au suivant que si l'alignement sur le script reste sous
+    WHISPER_CONFIDENCE_THRESHOLD. Un modèle fixé (model_size) désactive la cascade.
+    Le moteur (WHISPER_ENGINE) ne change que la vitesse : même format de segments.
+
+    Sans Whisper (SUBTITLE_TIMING=vad, Whisper indisponible ou muet), les
+    phrases sont calées sur les pauses de la piste voix (voir video.vad).
     """
     
-    def __init__(self, model_size: str = "base"):
-        self.model_size = model_size
-        self._model = None
+    def __init__(self, model_size: Optional[str] = None, tiers: Optional[list[str]] = None):
+        self.tiers = tiers or ([model_size] if model_size else whisper_tiers())
+        self.model_size = self.tiers[0]
+        self.engine = settings.whisper_engine
+        self._models: dict[str, TranscriptionBackend] = {}
     
-    @property
-    def model(self):
-        if self._model is None:
-            console.print(f"[blue]Chargement Whisper ({self.model_size})...[/blue]")
-            import whisper
-            self._model = whisper.load_model(self.model_size)
-        return self._model
+    def model_for(self, size: str) -> TranscriptionBackend:
+        if size not in self._models:
+            console.print(f"[blue]Chargement Whisper ({size}, {self.engine})...[/blue]")
+            self._models[size] = create_backend(size, self.engine)
+        return self._models[size]
     
     def generate(self, audio_path: Path, script: Script) -> Subtitles:
         """Génère les sous-titres synchronisés."""
-        console.print(f"[blue]Génération sous-titres synchronisés...[/blue]")
-        
-        # 1. Transcrire pour obtenir les timings
-        result = self.model.transcribe(str(audio_path), language="fr")
-        whisper_segments = result.get("segments", [])
-        
-        # 2. Découper le script en phrases
-        script_sentences = self._split_into_sentences(script.full_text)
-        
-        console.print(f"[dim]Whisper: {len(whisper_segments)} segments, Script: {len(script_sentences)} phrases[/dim]")
-        
-        # 3. Aligner les phrases du script aux timings Whisper
-        aligned = self._align_sentences_to_timings(script_sentences, whisper_segments)
-        
-        # 4. Sauvegarder
+        return self.generate_batch([(audio_path, script)])[0]
+
+    def generate_batch(self, items: list[tuple[Path, Script]]) -> list[Subtitles]:
+        """
+        Sous-titres de plusieurs clips : les clips hors cache sont transcrits
+        ensemble, à chaque niveau de la cascade (seuls ceux sous le seuil de
+        confiance passent au modèle suivant).
+        """
+        console.print(f"[blue]Génération sous-titres synchronisés ({len(items)} clip(s))...[/blue]")
+
+        # 0. Cache : même audio + même texte → mêmes timings
+        keys = [
+            cache_key(
+                "subtitles", hash_file(audio_path), script.full_text,
+                self.tiers, settings.whisper_confidence_threshold, self.engine, "forced",
+            )
+            for audio_path, script in items
+        ]
+        results: dict[int, tuple[list[SubtitleSegment], dict]] = {}
+        for i, key in enumerate(keys):
+            cached = artifact_cache.get_json("subtitles", key)
+            if cached is not None:
+                results[i] = ([SubtitleSegment.model_validate(seg) for seg in cached["segments"]], cached["telemetry"])
+                console.print(f"[green]✓ Sous-titres en cache ({len(results[i][0])} segments)[/green]")
+
+        # 1. Découper les scripts en phrases
+        pending = [i for i in range(len(items)) if i not in results]
+        sentences = {i: self._split_into_sentences(items[i][1].full_text) for i in pending}
+
+        # 2-3. Transcrire et aligner, en montant en gamme si besoin
+        threshold = settings.whisper_confidence_threshold
+        remaining = pending
+        uncached: set[int] = set()
+        for attempt, size in enumerate(self.tiers, start=1):
+            if not remaining:
+                break
+            try:
+                transcripts = self._transcribe_many([items[i][0] for i in remaining], size)
+            except (ImportError, OSError, RuntimeError) as e:
+                console.print(f"[yellow]⚠ Whisper {size} indisponible ({e}), timings VAD[/yellow]")
+                for i in remaining:
+                    if i not in results:
+                        # Repli ponctuel : pas mis en cache sous la clé Whisper
+                        results[i] = (self._fallback_timings(items[i][0], sentences[i]), {})
+                        uncached.add(i)
+                break
+            below = []
+            for i, transcript in zip(remaining, transcripts):
+                whisper_segments = transcript.get("segments", [])
+                aligned, confidence = self._align_scored(sentences[i], whisper_segments, items[i][0])
+                console.print(
+                    f"[dim]Whisper {size}: {len(whisper_segments)} segments, Script: {len(sentences[i])} phrases, "
+                    f"confiance {confidence:.2f}[/dim]"
+                )
+                if i not in results or confidence > results[i][1]["alignment_confidence"]:
+                    results[i] = (aligned, {"whisper_model": size, "alignment_confidence": round(confidence, 3)})
+                results[i][1]["whisper_attempts"] = attempt
+                if confidence < threshold:
+                    below.append(i)
+            if below and attempt < len(self.tiers):
+                console.print(
+                    f"[yellow]{len(below)} clip(s) sous le seuil de confiance {threshold:.2f}, "
+                    f"modèle suivant : {self.tiers[attempt]}[/yellow]"
+                )
+            remaining = below
+
+        subtitles = []
+        for i, (_, script) in enumerate(items):
+            aligned, telemetry = results[i]
+            if i in sentences and i not in uncached:
+                artifact_cache.put_json("subtitles", keys[i], {
+                    "segments": [seg.model_dump() for seg in aligned], "telemetry": telemetry,
+                })
+            subtitles.append(self._save(script, aligned, **telemetry))
+        return subtitles
+
+    def from_segments(self, script: Script, segments: list[SubtitleSegment]) -> Subtitles:
+        """Sous-titres à partir de segments déjà horodatés (timepoints TTS), sans Whisper."""
+        console.print(f"[green]✓ Timings TTS : {len(segments)} phrases, Whisper ignoré[/green]")
+        return self._save(script, segments)
+
+    def from_vad(self, audio_path: Path, script: Script) -> Subtitles:
+        """Sous-titres calés sur les pauses de la piste voix (VAD), sans Whisper."""
+        segments = self._fallback_timings(audio_path, self._split_into_sentences(script.full_text))
+        console.print(f"[green]✓ Timings VAD : {len(segments)} phrases, Whisper ignoré[/green]")
+        return self._save(script, segments)
+
+    def _save(self, script: Script, aligned: list[SubtitleSegment], **telemetry) -> Subtitles:
+        """Écrit le SRT et construit l'objet Subtitles (avec la télémétrie Whisper éventuelle)."""
         srt_path = settings.output_dir / "subtitles" / f"{script.id}.srt"
         srt_path.parent.mkdir(parents=True, exist_ok=True)
         with open(srt_path, "w", encoding="utf-8") as f:
@@ -168,31 +390,67 @@ class SimpleSubtitleGenerator:
             audio_id=script.id,
             segments=aligned,
             srt_path=srt_path,
+            **telemetry,
         )
     
+    def _transcribe(self, audio_path: Path, size: Optional[str] = None) -> dict:
+        """Transcrit via le service résident s'il tourne, sinon avec le modèle local."""
+        size = size or self.model_size
+        client = TranscriptionClient()
+        if client.available():
+            try:
+                result = client.transcribe(audio_path, size, self.engine, language="fr", word_timestamps=True)
+                console.print("[dim]Whisper : service de transcription résident[/dim]")
+                return result
+            except (OSError, RuntimeError, ValueError) as e:
+                console.print(f"[yellow]⚠ Service de transcription indisponible ({e}), Whisper local[/yellow]")
+        return self.model_for(size).transcribe(audio_path, language="fr", word_timestamps=True)
+
+    def _transcribe_many(self, audio_paths: list[Path], size: str) -> list[dict]:
+        """Transcription groupée (service résident ou modèle local) ; un seul clip : transcribe classique."""
+        if len(audio_paths) == 1:
+            return [self._transcribe(audio_paths[0], size)]
+        client = TranscriptionClient()
+        if client.available():
+            try:
+                results = client.transcribe_batch(audio_paths, size, self.engine, language="fr", word_timestamps=True)
+                console.print(f"[dim]Whisper : {len(audio_paths)} clips en lot, service résident[/dim]")
+                return results
+            except (OSError, RuntimeError, ValueError) as e:
+                console.print(f"[yellow]⚠ Service de transcription indisponible ({e}), Whisper local[/yellow]")
+        return self.model_for(size).transcribe_batch(
+            audio_paths, batch_size=settings.whisper_batch_size, language="fr", word_timestamps=True
+        )
+
     def _split_into_sentences(self, text: str) -> list[str]:
         """Découpe le texte en phrases aux ponctuations."""
-        # Découper aux . ! ?
-        sentences = re.split(r'(?<=[.!?])\s+', text.strip())
-        # Nettoyer et filtrer
-        sentences = [s.strip() for s in sentences if s.strip()]
-        return sentences
+        return split_sentences(text)
     
+    def _align_scored(
+        self, sentences: list[str], whisper_segments: list[dict], audio_path: Optional[Path] = None,
+    ) -> tuple[list[SubtitleSegment], float]:
+        """Phrases horodatées et confiance de l'alignement (0 hors alignement forcé)."""
+        forced = align_sentences(sentences, whisper_segments) if whisper_segments else None
+        if forced is None:
+            return self._align_sentences_to_timings(sentences, whisper_segments, audio_path), 0.0
+        console.print(f"[dim]Alignement forcé : {forced.match_rate:.0%} des mots du script reconnus[/dim]")
+        return forced.segments, alignment_confidence(forced, whisper_segments, len(sentences))
+
     def _align_sentences_to_timings(
         self, 
         sentences: list[str], 
-        whisper_segments: list[dict]
+        whisper_segments: list[dict],
+        audio_path: Optional[Path] = None,
     ) -> list[SubtitleSegment]:
         """
-        Aligne les phrases du script aux timings Whisper.
+        Aligne les phrases du script aux timings Whisper, sans alignement mot à mot.
         
         Si même nombre de segments : mapping 1:1
         Sinon : répartition proportionnelle
+        Sans segment Whisper : pauses de la piste (VAD)
         """
         if not whisper_segments:
-            # Fallback sans Whisper
-            total_duration = 30.0
-            return self._distribute_evenly(sentences, total_duration)
+            return self._fallback_timings(audio_path, sentences)
         
         total_duration = whisper_segments[-1]["end"]
         
@@ -253,6 +511,18 @@ class SimpleSubtitleGenerator:
                 closest = seg
         return closest
     
+    def _fallback_timings(self, audio_path: Optional[Path], sentences: list[str]) -> list[SubtitleSegment]:
+        """
+        Timings sans Whisper : pauses de la piste (VAD), sinon (piste illisible)
+        répartition uniforme sur la durée estimée à 150 mots par minute.
+        """
+        segments = vad_timings(audio_path, sentences) if audio_path else None
+        if segments is not None:
+            return segments
+        console.print("[yellow]⚠ VAD impossible sur la piste, répartition uniforme[/yellow]")
+        word_count = sum(len(s.split()) for s in sentences)
+        return self._distribute_evenly(sentences, (word_count / 150) * 60)
+
     def _distribute_evenly(self, sentences: list[str], total_duration: float) -> list[SubtitleSegment]:
         """Répartit uniformément si pas de timings Whisper."""
         duration_per = total_duration / len(sentences) if sentences else 3.0
@@ -322,6 +592,18 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         output_path.write_text("\n".join(lines), encoding="utf-8")
         return output_path
     
+    @staticmethod
+    def window(segments: list[SubtitleSegment], start: float, end: float) -> list[SubtitleSegment]:
+        """Segments visibles dans [start, end), recalés pour commencer à 0."""
+        return [
+            seg.model_copy(update={
+                "start_time": max(seg.start_time, start) - start,
+                "end_time": min(seg.end_time, end) - start,
+            })
+            for seg in segments
+            if seg.end_time > start and seg.start_time < end
+        ]
+
     @staticmethod
     def _ass_time(seconds: float) -> str:
         h = int(seconds // 3600)
@@ -344,12 +626,20 @@ class ThumbnailGenerator:
         self.temp_dir = settings.temp_dir / "thumbnails"
         self.temp_dir.mkdir(parents=True, exist_ok=True)
 
-    def generate(self, script: Script, output_path: Path, broll_video: Optional[Path] = None) -> Path:
+    def generate(
+        self,
+        script: Script,
+        output_path: Path,
+        broll_video: Optional[Path] = None,
+        frame: Optional[Path] = None,
+    ) -> Path:
         """
-        Génère une vignette avec :
-        1. Première frame du B-roll floutée + overlay noir 40%
-        2. Texte 2 lignes (blanc + vert)
+        Génère une vignette (.png ou .jpg) avec :
+        1. Première image clé du B-roll floutée + overlay noir 30%
+        2. Texte 2 lignes blanc
         3. noradar.app discret en bas
+
+        `frame` permet de réutiliser une image déjà extraite du B-roll.
         """
         console.print("[blue]🖼️ Génération vignette B-roll floutée...[/blue]")
 
@@ -361,58 +651,22 @@ class ThumbnailGenerator:
         if not line2:
             line2 = "NORADAR."
 
-        line1_clean = self._escape_ffmpeg_text(line1.upper())
-        line2_clean = self._escape_ffmpeg_text(line2.upper())
-
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        # Source : B-roll première image clé, ou fallback fond vert
+        if frame is None and broll_video and broll_video.exists():
+            frame = extract_frame(broll_video)
 
-        # Source : B-roll première frame floutée, ou fallback fond vert
-        if broll_video and broll_video.exists():
-            input_args = ["-i", str(broll_video)]
-            vf_base = (
-                f"select=eq(n\\,0),"
-                f"scale={self.width}:{self.height}:force_original_aspect_ratio=increase,"
-                f"crop={self.width}:{self.height},"
-                f"boxblur=5:5,"
-                f"drawbox=c=black@0.3:t=fill"
+        middle = self.height // 2
+        try:
+            render_thumbnail(
+                output_path,
+                [(line1.upper(), 85, middle - 120), (line2.upper(), 70, middle + 20)],
+                footer="noradar.app",
+                frame=frame,
+                size=(self.width, self.height),
+                color=NORADAR_GREEN,
             )
-        else:
-            input_args = [
-                "-f", "lavfi",
-                "-i", f"color=c={NORADAR_GREEN_FFmpeg}:s={self.width}x{self.height}:d=1"
-            ]
-            vf_base = ""
-
-        # Texte : ligne 1 blanc, ligne 2 vert, noradar.app blanc discret
-        text_filters = (
-            f"drawtext=text='{line1_clean}'"
-            f":fontfile=/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-            f":fontsize=85:fontcolor=white"
-            f":x=(w-text_w)/2:y=(h/2)-120,"
-
-            f"drawtext=text='{line2_clean}'"
-            f":fontfile=/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-            f":fontsize=70:fontcolor=white"
-            f":x=(w-text_w)/2:y=(h/2)+20,"
-
-            f"drawtext=text='noradar.app'"
-            f":fontfile=/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-            f":fontsize=30:fontcolor=white@0.7"
-            f":x=(w-text_w)/2:y=h-150"
-        )
-
-        vf = f"{vf_base},{text_filters}" if vf_base else text_filters
-
-        result = subprocess.run([
-            "ffmpeg", "-y",
-            *input_args,
-            "-vf", vf,
-            "-frames:v", "1",
-            str(output_path)
-        ], capture_output=True, text=True, timeout=30)
-
-        if result.returncode != 0:
-            console.print(f"[yellow]⚠️ Erreur vignette: {result.stderr[:200]}[/yellow]")
+        except OSError as e:
+            console.print(f"[yellow]⚠️ Erreur vignette: {e}[/yellow]")
             self._create_fallback_thumbnail(output_path)
         else:
             console.print(f"[green]✓ Vignette générée: {output_path.name}[/green]")
@@ -421,13 +675,10 @@ class ThumbnailGenerator:
 
     def _create_fallback_thumbnail(self, output_path: Path) -> Path:
         """Crée une vignette de secours (fond vert simple)."""
-        subprocess.run([
-            "ffmpeg", "-y",
-            "-f", "lavfi",
-            "-i", f"color=c={NORADAR_GREEN_FFmpeg}:s={self.width}x{self.height}:d=1",
-            "-frames:v", "1",
-            str(output_path)
-        ], capture_output=True, timeout=15)
+        from PIL import Image
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        Image.new("RGB", (self.width, self.height), NORADAR_GREEN).save(output_path)
         return output_path
 
     def generate_video_thumbnail(
@@ -444,54 +695,68 @@ class ThumbnailGenerator:
         channels = "stereo"
         profile = "high"
         if reference_video and reference_video.exists():
-            import json as _json
-            probe = subprocess.run(
-                ["ffprobe", "-v", "error",
-                 "-show_entries", "stream=r_frame_rate,profile,sample_rate,channels,codec_type",
-                 "-of", "json", str(reference_video)],
-                capture_output=True, text=True, timeout=10)
-            if probe.returncode == 0:
-                streams = _json.loads(probe.stdout).get("streams", [])
-                for s in streams:
-                    if s.get("codec_type") == "video":
-                        fps = s.get("r_frame_rate", fps)
-                        profile = s.get("profile", profile).lower()
-                    elif s.get("codec_type") == "audio":
-                        sample_rate = s.get("sample_rate", sample_rate)
-                        ch = s.get("channels", 2)
-                        channels = "mono" if str(ch) == "1" else "stereo"
+            for s in media_info.probe(reference_video)["streams"]:
+                if s.get("codec_type") == "video":
+                    fps = s.get("r_frame_rate", fps)
+                    profile = s.get("profile", profile).lower()
+                elif s.get("codec_type") == "audio":
+                    sample_rate = s.get("sample_rate", sample_rate)
+                    ch = s.get("channels", 2)
+                    channels = "mono" if str(ch) == "1" else "stereo"
 
         cl = channels
-        subprocess.run([
-            "ffmpeg", "-y",
+        # Silence AAC pré-encodé (copié), sinon généré et encodé à la volée
+        silence = self._silent_track(duration, sample_rate, cl)
+        if silence:
+            audio_args = ["-i", str(silence)]
+            audio_codec = ["-c:a", "copy"]
+        else:
+            audio_args = ["-f", "lavfi", "-i", f"anullsrc=r={sample_rate}:cl={cl}"]
+            audio_codec = ["-c:a", "aac"]
+        run_ffmpeg([
+            "-y",
             "-loop", "1",
             "-i", str(thumbnail_image),
-            "-f", "lavfi",
-            "-i", f"anullsrc=r={sample_rate}:cl={cl}",
+            *audio_args,
             "-t", str(duration),
             "-vf", f"scale={self.width}:{self.height}",
             "-c:v", "libx264",
             "-profile:v", "baseline" if "baseline" in profile else "high",
             "-pix_fmt", "yuv420p",
-            "-c:a", "aac",
+            *audio_codec,
             "-r", fps,
             "-shortest",
             str(output_path)
-        ], capture_output=True, timeout=30)
+        ], "thumbnail.video", timeout=30, duration=duration)
 
         return output_path
 
-    @staticmethod
-    def _escape_ffmpeg_text(text: str) -> str:
-        """Échappe les caractères spéciaux pour FFmpeg drawtext."""
-        text = text.replace("'", "\u2019")  # Apostrophe courbe
-        text = text.replace(":", " ")   # Deux-points
-        text = text.replace("\\", "")   # Backslash
-        text = text.replace("%", " pourcent ")  # Pourcentage
-        return text
+    def _silent_track(self, duration: float, sample_rate: str, channels: str) -> Optional[Path]:
+        """Piste AAC silencieuse, encodée une seule fois par (durée, fréquence, canaux)."""
+        path = self.temp_dir / f"silence_{sample_rate}_{channels}_{duration}.m4a"
+        if path.exists():
+            return path
+        key = cache_key("silence", duration, sample_rate, channels)
+        if artifact_cache.fetch("silence", key, path.suffix, path) is not None:
+            return path
+
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+        result = run_ffmpeg([
+            "-y", "-f", "lavfi", "-i", f"anullsrc=r={sample_rate}:cl={channels}",
+            "-t", str(duration), "-c:a", "aac", "-f", "mp4", str(tmp)
+        ], "thumbnail.silence", timeout=30, duration=duration)
+        if result.returncode != 0:
+            tmp.unlink(missing_ok=True)
+            return None
+        os.replace(tmp, path)
+        artifact_cache.store("silence", key, path)
+        return path
 
 
 class VideoComposerPro:
+    # Choix du fond + réservation dans used_backgrounds, atomiques entre montages parallèles
+    _selection_lock = threading.Lock()
+
     def __init__(self):
         self.pexels = PexelsClient()
         self.temp_dir = settings.temp_dir / "video_work"
@@ -499,39 +764,56 @@ class VideoComposerPro:
         self.backgrounds_dir = settings.assets_dir / "backgrounds"
         self.width = settings.video_width
         self.height = settings.video_height
+        # Fond du dernier montage, par thread (plusieurs montages en parallèle)
+        self._local = threading.local()
+        prune_workspaces()
+
+    @property
+    def last_used_bg(self) -> Optional[Path]:
+        return getattr(self._local, "last_used_bg", None)
+
+    @last_used_bg.setter
+    def last_used_bg(self, value: Optional[Path]) -> None:
+        self._local.last_used_bg = value
     
-    def get_background_video(self, format_type: str, duration: float, used_backgrounds: Optional[list[str]] = None) -> Path:
-        """Sélectionne un fond vidéo en évitant les répétitions du batch."""
-        used = set(used_backgrounds or [])
-
-        def _pick_unique(candidates: list[Path]) -> Optional[Path]:
-            unused = [c for c in candidates if c.name not in [Path(u).name for u in used]]
-            if unused:
-                return random.choice(unused)
-            return random.choice(candidates) if candidates else None
-
-        # 0. Vidéos locales assets (priorité absolue)
-        local_bg_dir = Path("assets/backgrounds")
-        if local_bg_dir.exists():
-            local_videos = list(local_bg_dir.glob("*.mp4"))
-            if local_videos:
-                chosen = _pick_unique(local_videos)
-                if chosen:
-                    console.print(f"[green]✓ Fond local: {chosen.name}[/green]")
-                    return chosen
-
-        # 1. Local
-        local = self._find_local_video(format_type)
-        if local and str(local) not in used:
-            console.print(f"[green]✓ Vidéo locale: {local.name}[/green]")
-            return local
-
-        # 1.5 Cache Pexels persistant
-        if settings.pexels_cache_enabled:
-            cached = self._find_cached_pexels(format_type, used)
-            if cached:
-                console.print(f"[green]✓ Cache Pexels persistant: {cached.name}[/green]")
-                return cached
+    def get_background_video(
+        self, format_type: str, duration: float, used_backgrounds: Optional[list[str]] = None,
+        workspace: Optional[Path] = None,
+    ) -> Path:
+        """Sélectionne un fond vidéo, en version mezzanine (déjà normalisée) si elle existe."""
+        bg = self._select_background(format_type, duration, used_backgrounds, workspace)
+        mezzanine = mezzanine_library.lookup(bg)
+        if mezzanine:
+            console.print(f"[dim]Mezzanine : {mezzanine.name}[/dim]")
+            return mezzanine
+        return bg
+
+    def _select_background(
+        self, format_type: str, duration: float, used_backgrounds: Optional[list[str]] = None,
+        workspace: Optional[Path] = None,
+    ) -> Path:
+        """
+        Sélectionne un fond vidéo en évitant les répétitions du batch (rotation LRU).
+        Le fond retenu est réservé dans used_backgrounds dès sa sélection.
+        """
+        background_catalogue.refresh()
+
+        with self._selection_lock:
+            # Noms des fonds déjà utilisés (une mezzanine compte pour sa source)
+            used = self._used_names(used_backgrounds)
+
+            # 0-1. Vidéos locales assets (priorité absolue)
+            local = self._find_local_video(format_type, used)
+            if local:
+                console.print(f"[green]✓ Fond local: {local.name}[/green]")
+                return self._reserve(local, used_backgrounds)
+
+            # 1.5 Cache Pexels persistant
+            if settings.pexels_cache_enabled:
+                cached = self._find_cached_pexels(format_type, used)
+                if cached:
+                    console.print(f"[green]✓ Cache Pexels persistant: {cached.name}[/green]")
+                    return self._reserve(cached, used_backgrounds)
 
         # 2. Pexels
         if self.pexels.api_key:
@@ -542,114 +824,93 @@ class VideoComposerPro:
             if videos:
                 random.shuffle(videos)
                 for v in videos[:5]:
-                    path = self.temp_dir / f"pexels_{v['id']}.mp4"
-                    if str(path) in used or path.name in [Path(u).name for u in used]:
-                        continue
-                    if path.exists():
-                        console.print(f"[green]✓ Cache Pexels: {path.name}[/green]")
-                        return path
-                    dl = self.pexels.download_video(v, path)
+                    name = f"pexels_{v['id']}.mp4"
+                    # Téléchargement hors verrou : seule la réservation du nom est atomique
+                    with self._selection_lock:
+                        if name in self._used_names(used_backgrounds):
+                            continue
+                        cached = settings.pexels_cache_dir / format_type / name
+                        self._reserve(cached, used_backgrounds)
+                    if cached.exists():
+                        console.print(f"[green]✓ Cache Pexels: {name}[/green]")
+                        return cached
+                    dl = self.pexels.download_video(v, (workspace or self.temp_dir) / name)
                     if dl:
-                        console.print(f"[green]✓ Pexels téléchargé: {path.name}[/green]")
-                        self._save_to_pexels_cache(dl, format_type)
-                        return dl
+                        console.print(f"[green]✓ Pexels téléchargé: {name}[/green]")
+                        return self._save_to_pexels_cache(dl, format_type) or dl
             else:
                 console.print("[yellow]Pexels: aucune vidéo trouvée[/yellow]")
 
         # 3. Gradient
         console.print("[yellow]Fond dégradé...[/yellow]")
-        return self._make_gradient(format_type, duration)
+        return self._make_gradient(format_type, duration, workspace)
     
-    def _find_local_video(self, format_type: str) -> Optional[Path]:
-        if not self.backgrounds_dir.exists():
-            return None
-        cats = LOCAL_VIDEO_CATEGORIES.get(format_type, [])
-        candidates = []
-        for f in self.backgrounds_dir.glob("*.mp4"):
-            for c in cats:
-                if c in f.stem.lower():
-                    candidates.append(f)
-                    break
-        if not candidates:
-            candidates = list(self.backgrounds_dir.glob("*.mp4"))
-        return random.choice(candidates) if candidates else None
+    @staticmethod
+    def _used_names(used_backgrounds: Optional[list[str]]) -> set[str]:
+        return {mezzanine_library.source_of(Path(u)).name for u in used_backgrounds or []}
+
+    @staticmethod
+    def _reserve(path: Path, used_backgrounds: Optional[list[str]]) -> Path:
+        """Inscrit le fond dans used_backgrounds (appelé sous _selection_lock)."""
+        if used_backgrounds is not None:
+            used_backgrounds.append(str(path))
+        return path
+
+    def _find_local_video(self, format_type: str, used: frozenset = frozenset()) -> Optional[Path]:
+        """Fond local le moins récemment utilisé, toutes catégories (ordre historique : tout fond local d'abord)."""
+        return background_catalogue.pick(LOCAL, exclude=used)
     
-    def _make_gradient(self, format_type: str, duration: float) -> Path:
-        out = self.temp_dir / f"gradient_{format_type}.mp4"
+    def _make_gradient(self, format_type: str, duration: float, workspace: Optional[Path] = None) -> Path:
+        out = (workspace or self.temp_dir) / f"gradient_{format_type}.mp4"
         c = GRADIENT_COLORS.get(format_type, ("#1a1a2e", "#16213e"))[0].replace("#", "0x")
-        subprocess.run([
-            "ffmpeg", "-y", "-f", "lavfi",
+        run_ffmpeg([
+            "-y", "-f", "lavfi",
             "-i", f"color=c={c}:s={self.width}x{self.height}:d={duration}",
             "-c:v", "libx264", "-pix_fmt", "yuv420p", str(out)
-        ], capture_output=True, timeout=60)
+        ], "compose.gradient", timeout=60, duration=duration)
         return out
     
-    def _find_cached_pexels(self, format_type: str, used: Optional[set] = None) -> Optional[Path]:
+    def _find_cached_pexels(self, format_type: str, used: frozenset = frozenset()) -> Optional[Path]:
         """Cherche une vidéo dans le cache Pexels persistant par format, en évitant les doublons."""
-        cache_dir = settings.pexels_cache_dir / format_type
-        if not cache_dir.exists():
-            return None
-        candidates = list(cache_dir.glob("*.mp4"))
-        if not candidates:
-            return None
-        if used:
-            unused = [c for c in candidates if c.name not in [Path(u).name for u in used]]
-            if unused:
-                return random.choice(unused)
-        return random.choice(candidates)
-
-    def _save_to_pexels_cache(self, source: Path, format_type: str) -> None:
-        """Copie une vidéo téléchargée dans le cache persistant par format."""
+        return background_catalogue.pick(PEXELS, format_type, exclude=used)
+
+    def _save_to_pexels_cache(self, source: Path, format_type: str) -> Optional[Path]:
+        """Copie une vidéo téléchargée dans le cache persistant par format (retourne la copie)."""
         if not settings.pexels_cache_enabled:
-            return
+            return None
         import shutil
         cache_dir = settings.pexels_cache_dir / format_type
         cache_dir.mkdir(parents=True, exist_ok=True)
         dest = cache_dir / source.name
         if not dest.exists():
-            shutil.copy2(source, dest)
+            tmp = dest.with_name(f".{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copy2(source, tmp)
+            os.replace(tmp, dest)
         # Nettoyage si trop de vidéos
         cached = sorted(cache_dir.glob("*.mp4"), key=lambda f: f.stat().st_mtime)
         while len(cached) > settings.pexels_cache_max_videos:
-            cached.pop(0).unlink()
+            cached.pop(0).unlink(missing_ok=True)
+        return dest if dest.exists() else None
 
-    def prepare_background(self, bg: Path, duration: float) -> Path:
-        out = self.temp_dir / "bg_prepared.mp4"
-        subprocess.run([
-            "ffmpeg", "-y", "-stream_loop", "-1", "-i", str(bg),
-            "-t", str(duration),
-            "-vf", f"scale={self.width}:{self.height}:force_original_aspect_ratio=increase,crop={self.width}:{self.height},setsar=1",
-            "-c:v", "libx264", "-preset", "ultrafast", "-crf", "23", "-an", str(out)
-        ], capture_output=True, timeout=300)
-        return out
-    
-    def compose(self, script: Script, audio: AudioFile, subtitles: Subtitles, output_path: Path, background_image: Optional[Path] = None, used_backgrounds: Optional[list[str]] = None) -> Path:
-        console.print("[bold blue]🎬 Composition vidéo...[/bold blue]")
-        duration = audio.duration + 0.5
-        
-        # Background
-        if background_image and background_image.exists():
-            if background_image.suffix == ".mp4":
-                bg = background_image
-            else:
-                bg = self._image_to_video(background_image, duration)
-        else:
-            bg = self.get_background_video(script.format.value, duration, used_backgrounds=used_backgrounds)
+    def _scale_crop_filter(self, bg: Optional[Path] = None) -> str:
+        """Mise au format vertical : remplissage puis recadrage centré (inutile pour une mezzanine)."""
+        if bg is not None and mezzanine_library.is_mezzanine(bg):
+            return "setsar=1"
+        return (
+            f"scale={self.width}:{self.height}:force_original_aspect_ratio=increase,"
+            f"crop={self.width}:{self.height},setsar=1"
+        )
 
-        self.last_used_bg = bg
-        prepared = self.prepare_background(bg, duration)
-        
-        # ASS subtitles
-        ass = self.temp_dir / f"{script.id}.ass"
-        SubtitleStyler.generate_ass(subtitles.segments, ass)
-        
-        # Compose
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        ass_esc = str(ass).replace(":", "\\:")
-        filter_str = f"[0:v]ass='{ass_esc}'"
+    def _overlay_filters(self, ass: Path) -> str:
+        """Sous-titres ASS + watermark éventuel, selon les filtres que ffmpeg propose."""
+        caps = ffmpeg_capabilities()
+        filters = []
+        if caps.has_filter("ass"):
+            ass_esc = str(ass).replace(":", "\\:")
+            filters.append(f"ass='{ass_esc}'")
 
         # Watermark si activé
-        if settings.watermark_enabled and settings.watermark_text:
+        if settings.watermark_enabled and settings.watermark_text and caps.has_filter("drawtext"):
             positions = {
                 "top_left": ("10", "50"),
                 "top_right": ("w-tw-10", "50"),
@@ -658,30 +919,336 @@ class VideoComposerPro:
             }
             wx, wy = positions.get(settings.watermark_position, positions["top_right"])
             wm_text = settings.watermark_text.replace("'", "'\\''")
-            filter_str += (
-                f",drawtext=text='{wm_text}'"
+            # Sans fontconfig, drawtext a besoin d'un fichier de police explicite
+            font = "" if caps.fontconfig else f":fontfile={FALLBACK_FONT_FILE}"
+            filters.append(
+                f"drawtext=text='{wm_text}'{font}"
                 f":fontsize={settings.watermark_font_size}"
                 f":fontcolor=white"
                 f":x={wx}:y={wy}"
                 f":borderw=2:bordercolor=black"
             )
+        return ",".join(filters) or "null"
 
-        filter_str += "[v]"
+    def background_window(self, bg: Path, duration: float, seed: Optional[str] = None) -> tuple[float, bool]:
+        """
+        Fenêtre du fond à utiliser : (début, boucle nécessaire).
+
+        Le début est une image clé tirée au hasard parmi celles qui laissent
+        `duration` secondes avant la fin du clip : la recherche en entrée
+        (-ss avant -i) est immédiate et chaque vidéo montre un passage différent.
+        Un clip trop court est lu depuis le début, en boucle.
+        """
+        clip_duration = background_catalogue.duration(bg)
+        if clip_duration <= duration:
+            return 0.0, True
+        keyframes = mezzanine_library.keyframes_of(bg) or media_info.keyframes(bg)
+        candidates = [k for k in keyframes if k + duration <= clip_duration]
+        if not candidates:
+            return 0.0, True
+        # Tirage reproductible par vidéo (même script → même fenêtre, cache cohérent)
+        return random.Random(seed).choice(candidates), False
 
-        result = subprocess.run([
-            "ffmpeg", "-y", "-i", str(prepared), "-i", str(audio.path),
+    @staticmethod
+    def _background_input(bg: Path, is_image: bool, start: float = 0.0, loop: bool = True) -> list[str]:
+        """Entrée ffmpeg du fond : image figée, ou vidéo recherchée à `start` (bouclée si besoin)."""
+        if is_image:
+            return ["-loop", "1", "-framerate", str(settings.video_fps), "-i", str(bg)]
+        args = ["-stream_loop", "-1"] if loop else []
+        if start:
+            args += ["-ss", f"{start:.3f}"]
+        return [*args, "-i", str(bg)]
+
+    def prepare_background(
+        self, bg: Path, duration: float, workspace: Optional[Path] = None, start: float = 0.0, loop: bool = True,
+    ) -> Path:
+        out = (workspace or self.temp_dir) / "bg_prepared.mp4"
+        if mezzanine_library.is_mezzanine(bg):
+            # Déjà au bon format, GOP court : simple découpage sans réencodage
+            codec_args = ["-c:v", "copy"]
+        else:
+            codec_args = [
+                "-vf", self._scale_crop_filter(),
+                "-c:v", "libx264", "-preset", "ultrafast", "-crf", "23",
+            ]
+        run_ffmpeg([
+            "-y", *self._background_input(bg, False, start, loop),
+            "-t", str(duration),
+            *codec_args, "-an", str(out)
+        ], "compose.prepare_background", duration=duration)
+        return out
+    
+    def compose(
+        self, script: Script, audio: AudioFile, subtitles: Subtitles, output_path: Path,
+        background_image: Optional[Path] = None, used_backgrounds: Optional[list[str]] = None,
+        profiles: Optional[list[OutputProfile]] = None,
+    ) -> Path:
+        """
+        Monte la vidéo et en écrit toutes les variantes (profils) à partir d'un seul décodage.
+        Retourne la sortie principale ; les variantes suivent variant_paths().
+        """
+        console.print("[bold blue]🎬 Composition vidéo...[/bold blue]")
+        # Chemin de rendu choisi d'après les capacités de ffmpeg, avant tout encodage
+        caps = ffmpeg_capabilities()
+        if not caps.available or not caps.has_encoder("libx264"):
+            raise RuntimeError("ffmpeg introuvable ou compilé sans libx264 : montage impossible")
+        if not caps.has_filter("ass"):
+            console.print("[yellow]⚠ ffmpeg sans libass : sous-titres non incrustés[/yellow]")
+        profiles = profiles or output_profiles()
+        # Intermédiaires dans un espace propre au job : aucun conflit entre montages parallèles
+        # Estimation : fond préparé + image animée, ~2 Mo par seconde de vidéo
+        estimate = int((audio.duration + 0.5) * 2 * 1024 * 1024)
+        with job_workspace(script.id, estimate=estimate) as work:
+            return self._compose_in(
+                work, script, audio, subtitles, output_path, background_image, used_backgrounds, profiles
+            )
+
+    def _compose_in(
+        self, work: Path, script: Script, audio: AudioFile, subtitles: Subtitles, output_path: Path,
+        background_image: Optional[Path], used_backgrounds: Optional[list[str]], profiles: list[OutputProfile],
+    ) -> Path:
+        duration = audio.duration + 0.5
+        
+        # Background (vidéo ou image, mise au format pendant le rendu)
+        if background_image and background_image.exists():
+            bg = background_image
+        else:
+            bg = self.get_background_video(script.format.value, duration, used_backgrounds=used_backgrounds, workspace=work)
+        is_image = bg.suffix.lower() not in VIDEO_EXTENSIONS
+        # Passage du fond : image clé aléatoire, sans boucle si le clip est assez long
+        start, loop = (0.0, True) if is_image else self.background_window(bg, duration, seed=script.id)
+
+        self.last_used_bg = bg
+
+        # ASS subtitles
+        ass = work / f"{script.id}.ass"
+        SubtitleStyler.generate_ass(subtitles.segments, ass)
+
+        # Cache : même fond + même audio + mêmes sous-titres + même habillage → même MP4 (par profil)
+        key = cache_key(
+            "video", hash_file(bg), start, loop, hash_file(audio.path), hash_file(ass), duration,
+            self.width, self.height, settings.watermark_enabled, settings.watermark_text,
+            settings.watermark_position, settings.watermark_font_size,
+            settings.encode_preset, settings.encode_crf,
+        )
+        outputs = variant_paths(output_path, profiles)
+        keys = {p.name: cache_key(key, p.model_dump()) for p in profiles}
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        if all(
+            artifact_cache.fetch("videos", keys[name], path.suffix, path) is not None
+            for name, path in outputs.items()
+        ):
+            console.print(f"[green]✓ Vidéo en cache : {output_path}[/green]")
+            return output_path
+
+        def _done() -> Path:
+            for name, path in outputs.items():
+                artifact_cache.store("videos", keys[name], path)
+            for name, path in list(outputs.items())[1:]:
+                console.print(f"[green]✓ Variante {name}: {path}[/green]")
+            console.print(f"[green]✓ Vidéo: {output_path}[/green]")
+            return output_path
+
+        # Les tranches ne produisent qu'une sortie : plusieurs profils passent par split
+        if settings.compose_chunked and len(profiles) == 1:
+            if self._render_chunked(
+                bg, is_image, audio, subtitles, work, output_path, duration,
+                profile=profiles[0], start=start, loop=loop,
+            ):
+                return _done()
+            console.print("[yellow]Rendu par tranches indisponible, rendu en un passage...[/yellow]")
+
+        if settings.compose_single_pass or len(profiles) > 1:
+            if self._render_single_pass(
+                bg, is_image, audio, ass, output_path, duration, profiles=profiles, start=start, loop=loop,
+            ):
+                return _done()
+            console.print("[yellow]Rendu single-pass échoué, rendu en deux passes...[/yellow]")
+
+        # Deux passes : sortie principale uniquement
+        if is_image:
+            bg = self._image_to_video(bg, duration, work)
+        prepared = self.prepare_background(bg, duration, work, start=start, loop=loop)
+
+        # Compose
+        filter_str = f"[0:v]{self._overlay_filters(ass)}{self._profile_scale(profiles[0])}[v]"
+
+        result = run_ffmpeg([
+            "-y", "-i", str(prepared), "-i", str(audio.path),
             "-filter_complex", filter_str,
             "-map", "[v]", "-map", "1:a",
-            "-c:v", "libx264", "-preset", "ultrafast", "-crf", "20",
-            "-c:a", "aac", "-b:a", "192k", "-shortest", "-movflags", "+faststart",
+            *self._encode_args(profiles[0], audio=audio), "-shortest",
             str(output_path)
-        ], capture_output=True, text=True, timeout=300)
+        ], "compose.overlay", duration=duration)
         
         if result.returncode != 0:
             return self._fallback(prepared, audio, subtitles, output_path)
-        
+
+        artifact_cache.store("videos", keys[profiles[0].name], output_path)
         console.print(f"[green]✓ Vidéo: {output_path}[/green]")
         return output_path
+
+    def _profile_scale(self, profile: OutputProfile) -> str:
+        """Redimensionnement vers la résolution du profil (rien si c'est celle du rendu)."""
+        if (profile.width, profile.height) == (self.width, self.height):
+            return ""
+        return f",scale={profile.width}:{profile.height}"
+
+    @staticmethod
+    def _audio_args(audio: AudioFile, profile: OutputProfile) -> list[str]:
+        """
+        Piste voix déjà en AAC (normalisée) au débit du profil : copiée telle
+        quelle. Sinon réencodée au débit du profil (reels, proxy...).
+        """
+        bitrate = profile.audio_bitrate or settings.voice_audio_bitrate
+        if audio.path.suffix.lower() in AAC_SUFFIXES and bitrate == settings.voice_audio_bitrate:
+            return ["-c:a", "copy"]
+        return ["-c:a", "aac", "-b:a", bitrate]
+
+    @classmethod
+    def _encode_args(
+        cls, profile: OutputProfile, threads: Optional[int] = None, audio: Optional[AudioFile] = None,
+    ) -> list[str]:
+        """
+        Options d'encodage ffmpeg d'une sortie selon son profil. Preset, CRF et
+        threads non fixés par le profil viennent des réglages ENCODE_*.
+        """
+        args = ["-c:v", "libx264", "-preset", profile.preset or settings.encode_preset, "-pix_fmt", "yuv420p"]
+        if profile.video_bitrate:
+            args += ["-b:v", profile.video_bitrate]
+        else:
+            args += ["-crf", str(profile.crf if profile.crf is not None else settings.encode_crf)]
+        if profile.max_bitrate:
+            args += ["-maxrate", profile.max_bitrate, "-bufsize", profile.max_bitrate]
+        threads = threads or settings.encode_threads
+        if threads:
+            args += ["-threads", str(threads)]
+        args += cls._audio_args(audio, profile) if audio else ["-an"]
+        if profile.faststart:
+            args += ["-movflags", "+faststart"]
+        return args
+
+    def _render_single_pass(
+        self, bg: Path, is_image: bool, audio: AudioFile, ass: Path, output_path: Path, duration: float,
+        threads: Optional[int] = None, profiles: Optional[list[OutputProfile]] = None,
+        start: float = 0.0, loop: bool = True,
+    ) -> bool:
+        """
+        Rendu en un seul décodage/encodage : source bouclée → format vertical →
+        sous-titres ASS → watermark, audio mappé directement. Aucun fichier intermédiaire.
+        Avec plusieurs profils, l'image habillée est dupliquée (split) vers chaque encodeur.
+        """
+        profiles = profiles or [OUTPUT_PROFILES["master"]]
+        outputs = variant_paths(output_path, profiles)
+
+        input_args = self._background_input(bg, is_image, start, loop)
+
+        filter_str = f"[0:v]{self._scale_crop_filter(bg)},format=yuv420p,{self._overlay_filters(ass)}"
+        if len(profiles) == 1:
+            filter_str += f"{self._profile_scale(profiles[0])}[v0]"
+        else:
+            filter_str += f",split={len(profiles)}" + "".join(f"[s{i}]" for i in range(len(profiles)))
+            for i, profile in enumerate(profiles):
+                filter_str += f";[s{i}]{self._profile_scale(profile).lstrip(',') or 'null'}[v{i}]"
+
+        output_args = []
+        for i, profile in enumerate(profiles):
+            output_args += [
+                "-map", f"[v{i}]", "-map", "1:a", "-t", str(duration),
+                *self._encode_args(profile, threads, audio), "-shortest",
+                str(outputs[profile.name]),
+            ]
+
+        result = run_ffmpeg([
+            "-y", *input_args, "-i", str(audio.path),
+            "-filter_complex", filter_str,
+            *output_args,
+        ], "compose.single_pass", duration=duration)
+
+        if result.returncode != 0:
+            console.print(f"[dim]{result.stderr[-300:]}[/dim]")
+            return False
+        return True
+
+    @staticmethod
+    def chunk_bounds(duration: float, chunks: int) -> list[tuple[float, float]]:
+        """
+        Découpe [0, duration] en au plus `chunks` tranches dont les bornes tombent
+        sur des multiples du GOP (nombre entier d'images, image clé côté source).
+        """
+        gop = settings.mezzanine_gop_seconds
+        chunks = max(1, min(chunks, int(duration // settings.compose_chunk_min_seconds)))
+        step = math.ceil(duration / chunks / gop) * gop
+        bounds = []
+        start = 0.0
+        while start < duration - 1e-6:
+            end = min(start + step, duration)
+            bounds.append((start, end))
+            start = end
+        return bounds
+
+    def _render_chunked(
+        self, bg: Path, is_image: bool, audio: AudioFile, subtitles: Subtitles, work: Path,
+        output_path: Path, duration: float, workers: Optional[int] = None, threads: Optional[int] = None,
+        profile: Optional[OutputProfile] = None, start: float = 0.0, loop: bool = True,
+    ) -> bool:
+        """
+        Rendu par tranches : chaque tranche (même graphe de filtres, ASS recalé)
+        est encodée par son propre process ffmpeg, puis les tranches sont jointes
+        sans réencodage (concat) avec la piste audio.
+        """
+        cores = threads or os.cpu_count() or 1
+        workers = workers or settings.compose_chunk_workers or max(1, cores // 2)
+        profile = profile or OUTPUT_PROFILES["master"]
+        bounds = self.chunk_bounds(duration, workers)
+        if len(bounds) < 2:
+            return False
+        threads_per_chunk = max(1, cores // min(workers, len(bounds)))
+        bg_duration = 0.0 if is_image else background_catalogue.duration(bg)
+        fps = str(settings.video_fps)
+
+        def render_chunk(i: int, chunk_start: float, chunk_end: float) -> Optional[Path]:
+            chunk = work / f"chunk_{i:03d}.mp4"
+            ass = SubtitleStyler.generate_ass(
+                SubtitleStyler.window(subtitles.segments, chunk_start, chunk_end), work / f"chunk_{i:03d}.ass"
+            )
+            # La tranche reprend là où en serait la lecture continue de la fenêtre
+            offset = start + chunk_start
+            if loop and bg_duration:
+                offset %= bg_duration
+            result = run_ffmpeg([
+                "-y", *self._background_input(bg, is_image, offset, loop),
+                "-filter_complex",
+                f"[0:v]{self._scale_crop_filter(bg)},format=yuv420p,{self._overlay_filters(ass)}{self._profile_scale(profile)}[v]",
+                "-map", "[v]", "-t", f"{chunk_end - chunk_start:.3f}", "-r", fps,
+                *self._encode_args(profile, threads_per_chunk),
+                str(chunk)
+            ], "compose.chunk", duration=chunk_end - chunk_start)
+            if result.returncode != 0:
+                console.print(f"[dim]Tranche {i} : {result.stderr[-300:]}[/dim]")
+                return None
+            return chunk
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            chunks = list(pool.map(lambda b: render_chunk(b[0], *b[1]), enumerate(bounds)))
+        if not all(chunks):
+            return False
+
+        concat_list = work / "chunks.txt"
+        concat_list.write_text("".join(f"file '{c.resolve()}'\n" for c in chunks), encoding="utf-8")
+        result = run_ffmpeg([
+            "-y", "-f", "concat", "-safe", "0", "-i", str(concat_list),
+            "-i", str(audio.path),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy", *self._audio_args(audio, profile), "-shortest",
+            *(["-movflags", "+faststart"] if profile.faststart else []),
+            str(output_path)
+        ], "compose.concat", duration=duration)
+        if result.returncode != 0:
+            console.print(f"[dim]Concat : {result.stderr[-300:]}[/dim]")
+            return False
+        console.print(f"[dim]Rendu en {len(chunks)} tranches ({workers} workers × {threads_per_chunk} threads)[/dim]")
+        return True
     
     def compose_with_thumbnail(
         self,
@@ -691,33 +1258,36 @@ class VideoComposerPro:
         output_path: Path,
         background_image: Optional[Path] = None,
         used_backgrounds: Optional[list[str]] = None,
+        profiles: Optional[list[OutputProfile]] = None,
     ) -> Path:
         """
         Pass-through vers compose() — vignette désactivée.
         La méthode est conservée pour compatibilité.
         """
-        return self.compose(script, audio, subtitles, output_path, background_image, used_backgrounds=used_backgrounds)
+        return self.compose(
+            script, audio, subtitles, output_path, background_image,
+            used_backgrounds=used_backgrounds, profiles=profiles,
+        )
 
-    def _image_to_video(self, img: Path, duration: float) -> Path:
-        out = self.temp_dir / "img_bg.mp4"
-        subprocess.run([
-            "ffmpeg", "-y", "-loop", "1", "-i", str(img), "-t", str(duration),
+    def _image_to_video(self, img: Path, duration: float, workspace: Optional[Path] = None) -> Path:
+        out = (workspace or self.temp_dir) / "img_bg.mp4"
+        run_ffmpeg([
+            "-y", "-loop", "1", "-i", str(img), "-t", str(duration),
             "-vf", f"scale={self.width}:{self.height}:force_original_aspect_ratio=increase,crop={self.width}:{self.height}",
             "-c:v", "libx264", "-pix_fmt", "yuv420p", str(out)
-        ], capture_output=True, timeout=60)
+        ], "compose.image_to_video", timeout=60, duration=duration)
         return out
     
     def _fallback(self, bg: Path, audio: AudioFile, subs: Subtitles, out: Path) -> Path:
         console.print("[yellow]Fallback SRT...[/yellow]")
         srt_esc = str(subs.srt_path).replace(":", "\\:")
         style = "FontName=Arial Black,FontSize=60,PrimaryColour=&H00FFFFFF,OutlineColour=&H00000000,Outline=4,Shadow=2,MarginV=200"
-        subprocess.run([
-            "ffmpeg", "-y", "-i", str(bg), "-i", str(audio.path),
+        run_ffmpeg([
+            "-y", "-i", str(bg), "-i", str(audio.path),
             "-vf", f"subtitles='{srt_esc}':force_style='{style}'",
-            "-c:v", "libx264", "-preset", "ultrafast", "-crf", "20",
-            "-c:a", "aac", "-b:a", "192k", "-shortest", "-movflags", "+faststart",
+            *self._encode_args(OUTPUT_PROFILES["master"], audio=audio), "-shortest",
             str(out)
-        ], capture_output=True, timeout=300)
+        ], "compose.fallback_srt", duration=audio.duration)
         return out
 
 
@@ -736,21 +1306,99 @@ class VideoPipeline:
     ) -> Video:
         settings.ensure_directories()
 
-        subtitles = self.subtitle_generator.generate(audio.path, script)
+        subtitles = self.generate_subtitles(script, audio)
+        return self.render(
+            script, audio, subtitles, background_image,
+            include_thumbnail=include_thumbnail, used_backgrounds=used_backgrounds,
+        )
+
+    def generate_subtitles(
+        self,
+        script: Script,
+        audio: AudioFile,
+        subtitle_generator: Optional[SimpleSubtitleGenerator] = None,
+    ) -> Subtitles:
+        """Timings TTS si l'audio en porte, sinon VAD (SUBTITLE_TIMING=vad) ou transcription Whisper."""
+        generator = subtitle_generator or self.subtitle_generator
+        if audio.timed_segments:
+            return generator.from_segments(script, audio.timed_segments)
+        if settings.subtitle_timing == "vad":
+            return generator.from_vad(audio.path, script)
+        return generator.generate(audio.path, script)
+
+    def generate_subtitles_batch(
+        self,
+        items: list[tuple[Script, AudioFile]],
+        subtitle_generator: Optional[SimpleSubtitleGenerator] = None,
+    ) -> tuple[dict[int, Subtitles], dict[int, Exception]]:
+        """
+        generate_subtitles pour plusieurs clips : ceux sans timings TTS sont transcrits en lot.
+        Si le lot échoue, chaque clip est repris seul : une piste illisible n'échoue que pour elle.
+
+        Returns:
+            Sous-titres et erreurs, indexés par position dans items
+        """
+        generator = subtitle_generator or self.subtitle_generator
+        results: dict[int, Subtitles] = {}
+        failures: dict[int, Exception] = {}
+        to_transcribe = []
+        for i, (script, audio) in enumerate(items):
+            try:
+                if audio.timed_segments:
+                    results[i] = generator.from_segments(script, audio.timed_segments)
+                elif settings.subtitle_timing == "vad":
+                    results[i] = generator.from_vad(audio.path, script)
+                else:
+                    to_transcribe.append(i)
+            except Exception as e:
+                failures[i] = e
+
+        if len(to_transcribe) > 1:
+            try:
+                transcribed = generator.generate_batch([(items[i][1].path, items[i][0]) for i in to_transcribe])
+                results.update(zip(to_transcribe, transcribed))
+                to_transcribe = []
+            except Exception as e:
+                console.print(f"[yellow]⚠ Transcription en lot échouée ({e}), reprise clip par clip[/yellow]")
+        for i in to_transcribe:
+            try:
+                results[i] = generator.generate(items[i][1].path, items[i][0])
+            except Exception as e:
+                failures[i] = e
+        return results, failures
+
+    def render(
+        self,
+        script: Script,
+        audio: AudioFile,
+        subtitles: Subtitles,
+        background_image: Optional[Path] = None,
+        include_thumbnail: bool = True,
+        used_backgrounds: Optional[list[str]] = None,
+    ) -> Video:
+        """Montage final à partir de sous-titres déjà générés."""
+        settings.ensure_directories()
 
         video_path = settings.output_dir / "videos" / f"noradar_{script.format.value}_{script.id}.mp4"
+        profiles = output_profiles()
 
         if include_thumbnail and script.thumbnail_text.get("line1"):
             self.video_composer.compose_with_thumbnail(
-                script, audio, subtitles, video_path, background_image, used_backgrounds=used_backgrounds
+                script, audio, subtitles, video_path, background_image,
+                used_backgrounds=used_backgrounds, profiles=profiles,
             )
             console.print("[cyan]📱 Vignette intégrée (TikTok + Instagram ready)[/cyan]")
         else:
-            self.video_composer.compose(script, audio, subtitles, video_path, background_image, used_backgrounds=used_backgrounds)
+            self.video_composer.compose(
+                script, audio, subtitles, video_path, background_image,
+                used_backgrounds=used_backgrounds, profiles=profiles,
+            )
 
+        variants = {name: path for name, path in variant_paths(video_path, profiles).items() if path.exists()}
         video = Video(
             id=script.id, script=script, audio=audio, subtitles=subtitles,
-            video_path=video_path, background_path=Path(self.video_composer.last_used_bg) if hasattr(self.video_composer, 'last_used_bg') else None, status=VideoStatus.VIDEO_READY,
+            video_path=video_path, variants=variants,
+            background_path=self.video_composer.last_used_bg, status=VideoStatus.VIDEO_READY,
         )
         console.print(f"[bold green]✓ Vidéo complète: {video.filename}[/bold green]")
         return video
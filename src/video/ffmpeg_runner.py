@@ -0,0 +1,247 @@
+"""
+Lancement instrumenté des encodages ffmpeg.
+
+run_ffmpeg() ajoute `-progress pipe:1` et lit l'avancement au fil de l'eau
+(out_time, fps, speed, bitrate) : transmis à un callback éventuel et affiché
+en console toutes les FFMPEG_PROGRESS_INTERVAL secondes.
+
+Chaque encodage laisse un bilan (temps mur, facteur temps réel, temps CPU,
+pic RSS du process ffmpeg, lus par wait4 comme getrusage(RUSAGE_CHILDREN)
+mais limités à ce process) dans `encode_stats`, agrégé par étiquette en fin
+de batch : on voit quelle étape du montage consomme le budget de rendu.
+"""
+
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+from pydantic import BaseModel
+from rich.console import Console
+from rich.table import Table
+
+from src.config import settings
+
+console = Console()
+
+
+class EncodeProgress(BaseModel):
+    """Dernier bloc d'avancement émis par ffmpeg."""
+
+    frame: int = 0
+    fps: float = 0.0
+    bitrate: str = ""
+    total_size: int = 0
+    out_time: float = 0.0
+    speed: float = 0.0
+    done: bool = False
+
+
+class EncodeSummary(BaseModel):
+    """Bilan d'un encodage."""
+
+    label: str
+    returncode: int
+    wall_time: float
+    media_time: float = 0.0
+    cpu_user: float = 0.0
+    cpu_system: float = 0.0
+    peak_rss_mb: float = 0.0
+
+    @property
+    def realtime_factor(self) -> float:
+        """Secondes de média produites par seconde de temps mur."""
+        return self.media_time / self.wall_time if self.wall_time else 0.0
+
+    @property
+    def cpu_time(self) -> float:
+        return self.cpu_user + self.cpu_system
+
+
+class FFmpegResult(BaseModel):
+    returncode: int
+    stderr: str = ""
+    summary: EncodeSummary
+
+
+def _number(value: str, suffix: str = "") -> float:
+    try:
+        return float(value.strip().removesuffix(suffix))
+    except ValueError:
+        return 0.0
+
+
+def _apply(progress: EncodeProgress, key: str, value: str) -> None:
+    """Met à jour l'avancement avec une ligne clé=valeur de -progress."""
+    if key == "frame":
+        progress.frame = int(_number(value))
+    elif key == "fps":
+        progress.fps = _number(value)
+    elif key == "bitrate":
+        progress.bitrate = value.strip()
+    elif key == "total_size":
+        progress.total_size = int(_number(value))
+    elif key == "out_time_us":
+        progress.out_time = max(0.0, _number(value) / 1_000_000)
+    elif key == "speed":
+        progress.speed = _number(value, "x")
+    elif key == "progress":
+        progress.done = value.strip() == "end"
+
+
+def _peak_rss_mb(maxrss: int) -> float:
+    # ru_maxrss : kilo-octets sous Linux, octets sous macOS
+    return maxrss / (1024 * 1024) if sys.platform == "darwin" else maxrss / 1024
+
+
+class EncodeStats:
+    """Bilans des encodages depuis le dernier reset (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.summaries: list[EncodeSummary] = []
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.summaries = []
+
+    def record(self, summary: EncodeSummary) -> None:
+        with self._lock:
+            self.summaries.append(summary)
+
+    def by_label(self) -> dict[str, list[EncodeSummary]]:
+        with self._lock:
+            grouped: dict[str, list[EncodeSummary]] = {}
+            for summary in self.summaries:
+                grouped.setdefault(summary.label, []).append(summary)
+            return grouped
+
+    def report(self) -> None:
+        """Tableau par étape : encodages, temps mur, temps réel, CPU, pic RSS."""
+        grouped = self.by_label()
+        if not grouped:
+            return
+        table = Table(title="Encodages ffmpeg")
+        table.add_column("Étape", style="cyan")
+        table.add_column("N", justify="right")
+        table.add_column("Mur (s)", justify="right")
+        table.add_column("Temps réel", justify="right")
+        table.add_column("CPU (s)", justify="right")
+        table.add_column("Pic RSS (Mo)", justify="right")
+        for label, items in sorted(grouped.items(), key=lambda kv: -sum(s.wall_time for s in kv[1])):
+            wall = sum(s.wall_time for s in items)
+            media = sum(s.media_time for s in items)
+            table.add_row(
+                label, str(len(items)), f"{wall:.1f}",
+                f"×{media / wall:.2f}" if wall and media else "—",
+                f"{sum(s.cpu_time for s in items):.1f}",
+                f"{max(s.peak_rss_mb for s in items):.0f}",
+            )
+        console.print(table)
+
+
+encode_stats = EncodeStats()
+
+
+def run_ffmpeg(
+    args: list[str],
+    label: str,
+    timeout: Optional[float] = 300,
+    duration: Optional[float] = None,
+    on_progress: Optional[Callable[[EncodeProgress], None]] = None,
+) -> FFmpegResult:
+    """
+    Lance `ffmpeg <args>` en suivant son avancement.
+
+    Args:
+        args: Arguments de ffmpeg (sans le nom du binaire)
+        label: Étape à laquelle rattacher le bilan (ex. "compose.single_pass")
+        timeout: Durée maximale (secondes) ; au-delà le process est tué et
+            subprocess.TimeoutExpired levée, comme subprocess.run
+        duration: Durée attendue du média, pour afficher un pourcentage
+        on_progress: Appelé à chaque bloc d'avancement
+
+    Returns:
+        Code retour, fin de stderr et bilan de l'encodage
+    """
+    cmd = ["ffmpeg", "-hide_banner", "-nostats", "-progress", "pipe:1", *args]
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, errors="replace",
+    )
+
+    # stderr lu à part pour ne jamais bloquer ffmpeg
+    stderr_tail: deque[str] = deque(maxlen=200)
+    reader = threading.Thread(target=lambda: stderr_tail.extend(proc.stderr), daemon=True)
+    reader.start()
+
+    timed_out = threading.Event()
+
+    def _kill() -> None:
+        timed_out.set()
+        proc.kill()
+
+    watchdog = threading.Timer(timeout, _kill) if timeout else None
+    if watchdog:
+        watchdog.daemon = True
+        watchdog.start()
+
+    progress = EncodeProgress()
+    show = settings.ffmpeg_progress
+    last_shown = started
+    try:
+        for line in proc.stdout:
+            key, _, value = line.partition("=")
+            _apply(progress, key.strip(), value)
+            if key.strip() != "progress":
+                continue
+            if on_progress:
+                on_progress(progress.model_copy())
+            now = time.perf_counter()
+            if show and not progress.done and now - last_shown >= settings.ffmpeg_progress_interval:
+                last_shown = now
+                percent = f" ({progress.out_time / duration:.0%})" if duration else ""
+                console.print(
+                    f"[dim]  {label} : {progress.out_time:.1f}s{percent}, "
+                    f"{progress.fps:.0f} img/s, ×{progress.speed:.2f}, {progress.bitrate}[/dim]"
+                )
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        if hasattr(os, "wait4"):
+            _, status, usage = os.wait4(proc.pid, 0)
+            proc.returncode = os.waitstatus_to_exitcode(status)
+        else:
+            proc.wait()
+            usage = None
+        if watchdog:
+            watchdog.cancel()
+        reader.join(timeout=5)
+        proc.stdout.close()
+        proc.stderr.close()
+
+    stderr = "".join(stderr_tail)
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout, stderr=stderr)
+
+    summary = EncodeSummary(
+        label=label,
+        returncode=proc.returncode,
+        wall_time=time.perf_counter() - started,
+        media_time=progress.out_time,
+        cpu_user=usage.ru_utime if usage else 0.0,
+        cpu_system=usage.ru_stime if usage else 0.0,
+        peak_rss_mb=_peak_rss_mb(usage.ru_maxrss) if usage else 0.0,
+    )
+    encode_stats.record(summary)
+    if show:
+        status = "✓" if proc.returncode == 0 else "✗"
+        console.print(
+            f"[dim]  {status} {label} : {summary.wall_time:.1f}s, ×{summary.realtime_factor:.2f} temps réel, "
+            f"CPU {summary.cpu_time:.1f}s, RSS {summary.peak_rss_mb:.0f} Mo[/dim]"
+        )
+    return FFmpegResult(returncode=proc.returncode, stderr=stderr, summary=summary)
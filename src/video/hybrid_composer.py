@@ -4,12 +4,15 @@ NE MODIFIE AUCUN AUTRE FICHIER DU PROJET
 """
 
 import random
-import subprocess
-import tempfile
+import uuid
 from pathlib import Path
 
 from rich.console import Console
 
+from src.utils.workspace import job_workspace
+from src.video.catalogue import background_catalogue
+from src.video.ffmpeg_runner import encode_stats, run_ffmpeg
+
 console = Console()
 
 # --- Constants ---
@@ -66,7 +69,9 @@ def _find_font() -> str:
 
 
 def _find_latest_audio() -> Path | None:
-    files = sorted(AUDIO_DIR.glob("*.mp3"), key=lambda p: p.stat().st_mtime)
+    files = sorted(
+        [*AUDIO_DIR.glob("*.mp3"), *AUDIO_DIR.glob("*.m4a")], key=lambda p: p.stat().st_mtime
+    )
     return files[-1] if files else None
 
 
@@ -78,22 +83,14 @@ def _pick_broll(count: int = 2) -> list[Path]:
 
 
 def _probe_duration(path: Path) -> float:
-    r = subprocess.run(
-        [
-            "ffprobe", "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(path),
-        ],
-        capture_output=True, text=True,
-    )
-    return float(r.stdout.strip())
+    # Durée indexée par le catalogue des fonds (ffprobe une seule fois par fichier)
+    return background_catalogue.duration(path)
 
 
-def _run_ffmpeg(cmd: list[str], label: str):
-    r = subprocess.run(cmd, capture_output=True, text=True)
+def _run_ffmpeg(args: list[str], stage: str, detail: str, duration: float):
+    r = run_ffmpeg(args, f"hybrid.{stage}", timeout=None, duration=duration)
     if r.returncode != 0:
-        raise RuntimeError(f"FFmpeg [{label}] echoue:\n{r.stderr[-800:]}")
+        raise RuntimeError(f"FFmpeg [{stage}:{detail}] echoue:\n{r.stderr[-800:]}")
 
 
 # ── Segment builders ─────────────────────────────────────────────────
@@ -119,14 +116,14 @@ def _make_text_clip(
     )
 
     _run_ffmpeg([
-        "ffmpeg", "-y",
+        "-y",
         "-f", "lavfi", "-i",
         f"color=c=black:s={WIDTH}x{HEIGHT}:d={duration}:r={FPS}",
         "-t", str(duration),
         "-vf", vf,
         "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
         "-an", str(output),
-    ], f"text:{name}")
+    ], "text", name, duration)
 
 
 def _make_video_clip(
@@ -144,13 +141,13 @@ def _make_video_clip(
     )
 
     _run_ffmpeg([
-        "ffmpeg", "-y",
+        "-y",
         *input_args,
         "-t", str(duration),
         "-vf", vf,
         "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
         "-an", str(output),
-    ], f"clip:{source.name}")
+    ], "clip", source.name, duration)
 
 
 # ── Assembly ─────────────────────────────────────────────────────────
@@ -185,7 +182,7 @@ def _assemble(
 
     filter_complex = ";".join(filters)
 
-    cmd = ["ffmpeg", "-y", *inputs, "-filter_complex", filter_complex]
+    cmd = ["-y", *inputs, "-filter_complex", filter_complex]
 
     if audio:
         cmd.extend(["-map", "[vout]", "-map", f"{n}:a"])
@@ -198,7 +195,7 @@ def _assemble(
         str(output),
     ])
 
-    _run_ffmpeg(cmd, "assemble")
+    _run_ffmpeg(cmd, "assemble", output.name, sum(durations) - CROSSFADE * (n - 1))
 
 
 # ── Entry point ──────────────────────────────────────────────────────
@@ -235,8 +232,10 @@ def create_hybrid_test():
     console.print()
 
     # --- Generation des segments ---
-    with tempfile.TemporaryDirectory(prefix="hybrid_") as tmp_str:
-        tmp = Path(tmp_str)
+    encode_stats.reset_stats()
+    job_id = str(uuid.uuid4())[:8]
+    estimate = int(sum(d for _, _, d in TIMELINE) * 2 * 1024 * 1024)
+    with job_workspace(f"hybrid_{job_id}", estimate=estimate) as tmp:
         clips: list[Path] = []
         durations: list[float] = []
         broll_idx = 0
@@ -274,10 +273,11 @@ def create_hybrid_test():
         # --- Assemblage ---
         console.print("\n[blue]Assemblage xfade crossfade...[/blue]")
         OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-        out = OUTPUT_DIR / "hybrid_test.mp4"
+        out = OUTPUT_DIR / f"hybrid_test_{job_id}.mp4"
 
         _assemble(clips, durations, audio, out)
 
     total = sum(d for _, _, d in TIMELINE) - CROSSFADE * (len(TIMELINE) - 1)
     console.print(f"\n[bold green]✓ Video hybride : {out}[/bold green]")
     console.print(f"[dim]Duree estimee : ~{total:.1f}s[/dim]")
+    encode_stats.report()
@@ -0,0 +1,202 @@
+"""
+Informations ffmpeg / ffprobe, sondées une seule fois.
+
+- ffmpeg_capabilities() : filtres, encodeurs, libass, fontconfig, une fois
+  par process. Le montage choisit son chemin de rendu avant d'encoder.
+- media_info : flux et durée de chaque fichier (un ffprobe), mémorisés par
+  (chemin, taille, mtime) dans un cache persistant (cache/mediainfo.json).
+  Les images clés, plus coûteuses, sont sondées à la demande et gardées
+  dans la même entrée.
+"""
+
+import functools
+import json
+import os
+import re
+import subprocess
+import threading
+from pathlib import Path
+from typing import Optional
+from pydantic import BaseModel, Field
+from rich.console import Console
+
+from src.config import settings
+
+console = Console()
+
+
+class FFmpegCapabilities(BaseModel):
+    """Ce que le binaire ffmpeg installé sait faire."""
+
+    available: bool = False
+    version: str = ""
+    filters: set[str] = Field(default_factory=set)
+    encoders: set[str] = Field(default_factory=set)
+    libass: bool = False
+    fontconfig: bool = False
+
+    def has_filter(self, name: str) -> bool:
+        """Liste des filtres inconnue (sonde en échec) : on suppose le filtre présent."""
+        return not self.filters or name in self.filters
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+
+def _ffmpeg_lines(*args: str) -> list[str]:
+    result = subprocess.run(["ffmpeg", "-hide_banner", *args], capture_output=True, text=True, timeout=30)
+    return result.stdout.splitlines() if result.returncode == 0 else []
+
+
+_FILTER_FLAGS = re.compile(r"^[T.][S.][C.]$")
+
+
+def _filter_names(lines: list[str]) -> set[str]:
+    """Noms de `ffmpeg -filters` : lignes dont la 1re colonne est le drapeau TSC (pas d'en-tête '---')."""
+    names = set()
+    for line in lines:
+        parts = line.split()
+        # La légende ("T.. = Timeline support") a le même drapeau : on l'écarte
+        if len(parts) >= 2 and _FILTER_FLAGS.match(parts[0]) and parts[1] != "=":
+            names.add(parts[1])
+    return names
+
+
+def _listed_names(lines: list[str]) -> set[str]:
+    """Noms de la 2e colonne de `ffmpeg -encoders` (après l'en-tête '------')."""
+    names = set()
+    body = False
+    for line in lines:
+        if line.strip().startswith("---"):
+            body = True
+            continue
+        parts = line.split()
+        if body and len(parts) >= 2:
+            names.add(parts[1])
+    return names
+
+
+@functools.lru_cache(maxsize=None)
+def ffmpeg_capabilities() -> FFmpegCapabilities:
+    """Capacités de ffmpeg (sondées une fois par process)."""
+    try:
+        version = _ffmpeg_lines("-version")
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        console.print("[red]✗ ffmpeg introuvable[/red]")
+        return FFmpegCapabilities()
+    if not version:
+        return FFmpegCapabilities()
+
+    buildconf = " ".join(version)
+    filters = _filter_names(_ffmpeg_lines("-filters"))
+    return FFmpegCapabilities(
+        available=True,
+        version=version[0],
+        filters=filters,
+        encoders=_listed_names(_ffmpeg_lines("-encoders")),
+        libass="--enable-libass" in buildconf or "ass" in filters,
+        fontconfig="--enable-libfontconfig" in buildconf or "--enable-fontconfig" in buildconf,
+    )
+
+
+class MediaInfoCache:
+    """ffprobe mémorisé par (chemin, taille, mtime), persistant entre les exécutions."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        self._lock = threading.RLock()
+        self._entries: Optional[dict[str, dict]] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path or settings.mediainfo_cache_path
+
+    @property
+    def entries(self) -> dict[str, dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.path.exists():
+                try:
+                    self._entries = json.loads(self.path.read_text(encoding="utf-8"))
+                except json.JSONDecodeError:
+                    console.print(f"[yellow]⚠ Cache mediainfo illisible, reconstruction : {self.path}[/yellow]")
+        return self._entries
+
+    def save(self) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_text(json.dumps(self.entries), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+    def _entry(self, path: Path) -> dict:
+        """Entrée à jour pour un fichier (réinitialisée si le fichier a changé)."""
+        stat = path.stat()
+        key = str(path.resolve())
+        with self._lock:
+            entry = self.entries.get(key)
+            if not entry or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns:
+                entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                self.entries[key] = entry
+            return entry
+
+    def probe(self, path: Path) -> dict:
+        """Format et flux d'un fichier : {"format": {...}, "streams": [...]}."""
+        entry = self._entry(path)
+        if "probe" not in entry:
+            result = subprocess.run(
+                ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-of", "json", str(path)],
+                capture_output=True, text=True, timeout=30,
+            )
+            if result.returncode != 0:
+                return {"format": {}, "streams": []}
+            data = json.loads(result.stdout or "{}")
+            with self._lock:
+                entry["probe"] = {"format": data.get("format", {}), "streams": data.get("streams", [])}
+                self.save()
+        return entry["probe"]
+
+    def stream(self, path: Path, codec_type: str) -> dict:
+        """Premier flux d'un type ("video", "audio"), {} s'il n'y en a pas."""
+        return next((s for s in self.probe(path)["streams"] if s.get("codec_type") == codec_type), {})
+
+    def duration(self, path: Path) -> float:
+        return float(self.probe(path)["format"].get("duration", 0) or 0)
+
+    def video_info(self, path: Path) -> dict:
+        """Durée et résolution d'un clip."""
+        video = self.stream(path, "video")
+        return {
+            "duration": self.duration(path),
+            "width": int(video.get("width", 0)),
+            "height": int(video.get("height", 0)),
+        }
+
+    def keyframes(self, path: Path) -> list[float]:
+        """Horodatage des images clés (décodage des seules images clés)."""
+        entry = self._entry(path)
+        if "keyframes" not in entry:
+            result = subprocess.run(
+                [
+                    "ffprobe", "-v", "error", "-select_streams", "v:0",
+                    "-skip_frame", "nokey",
+                    "-show_entries", "frame=pts_time",
+                    "-of", "csv=p=0",
+                    str(path),
+                ],
+                capture_output=True, text=True, timeout=120,
+            )
+            keyframes = []
+            for line in result.stdout.splitlines():
+                line = line.strip().rstrip(",")
+                try:
+                    keyframes.append(round(float(line), 3))
+                except ValueError:
+                    continue
+            with self._lock:
+                entry["keyframes"] = keyframes
+                self.save()
+        return entry["keyframes"]
+
+
+media_info = MediaInfoCache()
@@ -0,0 +1,78 @@
+"""
+Préchargement des fonds Pexels.
+
+Avant la production, chaque dossier cache/pexels/<format> est complété
+jusqu'au quota (PEXELS_PREFETCH_PER_FORMAT) à partir du vocabulaire fixe
+PEXELS_KEYWORDS. Le montage pioche ensuite dans le cache (catalogue LRU)
+et n'attend jamais le réseau pour un fond.
+"""
+
+import random
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Optional
+from rich.console import Console
+
+from src.config import settings
+from src.video.composer import PEXELS_KEYWORDS, PexelsClient
+
+console = Console()
+
+
+def _cached_ids(format_dir: Path) -> set[str]:
+    return {p.stem for p in format_dir.glob("*.mp4")}
+
+
+def _prefetch_format(client: PexelsClient, format_type: str, quota: int) -> int:
+    """Complète le cache d'un format. Retourne le nombre de fonds téléchargés."""
+    format_dir = settings.pexels_cache_dir / format_type
+    format_dir.mkdir(parents=True, exist_ok=True)
+    present = _cached_ids(format_dir)
+    missing = quota - len(present)
+    if missing <= 0:
+        return 0
+
+    keywords = list(PEXELS_KEYWORDS.get(format_type, PEXELS_KEYWORDS["tuto"]))
+    random.shuffle(keywords)
+    downloaded = 0
+    for query in keywords:
+        videos = client.search_videos(query, per_page=10)
+        random.shuffle(videos)
+        for video in videos:
+            name = f"pexels_{video['id']}"
+            if name in present:
+                continue
+            if client.download_video(video, format_dir / f"{name}.mp4"):
+                present.add(name)
+                downloaded += 1
+                if downloaded >= missing:
+                    return downloaded
+    return downloaded
+
+
+def prefetch_backgrounds(formats: Optional[Iterable[str]] = None, quota: Optional[int] = None) -> dict[str, int]:
+    """
+    Remplit le cache Pexels de chaque format jusqu'au quota.
+
+    Args:
+        formats: Formats à précharger (tous ceux de PEXELS_KEYWORDS par défaut)
+        quota: Fonds par format (PEXELS_PREFETCH_PER_FORMAT par défaut)
+
+    Returns:
+        Nombre de fonds téléchargés par format
+    """
+    client = PexelsClient()
+    if not client.api_key or not settings.pexels_cache_enabled:
+        return {}
+
+    formats = list(dict.fromkeys(formats or PEXELS_KEYWORDS))
+    quota = min(quota or settings.pexels_prefetch_per_format, settings.pexels_cache_max_videos)
+
+    # Un format par worker : les téléchargements partagent le client keep-alive
+    with ThreadPoolExecutor(max_workers=max(1, min(settings.pipeline_io_workers, len(formats)))) as pool:
+        counts = dict(zip(formats, pool.map(lambda f: _prefetch_format(client, f, quota), formats)))
+
+    total = sum(counts.values())
+    if total:
+        console.print(f"[green]✓ Préchargement Pexels : {total} fond(s) ajouté(s)[/green]")
+    return counts
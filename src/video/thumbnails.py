@@ -0,0 +1,124 @@
+"""
+Rendu des vignettes en Python (Pillow).
+
+- Image de fond : première image clé du B-roll, extraite une seule fois par
+  clip (cache d'artefacts "frames"), floutée puis assombrie. Le fond prêt
+  est gardé en mémoire pour les vignettes suivantes du même clip.
+- Texte : polices ImageFont chargées une fois par taille.
+- Sortie PNG ou JPEG selon l'extension, écrite directement par Pillow
+  (ffmpeg ne sert qu'à extraire l'image clé, une fois par clip).
+"""
+
+import functools
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+
+from src.config import settings
+from src.storage.artifact_cache import artifact_cache, cache_key, hash_file
+from src.video.ffmpeg_runner import run_ffmpeg
+
+console = Console()
+
+FONT_PATHS = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans-Bold.ttf",
+    "/Library/Fonts/Arial Bold.ttf",
+]
+
+
+def extract_frame(video: Path) -> Optional[Path]:
+    """
+    Première image clé d'une vidéo en PNG, extraite une fois par contenu de fichier.
+    Seul appel ffmpeg du module, absent dès que le clip a déjà servi.
+    """
+    key = cache_key("frame", hash_file(video))
+    frame = settings.temp_dir / "thumbnails" / f"frame_{key[:16]}.png"
+    if frame.exists() or artifact_cache.fetch("frames", key, frame.suffix, frame) is not None:
+        return frame
+
+    frame.parent.mkdir(parents=True, exist_ok=True)
+    tmp = frame.with_name(f".{frame.name}.{os.getpid()}.{threading.get_ident()}.png")
+    result = run_ffmpeg([
+        "-y", "-skip_frame", "nokey", "-i", str(video),
+        "-frames:v", "1", str(tmp)
+    ], "thumbnail.frame", timeout=30)
+    if result.returncode != 0 or not tmp.exists():
+        tmp.unlink(missing_ok=True)
+        return None
+    os.replace(tmp, frame)
+    artifact_cache.store("frames", key, frame)
+    return frame
+
+
+@functools.lru_cache(maxsize=16)
+def load_font(size: int):
+    """Police grasse à la taille demandée (chargée une fois)."""
+    from PIL import ImageFont
+
+    for path in FONT_PATHS:
+        if Path(path).exists():
+            return ImageFont.truetype(path, size)
+    return ImageFont.load_default(size)
+
+
+@functools.lru_cache(maxsize=8)
+def _blurred_background(frame: str, mtime_ns: int, size: tuple[int, int]):
+    """Fond de vignette prêt (recadré, flouté, assombri), mémorisé par image source."""
+    from PIL import Image, ImageFilter, ImageOps
+
+    with Image.open(frame) as img:
+        base = ImageOps.fit(img.convert("RGB"), size, Image.Resampling.BILINEAR)
+    base = base.filter(ImageFilter.BoxBlur(5))
+    return Image.blend(base, Image.new("RGB", size, "black"), 0.3)
+
+
+def _background(frame: Optional[Path], size: tuple[int, int], color: str):
+    from PIL import Image
+
+    if frame is None:
+        return Image.new("RGB", size, color)
+    return _blurred_background(str(frame), frame.stat().st_mtime_ns, size).copy()
+
+
+def render_thumbnail(
+    output_path: Path,
+    lines: list[tuple[str, int, int]],
+    footer: str,
+    frame: Optional[Path] = None,
+    size: tuple[int, int] = (1080, 1920),
+    color: str = "#10B981",
+) -> Path:
+    """
+    Dessine une vignette.
+
+    Args:
+        output_path: Fichier .png ou .jpg
+        lines: (texte, taille de police, position verticale du haut du texte)
+        footer: Mention discrète en bas (ex. noradar.app)
+        frame: Image de fond (floutée) ; fond uni `color` si absente
+    """
+    from PIL import ImageDraw
+
+    image = _background(frame, size, color)
+    draw = ImageDraw.Draw(image, "RGBA")
+    width, height = size
+
+    for text, font_size, y in lines:
+        font = load_font(font_size)
+        draw.text(((width - draw.textlength(text, font=font)) / 2, y), text, font=font, fill="white")
+
+    font = load_font(30)
+    draw.text(
+        ((width - draw.textlength(footer, font=font)) / 2, height - 150),
+        footer, font=font, fill=(255, 255, 255, 178),
+    )
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path.suffix.lower() in (".jpg", ".jpeg"):
+        image.save(output_path, "JPEG", quality=90)
+    else:
+        image.save(output_path, "PNG")
+    return output_path
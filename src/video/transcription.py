@@ -0,0 +1,182 @@
+"""
+Service de transcription Whisper résident.
+
+`content-engine whisper-server` charge le modèle une seule fois et sert
+`transcribe(audio_path) -> segments` sur un socket Unix local. Les
+générateurs de sous-titres l'utilisent s'il tourne, sinon ils chargent
+Whisper dans le process comme avant.
+
+Le moteur (openai-whisper ou faster-whisper, voir transcription_backends)
+se choisit par WHISPER_ENGINE, ou par requête avec "engine".
+
+Protocole : une requête JSON par ligne, une réponse JSON par ligne.
+    → {"op": "transcribe", "audio_path": "...", "model_size": "base", "engine": "...", "options": {...}}
+    ← {"ok": true, "result": {"text": "...", "segments": [...]}}
+    → {"op": "transcribe_batch", "audio_paths": [...], "model_size": "base", "engine": "...", "options": {...}}
+    ← {"ok": true, "result": [{"text": "...", "segments": [...]}, ...]}
+"""
+
+import json
+import os
+import socket
+import socketserver
+import threading
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+
+from src.config import settings
+from src.video.transcription_backends import TranscriptionBackend, create_backend
+
+console = Console()
+
+_backends: dict[tuple[str, str], TranscriptionBackend] = {}
+_backend_locks: dict[tuple[str, str], threading.Lock] = {}
+_registry_lock = threading.Lock()
+
+
+def load_backend(model_size: str, engine: str = "") -> tuple[TranscriptionBackend, threading.Lock]:
+    """Charge (une fois par process) un modèle Whisper avec le moteur demandé (défaut : WHISPER_ENGINE)."""
+    key = (engine or settings.whisper_engine, model_size)
+    with _registry_lock:
+        if key not in _backends:
+            console.print(f"[blue]Chargement Whisper ({key[1]}, {key[0]})...[/blue]")
+            _backends[key] = create_backend(model_size, key[0])
+            _backend_locks[key] = threading.Lock()
+        return _backends[key], _backend_locks[key]
+
+
+def transcribe_local(audio_path: Path, model_size: str, engine: str = "", **options) -> dict:
+    """Transcription dans le process courant, sérialisée par modèle."""
+    backend, lock = load_backend(model_size, engine)
+    with lock:
+        return backend.transcribe(audio_path, **options)
+
+
+def transcribe_batch_local(audio_paths: list[Path], model_size: str, engine: str = "", **options) -> list[dict]:
+    """Transcription groupée dans le process courant, sérialisée par modèle."""
+    backend, lock = load_backend(model_size, engine)
+    options.setdefault("batch_size", settings.whisper_batch_size)
+    with lock:
+        return backend.transcribe_batch(audio_paths, **options)
+
+
+class TranscriptionClient:
+    """Client du service de transcription."""
+
+    def __init__(self, socket_path: Optional[Path] = None, timeout: float = 300):
+        self.socket_path = Path(socket_path or settings.whisper_server_socket)
+        self.timeout = timeout
+
+    def _request(self, payload: dict, timeout: Optional[float] = None) -> dict:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout or self.timeout)
+            sock.connect(str(self.socket_path))
+            sock.sendall((json.dumps(payload) + "\n").encode("utf-8"))
+            with sock.makefile("r", encoding="utf-8") as f:
+                line = f.readline()
+        if not line:
+            raise RuntimeError("Service de transcription : réponse vide")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise RuntimeError(f"Service de transcription : {response.get('error')}")
+        return response.get("result", {})
+
+    def ping(self) -> bool:
+        """True si un service répond sur le socket (indépendamment de WHISPER_SERVER_ENABLED)."""
+        if not self.socket_path.exists():
+            return False
+        try:
+            self._request({"op": "ping"}, timeout=1.0)
+            return True
+        except (OSError, RuntimeError, json.JSONDecodeError):
+            return False
+
+    def available(self) -> bool:
+        """True si le service est activé et répond sur le socket."""
+        return settings.whisper_server_enabled and self.ping()
+
+    def transcribe(self, audio_path: Path, model_size: str, engine: str = "", **options) -> dict:
+        return self._request({
+            "op": "transcribe",
+            "audio_path": str(Path(audio_path).resolve()),
+            "model_size": model_size,
+            "engine": engine,
+            "options": options,
+        })
+
+    def transcribe_batch(self, audio_paths: list[Path], model_size: str, engine: str = "", **options) -> list[dict]:
+        return self._request({
+            "op": "transcribe_batch",
+            "audio_paths": [str(Path(p).resolve()) for p in audio_paths],
+            "model_size": model_size,
+            "engine": engine,
+            "options": options,
+        })
+
+
+class _TranscriptionHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line:
+            return
+        try:
+            request = json.loads(line)
+            op = request.get("op")
+            if op == "ping":
+                result = {"models": sorted(f"{engine}/{size}" for engine, size in _backends)}
+            elif op == "transcribe":
+                result = transcribe_local(
+                    Path(request["audio_path"]),
+                    request.get("model_size") or self.server.default_model,
+                    request.get("engine") or self.server.engine,
+                    **request.get("options", {}),
+                )
+            elif op == "transcribe_batch":
+                result = transcribe_batch_local(
+                    [Path(p) for p in request["audio_paths"]],
+                    request.get("model_size") or self.server.default_model,
+                    request.get("engine") or self.server.engine,
+                    **request.get("options", {}),
+                )
+            else:
+                raise ValueError(f"opération inconnue : {op}")
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.wfile.write((json.dumps(response, default=float) + "\n").encode("utf-8"))
+
+
+class _TranscriptionServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    default_model = "base"
+    engine = ""
+
+
+def serve(model_sizes: list[str], socket_path: Optional[Path] = None, engine: str = "") -> None:
+    """Précharge les modèles puis sert les requêtes jusqu'à interruption."""
+    engine = engine or settings.whisper_engine
+    path = Path(socket_path or settings.whisper_server_socket)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    if path.exists():
+        # Ping direct : un service vivant ne doit pas perdre son socket, même si le client est désactivé
+        if TranscriptionClient(path).ping():
+            raise RuntimeError(f"Un service de transcription tourne déjà sur {path}")
+        path.unlink()
+
+    for size in model_sizes:
+        load_backend(size, engine)
+
+    server = _TranscriptionServer(str(path), _TranscriptionHandler)
+    server.default_model = model_sizes[0]
+    server.engine = engine
+    os.chmod(path, 0o600)
+    console.print(f"[green]✓ Service de transcription prêt : {path} ({engine} : {', '.join(model_sizes)})[/green]")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        console.print("\n[dim]Arrêt du service de transcription[/dim]")
+    finally:
+        server.server_close()
+        path.unlink(missing_ok=True)
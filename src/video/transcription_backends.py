@@ -0,0 +1,223 @@
+"""
+Moteurs de transcription interchangeables (WHISPER_ENGINE).
+
+- openai-whisper : modèle PyTorch de référence ; en lot, les fenêtres de
+  30 s de plusieurs clips passent ensemble dans l'encodeur et le décodeur
+  (transcribe_batch_with).
+- faster-whisper : mêmes poids convertis pour CTranslate2, quantifiés
+  (WHISPER_COMPUTE_TYPE, int8 par défaut) ; nettement plus léger en
+  mémoire et plus rapide sur CPU.
+
+Les deux rendent le même format que whisper.transcribe :
+{"text", "language", "segments": [{"id", "start", "end", "text", "words": [...]}]},
+ce qui garde l'alignement forcé et les sous-titres identiques d'un moteur à l'autre.
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+from src.config import settings
+
+
+def _timestamp_segments(tokens: list[int], tokenizer, seek: int, offset: float, window: float) -> list[dict]:
+    """
+    Découpe les jetons décodés d'une fenêtre en segments aux jetons de
+    timestamp (même règle que whisper.transcribe).
+
+    whisper.transcribe redécode le texte qui suit la dernière paire de
+    timestamps depuis cette position ; ici les fenêtres de 30 s sont fixes,
+    donc ce texte devient un dernier segment qui court jusqu'à la fin de la fenêtre.
+    """
+    begin = tokenizer.timestamp_begin
+    precision = 2 * 160 / 16000  # HOP_LENGTH * stride de l'encodeur / SAMPLE_RATE
+    is_stamp = [t >= begin for t in tokens]
+
+    def segment(part: list[int], start: float, end: float) -> dict:
+        return {
+            "seek": seek, "start": start, "end": end, "tokens": part,
+            "text": tokenizer.decode([t for t in part if t < tokenizer.eot]),
+        }
+
+    cuts = [i + 1 for i in range(len(tokens) - 1) if is_stamp[i] and is_stamp[i + 1]]
+    segments = []
+    if cuts:
+        if is_stamp[-2:] == [False, True]:
+            cuts.append(len(tokens))
+        last = 0
+        for cut in cuts:
+            part = tokens[last:cut]
+            segments.append(segment(
+                part, offset + (part[0] - begin) * precision, offset + (part[-1] - begin) * precision
+            ))
+            last = cut
+        tail = tokens[last:]
+        if tail:
+            start = offset + (tail[0] - begin) * precision if is_stamp[last] else segments[-1]["end"]
+            segments.append(segment(tail, start, offset + window))
+    else:
+        stamps = [t for t in tokens if t >= begin]
+        duration = (stamps[-1] - begin) * precision if stamps and stamps[-1] != begin else window
+        segments.append(segment(tokens, offset, offset + duration))
+    return [s for s in segments if s["text"].strip()]
+
+
+def transcribe_batch_with(
+    model, audio_paths: list[Path], batch_size: int = 8, language: str = "fr", word_timestamps: bool = True,
+) -> list[dict]:
+    """
+    Transcrit plusieurs clips avec un modèle déjà chargé (appelant responsable du verrou).
+
+    Returns:
+        Un résultat {"text", "language", "segments"} par clip, dans l'ordre
+    """
+    import torch
+    import whisper
+    from whisper.audio import HOP_LENGTH, N_FRAMES, N_SAMPLES, SAMPLE_RATE
+    from whisper.timing import add_word_timestamps
+    from whisper.tokenizer import get_tokenizer
+
+    tokenizer = get_tokenizer(
+        model.is_multilingual, num_languages=model.num_languages, language=language, task="transcribe"
+    )
+    options = whisper.DecodingOptions(task="transcribe", language=language, fp16=model.device.type != "cpu")
+
+    # 1. Log-mel de chaque clip, en fenêtres de 30 s (la dernière complétée par du silence)
+    windows = []
+    for clip, path in enumerate(audio_paths):
+        mel = whisper.log_mel_spectrogram(str(path), model.dims.n_mels, padding=N_SAMPLES)
+        content = mel.shape[-1] - N_FRAMES
+        for seek in range(0, content, N_FRAMES):
+            frames = min(N_FRAMES, content - seek)
+            windows.append((clip, seek, frames, whisper.pad_or_trim(mel[:, seek:seek + N_FRAMES], N_FRAMES)))
+
+    # 2. Encodeur + décodeur sur des lots de fenêtres
+    decoded = []
+    for start in range(0, len(windows), max(1, batch_size)):
+        batch = torch.stack([w[3] for w in windows[start:start + batch_size]]).to(model.device)
+        decoded += whisper.decode(model, batch, options)
+
+    # 3. Segments horodatés puis mots, fenêtre par fenêtre
+    results = [{"text": "", "language": language, "segments": []} for _ in audio_paths]
+    last_speech = [0.0] * len(audio_paths)
+    for (clip, seek, frames, mel), decoding in zip(windows, decoded):
+        if decoding.no_speech_prob > 0.6 and decoding.avg_logprob < -1.0:
+            continue
+        offset = seek * HOP_LENGTH / SAMPLE_RATE
+        segments = _timestamp_segments(decoding.tokens, tokenizer, seek, offset, frames * HOP_LENGTH / SAMPLE_RATE)
+        if word_timestamps and segments:
+            add_word_timestamps(
+                segments=segments, model=model, tokenizer=tokenizer, mel=mel.to(model.device),
+                num_frames=frames, last_speech_timestamp=last_speech[clip],
+            )
+            words = [w for s in segments for w in s.get("words", [])]
+            if words:
+                last_speech[clip] = words[-1]["end"]
+        results[clip]["segments"] += segments
+
+    for result in results:
+        for i, segment in enumerate(result["segments"]):
+            segment["id"] = i
+        result["text"] = "".join(s["text"] for s in result["segments"])
+    return results
+
+
+class TranscriptionBackend(ABC):
+    """Interface commune : un modèle chargé, transcription d'un clip ou d'un lot."""
+
+    name = ""
+
+    def __init__(self, model_size: str):
+        self.model_size = model_size
+
+    @property
+    def label(self) -> str:
+        return f"{self.name}/{self.model_size}"
+
+    @abstractmethod
+    def transcribe(self, audio_path: Path, **options) -> dict:
+        """Transcrit un clip : {"text", "language", "segments"} au format whisper.transcribe."""
+
+    def transcribe_batch(self, audio_paths: list[Path], batch_size: int = 8, **options) -> list[dict]:
+        """Par défaut, clip par clip."""
+        return [self.transcribe(path, **options) for path in audio_paths]
+
+
+class WhisperBackend(TranscriptionBackend):
+    """openai-whisper (PyTorch)."""
+
+    name = "openai-whisper"
+
+    def __init__(self, model_size: str):
+        super().__init__(model_size)
+        import whisper
+        self.model = whisper.load_model(model_size)
+
+    def transcribe(self, audio_path: Path, **options) -> dict:
+        options.setdefault("language", "fr")
+        result = self.model.transcribe(str(audio_path), **options)
+        return {
+            "text": result.get("text", ""),
+            "language": result.get("language"),
+            "segments": result.get("segments", []),
+        }
+
+    def transcribe_batch(self, audio_paths: list[Path], batch_size: int = 8, **options) -> list[dict]:
+        return transcribe_batch_with(self.model, audio_paths, batch_size=batch_size, **options)
+
+
+class FasterWhisperBackend(TranscriptionBackend):
+    """faster-whisper (CTranslate2, poids quantifiés)."""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_size: str):
+        super().__init__(model_size)
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=settings.whisper_compute_type,
+            cpu_threads=settings.whisper_cpu_threads,
+        )
+
+    def transcribe(self, audio_path: Path, **options) -> dict:
+        options.setdefault("language", "fr")
+        # Décodage glouton, comme whisper.transcribe (faster-whisper fait un beam search de 5 par défaut)
+        options.setdefault("beam_size", 1)
+        segments, info = self.model.transcribe(str(audio_path), **options)
+        segments = [
+            {
+                "id": i,
+                "seek": seg.seek,
+                "start": seg.start,
+                "end": seg.end,
+                "text": seg.text,
+                "tokens": list(seg.tokens),
+                "avg_logprob": seg.avg_logprob,
+                "no_speech_prob": seg.no_speech_prob,
+                "words": [
+                    {"word": w.word, "start": w.start, "end": w.end, "probability": w.probability}
+                    for w in (seg.words or [])
+                ],
+            }
+            for i, seg in enumerate(segments)  # générateur : la transcription se fait ici
+        ]
+        return {
+            "text": "".join(s["text"] for s in segments),
+            "language": info.language,
+            "segments": segments,
+        }
+
+
+BACKENDS: dict[str, type[TranscriptionBackend]] = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_backend(model_size: str, engine: str = "") -> TranscriptionBackend:
+    """Charge un modèle avec le moteur demandé (défaut : WHISPER_ENGINE)."""
+    engine = engine or settings.whisper_engine
+    if engine not in BACKENDS:
+        raise ValueError(f"Moteur de transcription inconnu : {engine} (disponibles : {', '.join(BACKENDS)})")
+    return BACKENDS[engine](model_size)
@@ -0,0 +1,174 @@
+"""
+Timings des phrases d'après les pauses de la piste voix (VAD par énergie).
+
+La voix TTS est propre : entre deux phrases, le signal retombe au niveau du
+silence. On décode la piste une fois en PCM mono 16 kHz (ffmpeg vers un
+pipe), on calcule le niveau de trames de 20 ms avec NumPy, puis on repère
+les pauses. Les fins de phrase du script sont appariées aux pauses par
+programmation dynamique (position attendue d'après le nombre de
+caractères, pauses longues favorisées, ordre respecté) ; les frontières
+sans pause sont interpolées.
+
+Aucun modèle à charger : quelques millisecondes par clip. Sert de source
+de timings (SUBTITLE_TIMING=vad) et de repli quand Whisper est indisponible.
+"""
+
+import subprocess
+from pathlib import Path
+from typing import Optional
+import numpy as np
+from pydantic import BaseModel
+
+from src.models import SubtitleSegment
+
+SAMPLE_RATE = 16000
+FRAME_SECONDS = 0.02
+MIN_PAUSE = 0.12        # silence plus court : respiration, consonne sourde
+SILENCE_RATIO = 0.3     # seuil entre plancher de bruit et niveau de parole (en dB)
+DRIFT_WEIGHT = 3.0      # pénalité d'une pause éloignée de la position attendue (par durée parlée)
+
+
+class VoiceActivity(BaseModel):
+    """Parole détectée dans une piste : bornes et pauses internes (secondes)."""
+
+    duration: float
+    speech_start: float
+    speech_end: float
+    pauses: list[tuple[float, float]]
+
+
+def decode_pcm(audio_path: Path) -> Optional[np.ndarray]:
+    """
+    Échantillons mono 16 kHz (float32, -1..1) d'une piste.
+    ffmpeg écrit sur stdout : pas de run_ffmpeg, dont stdout porte la progression.
+    """
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-v", "error", "-i", str(audio_path),
+             "-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "pipe:1"],
+            capture_output=True, timeout=60,
+        )
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    return np.frombuffer(result.stdout, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def frame_levels(samples: np.ndarray) -> np.ndarray:
+    """Niveau RMS (dB) de chaque trame de FRAME_SECONDS."""
+    size = int(SAMPLE_RATE * FRAME_SECONDS)
+    count = len(samples) // size
+    frames = samples[:count * size].reshape(count, size)
+    return 20 * np.log10(np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10)
+
+
+def detect_activity(samples: np.ndarray) -> Optional[VoiceActivity]:
+    """Bornes de la parole et pauses internes d'au moins MIN_PAUSE (None si rien d'audible)."""
+    levels = frame_levels(samples)
+    if not len(levels):
+        return None
+    floor, speech = np.percentile(levels, [10, 95])
+    voiced = levels > floor + SILENCE_RATIO * (speech - floor)
+    if not voiced.any():
+        return None
+
+    first = int(np.argmax(voiced))
+    last = len(voiced) - int(np.argmax(voiced[::-1]))
+    edges = np.diff(np.concatenate([[0], (~voiced).astype(np.int8), [0]]))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    internal = (starts > first) & (ends < last) & ((ends - starts) * FRAME_SECONDS >= MIN_PAUSE)
+
+    return VoiceActivity(
+        duration=len(samples) / SAMPLE_RATE,
+        speech_start=first * FRAME_SECONDS,
+        speech_end=last * FRAME_SECONDS,
+        pauses=[(s * FRAME_SECONDS, e * FRAME_SECONDS) for s, e in zip(starts[internal], ends[internal])],
+    )
+
+
+def match_pauses(expected: np.ndarray, pauses: list[tuple[float, float]], span: float) -> np.ndarray:
+    """
+    Apparie chaque frontière de phrase attendue à au plus une pause, dans l'ordre.
+
+    Gain d'un appariement : 1 + durée relative de la pause - DRIFT_WEIGHT × écart
+    relatif à la position attendue. Comme dans alignment.align_words, chaque
+    ligne est calculée d'un bloc (le saut d'une pause ne coûte rien : maximum cumulé).
+
+    Returns:
+        Pour chaque frontière, l'indice de la pause retenue (-1 sinon)
+    """
+    n, m = len(expected), len(pauses)
+    matches = np.full(n, -1)
+    if not n or not m:
+        return matches
+
+    bounds = np.array(pauses)
+    mids, lengths = bounds.mean(axis=1), bounds[:, 1] - bounds[:, 0]
+    gain = 1 + lengths / lengths.max() - DRIFT_WEIGHT * np.abs(mids[None, :] - expected[:, None]) / max(span, 1e-3)
+
+    score = np.zeros((n + 1, m + 1))
+    for i in range(1, n + 1):
+        row = np.zeros(m + 1)
+        row[1:] = np.maximum(score[i - 1, 1:], score[i - 1, :-1] + gain[i - 1])
+        score[i] = np.maximum.accumulate(row)
+
+    i, j = n, m
+    while i > 0 and j > 0:
+        if gain[i - 1, j - 1] > 0 and abs(score[i, j] - (score[i - 1, j - 1] + gain[i - 1, j - 1])) < 1e-9:
+            matches[i - 1] = j - 1
+            i, j = i - 1, j - 1
+        elif score[i, j] == score[i, j - 1]:
+            j -= 1
+        else:
+            i -= 1
+    return matches
+
+
+def sentence_timings(activity: VoiceActivity, sentences: list[str]) -> list[SubtitleSegment]:
+    """Phrases horodatées : coupées au milieu des pauses retenues, interpolées ailleurs."""
+    if not sentences:
+        return []
+    span = activity.speech_end - activity.speech_start
+    weights = np.array([max(len(s), 1) for s in sentences], dtype=float)
+    cumulative = np.cumsum(weights)[:-1] / weights.sum()
+    expected = activity.speech_start + cumulative * span
+    matches = match_pauses(expected, activity.pauses, span)
+
+    # Frontières sans pause : interpolées (au prorata des caractères) entre les pauses retenues
+    matched = np.flatnonzero(matches >= 0)
+    mids = [sum(activity.pauses[p]) / 2 for p in matches[matched]]
+    anchors_x = np.concatenate([[0.0], cumulative[matched], [1.0]])
+    anchors_t = np.concatenate([[activity.speech_start], mids, [activity.speech_end]])
+    boundaries = np.interp(cumulative, anchors_x, anchors_t)
+
+    ends, starts = list(boundaries), list(boundaries)
+    for k in matched:
+        ends[k], starts[k] = activity.pauses[matches[k]]
+    starts = [activity.speech_start] + starts
+    ends = ends + [activity.speech_end]
+
+    aligned = []
+    previous_end = 0.0
+    for i, (sentence, start, end) in enumerate(zip(sentences, starts, ends)):
+        start = max(float(start), previous_end)
+        end = max(float(end), start + 0.1)
+        aligned.append(SubtitleSegment(index=i + 1, start_time=round(start, 3), end_time=round(end, 3), text=sentence))
+        previous_end = end
+    return aligned
+
+
+def vad_timings(audio_path: Path, sentences: list[str]) -> Optional[list[SubtitleSegment]]:
+    """
+    Phrases horodatées d'après les pauses de la piste.
+
+    Returns:
+        None si la piste ne peut pas être décodée ou ne contient rien d'audible
+    """
+    samples = decode_pcm(audio_path)
+    if samples is None:
+        return None
+    activity = detect_activity(samples)
+    if activity is None:
+        return None
+    return sentence_timings(activity, sentences)
@@ -4,6 +4,7 @@ Générateur de voix avec Google Cloud Text-to-Speech.
 
 from pathlib import Path
 from typing import Optional
+from xml.sax.saxutils import escape
 from google.cloud import texttospeech
 from google.api_core.exceptions import ResourceExhausted, ServiceUnavailable, DeadlineExceeded
 from rich.console import Console
@@ -11,10 +12,16 @@ from rich.console import Console
 from src.utils.retry import with_retry
 
 from src.config import settings
-from src.models import Script, AudioFile
+from src.models import Script, AudioFile, SubtitleSegment
+from src.storage.artifact_cache import artifact_cache, cache_key
+from src.utils.text import split_sentences
+from src.video.mediainfo import media_info
+from src.voice.mastering import master_voice_track, mastering_params
 
 console = Console()
 
+TTS_EFFECTS_PROFILE = "small-bluetooth-speaker-class-device"
+
 
 # Voix françaises recommandées (du plus naturel au plus basique)
 FRENCH_VOICES = {
@@ -41,12 +48,26 @@ class VoiceGenerator:
         # Le client utilise GOOGLE_APPLICATION_CREDENTIALS automatiquement
         self.client = texttospeech.TextToSpeechClient()
         self.default_voice = settings.tts_voice_name
+        self._timepoint_client = None
+
+    @property
+    def timepoint_client(self):
+        """Client v1beta1 : seule version de l'API qui renvoie les timepoints des marks SSML."""
+        if self._timepoint_client is None:
+            from google.cloud import texttospeech_v1beta1
+            self._timepoint_client = texttospeech_v1beta1.TextToSpeechClient()
+        return self._timepoint_client
 
     @with_retry(exceptions=(ResourceExhausted, ServiceUnavailable, DeadlineExceeded))
     def _synthesize(self, **kwargs):
         """Appel TTS avec retry automatique."""
         return self.client.synthesize_speech(**kwargs)
 
+    @with_retry(exceptions=(ResourceExhausted, ServiceUnavailable, DeadlineExceeded))
+    def _synthesize_with_timepoints(self, request):
+        """Appel TTS v1beta1 (timepoints) avec retry automatique."""
+        return self.timepoint_client.synthesize_speech(request=request)
+
     def list_voices(self, language_code: str = "fr-FR") -> list[str]:
         """Liste les voix disponibles pour une langue."""
         response = self.client.list_voices(language_code=language_code)
@@ -102,7 +123,7 @@ class VoiceGenerator:
             speaking_rate=speaking_rate,
             pitch=pitch,
             # Amélioration de la qualité
-            effects_profile_id=["small-bluetooth-speaker-class-device"],
+            effects_profile_id=[TTS_EFFECTS_PROFILE],
         )
 
         # Génération
@@ -148,7 +169,61 @@ class VoiceGenerator:
         settings.ensure_directories()
 
         output_path = settings.output_dir / "audio" / f"{script.format.value}_{script.id}.mp3"
+        final_path = output_path.with_suffix(".m4a") if settings.voice_track_aac else output_path
+        mastering = mastering_params() if settings.voice_track_aac else ()
 
+        # Cache : même texte + même voix + mêmes réglages → même audio
+        if engine == "elevenlabs":
+            key = cache_key("voice", engine, script.full_text, settings.elevenlabs_voice_id, *mastering)
+        else:
+            key = cache_key(
+                "voice", "google", script.full_text, voice_name or self.default_voice,
+                settings.tts_speaking_rate, settings.tts_pitch, TTS_EFFECTS_PROFILE,
+                settings.subtitle_timing, *mastering,
+            )
+        meta = artifact_cache.fetch("audio", key, final_path.suffix, final_path)
+        if meta and "duration" in meta:
+            console.print(f"[green]✓ Audio en cache : {output_path.name}[/green]")
+            return AudioFile(
+                id=script.id,
+                script_id=script.id,
+                path=final_path,
+                duration=meta["duration"],
+                voice_name=meta["voice_name"],
+                timed_segments=meta.get("timed_segments", []),
+            )
+
+        audio_file = self._synthesize_script(script, output_path, voice_name, engine)
+
+        # Piste finale : normalisée + AAC, une fois pour tous les rendus
+        if settings.voice_track_aac:
+            if master_voice_track(output_path, final_path) is None:
+                return audio_file
+            output_path.unlink(missing_ok=True)
+            audio_file.path = final_path
+            audio_file.duration = media_info.duration(final_path) or audio_file.duration
+
+        if engine == "elevenlabs" and not audio_file.voice_name.startswith("elevenlabs:"):
+            # Fallback Google : ne pas ranger sous la clé ElevenLabs
+            return audio_file
+        artifact_cache.store(
+            "audio", key, audio_file.path,
+            meta={
+                "duration": audio_file.duration,
+                "voice_name": audio_file.voice_name,
+                "timed_segments": [seg.model_dump() for seg in audio_file.timed_segments],
+            },
+        )
+        return audio_file
+
+    def _synthesize_script(
+        self,
+        script: Script,
+        output_path: Path,
+        voice_name: Optional[str],
+        engine: str,
+    ) -> AudioFile:
+        """Synthèse effective (hors cache) d'un script."""
         if engine == "elevenlabs":
             result = self._generate_elevenlabs(script.full_text, output_path)
             if result is not None:
@@ -166,6 +241,22 @@ class VoiceGenerator:
             else:
                 console.print("[yellow]⚠ Fallback sur Google TTS...[/yellow]")
 
+        # Google TTS avec timepoints : les sous-titres n'ont plus besoin de Whisper
+        if settings.subtitle_timing == "tts":
+            try:
+                duration, segments = self.generate_with_timepoints(script, output_path, voice_name)
+                console.print(f"[dim]Durée TTS : {duration:.1f}s, {len(segments)} phrases horodatées[/dim]")
+                return AudioFile(
+                    id=script.id,
+                    script_id=script.id,
+                    path=output_path,
+                    duration=duration,
+                    voice_name=voice_name or self.default_voice,
+                    timed_segments=segments,
+                )
+            except Exception as e:
+                console.print(f"[yellow]⚠ Timepoints TTS indisponibles ({e}), synthèse simple[/yellow]")
+
         # Google TTS (défaut ou fallback)
         _, duration = self.generate(
             text=script.full_text,
@@ -184,6 +275,58 @@ class VoiceGenerator:
         console.print(f"[dim]Durée estimée : {duration:.1f}s[/dim]")
         return audio_file
 
+    def generate_with_timepoints(
+        self,
+        script: Script,
+        output_path: Path,
+        voice_name: Optional[str] = None,
+    ) -> tuple[float, list[SubtitleSegment]]:
+        """
+        Génère l'audio d'un script en demandant au TTS l'horodatage de chaque phrase.
+
+        Le SSML porte un <mark> avant chaque phrase et chaque mot (voir script_to_ssml) :
+        Google renvoie l'instant où chaque mark est prononcé.
+
+        Returns:
+            Tuple (durée réelle en secondes, segments de sous-titres)
+        """
+        from google.cloud import texttospeech_v1beta1 as tts_beta
+
+        voice_name = voice_name or self.default_voice
+        sentences = split_sentences(script.full_text)
+
+        console.print(f"[blue]Génération audio avec {voice_name} (timepoints)...[/blue]")
+
+        request = tts_beta.SynthesizeSpeechRequest(
+            input=tts_beta.SynthesisInput(ssml=script_to_ssml(script, with_marks=True)),
+            voice=tts_beta.VoiceSelectionParams(language_code="fr-FR", name=voice_name),
+            audio_config=tts_beta.AudioConfig(
+                audio_encoding=tts_beta.AudioEncoding.MP3,
+                speaking_rate=settings.tts_speaking_rate,
+                pitch=settings.tts_pitch,
+                effects_profile_id=[TTS_EFFECTS_PROFILE],
+            ),
+            enable_time_pointing=[tts_beta.SynthesizeSpeechRequest.TimepointType.SSML_MARK],
+        )
+        response = self._synthesize_with_timepoints(request)
+
+        marks = {tp.mark_name: tp.time_seconds for tp in response.timepoints}
+        segments = timepoints_to_segments(sentences, marks)
+        if not segments:
+            raise ValueError(f"marks incomplets ({len(marks)} reçus)")
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, "wb") as f:
+            f.write(response.audio_content)
+        console.print(f"[green]✓ Audio sauvegardé : {output_path}[/green]")
+
+        # Durée du fichier écrit (padding de l'encodeur, silence final) : les marks
+        # ne servent qu'aux débuts de phrase et de mot
+        duration = media_info.duration(output_path) or marks["end"]
+        for segment in segments:
+            segment.end_time = min(segment.end_time, duration)
+        return duration, segments
+
     def _generate_elevenlabs(self, text: str, output_path: Path) -> Optional[Path]:
         """Tente de générer l'audio via ElevenLabs."""
         try:
@@ -242,12 +385,19 @@ class VoiceGenerator:
         return response.audio_content, duration
 
 
-def script_to_ssml(script: Script) -> str:
+def script_to_ssml(script: Script, with_marks: bool = False) -> str:
     """
     Convertit un script en SSML pour un meilleur rendu.
 
     Ajoute des pauses et emphases automatiques.
+
+    Avec with_marks=True, le SSML suit les phrases de full_text (les mêmes que
+    les sous-titres) et pose un <mark> avant chaque phrase (s<i>), avant chaque
+    mot (w<i>_<j>) et en fin de texte (end), pour récupérer les timepoints.
     """
+    if with_marks:
+        return _marked_ssml(split_sentences(script.full_text))
+
     ssml_parts = ["<speak>"]
 
     # Hook avec emphase
@@ -269,3 +419,50 @@ def script_to_ssml(script: Script) -> str:
     ssml_parts.append("</speak>")
 
     return "\n".join(ssml_parts)
+
+
+def _marked_ssml(sentences: list[str]) -> str:
+    """SSML avec un mark par phrase et par mot."""
+    ssml_parts = ["<speak>"]
+    for i, sentence in enumerate(sentences):
+        words = [f'<mark name="w{i}_{j}"/>{escape(word)}' for j, word in enumerate(sentence.split())]
+        ssml_parts.append(f'<mark name="s{i}"/>' + " ".join(words))
+    ssml_parts.append('<mark name="end"/>')
+    ssml_parts.append("</speak>")
+    return "\n".join(ssml_parts)
+
+
+def timepoints_to_segments(sentences: list[str], marks: dict[str, float]) -> list[SubtitleSegment]:
+    """
+    Convertit les timepoints des marks SSML en segments de sous-titres.
+
+    Début de phrase = mark s<i>. Fin = mark de la phrase suivante, raccourcie
+    au dernier mot + 1.5 mot moyen pour ne pas sous-titrer les silences.
+
+    Returns:
+        Les segments, ou une liste vide si des marks manquent
+    """
+    segments = []
+    for i, sentence in enumerate(sentences):
+        start = marks.get(f"s{i}")
+        next_start = marks.get(f"s{i + 1}", marks.get("end"))
+        if start is None or next_start is None:
+            return []
+
+        words = [
+            marks[f"w{i}_{j}"]
+            for j in range(len(sentence.split()))
+            if f"w{i}_{j}" in marks
+        ]
+        end = next_start
+        if len(words) >= 2:
+            avg_word = (words[-1] - words[0]) / (len(words) - 1)
+            end = min(next_start, words[-1] + 1.5 * avg_word)
+
+        segments.append(SubtitleSegment(
+            index=i + 1,
+            start_time=start,
+            end_time=max(end, start + 0.1),
+            text=sentence,
+        ))
+    return segments
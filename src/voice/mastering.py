@@ -0,0 +1,51 @@
+"""
+Piste voix finale : normalisation du volume + encodage AAC, une seule fois.
+
+Le MP3 du TTS est converti en M4A (AAC) au niveau cible (loudnorm, LUFS
+intégrés + true peak). Le montage copie ensuite ce flux tel quel
+(-c:a copy) dans chaque rendu et chaque variante.
+"""
+
+from pathlib import Path
+from typing import Optional
+from rich.console import Console
+
+from src.config import settings
+from src.video.ffmpeg_runner import run_ffmpeg
+
+console = Console()
+
+# Conteneurs dont le flux audio (AAC) peut être copié sans réencodage
+AAC_SUFFIXES = {".m4a", ".aac", ".mp4"}
+
+
+def mastering_params() -> tuple:
+    """Réglages qui déterminent la piste finale (entrent dans la clé de cache)."""
+    return (
+        "aac", settings.voice_loudness_lufs, settings.voice_true_peak,
+        settings.voice_audio_bitrate, settings.voice_sample_rate,
+    )
+
+
+def master_voice_track(source: Path, dest: Path) -> Optional[Path]:
+    """
+    Normalise et encode une piste voix en AAC.
+
+    Returns:
+        dest si l'encodage a réussi, None sinon (la source reste utilisable)
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}")
+    result = run_ffmpeg([
+        "-y", "-i", str(source),
+        "-af", f"loudnorm=I={settings.voice_loudness_lufs}:TP={settings.voice_true_peak}:LRA=11",
+        "-ar", str(settings.voice_sample_rate), "-ac", "2",
+        "-c:a", "aac", "-b:a", settings.voice_audio_bitrate,
+        "-movflags", "+faststart", "-f", "mp4", str(tmp),
+    ], "voice.master", timeout=120)
+    if result.returncode != 0:
+        console.print(f"[yellow]⚠ Normalisation audio échouée, MP3 conservé : {result.stderr[-200:]}[/yellow]")
+        tmp.unlink(missing_ok=True)
+        return None
+    tmp.replace(dest)
+    return dest